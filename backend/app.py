@@ -1,10 +1,12 @@
-from flask import Flask, jsonify, send_from_directory, current_app
+from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 from extensions import db
 from models.units_model import House
 import os
 from flask_jwt_extended import JWTManager
+from sqlalchemy.orm.exc import StaleDataError
+from werkzeug.middleware.proxy_fix import ProxyFix
 from routes.auth_route import auth_bp
 from routes.application_route import application_bp
 from routes.tenant_route import tenant_bp
@@ -19,12 +21,26 @@ from routes.notification_route import notification_bp
 from routes.tenant_dashboard_route import tenant_dashboard_bp
 from routes.email_verification_bp import email_verification_bp
 from routes.owner_dashboard_route import owner_dashboard_bp
+from utils.file_delivery import send_upload
+from cli import register_commands
+from utils.schema import upgrade_schema
+from utils.receipt_template import get_receipt_template
+from utils.email_templates import preload_email_templates
+from utils.rate_limit import rate_limit_metrics
+from utils.email_transport import email_health
+from utils.email_outbox import outbox_stats, start_email_worker, worker_health
+from utils.passwords import HashPoolBusy
 
 load_dotenv()
 
 app = Flask(__name__)
 
-CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}})
+CORS(
+    app,
+    resources={r"/api/*": {"origins": "http://localhost:5173"}},
+    # Pagination metadata is returned in headers so list responses keep their shape
+    expose_headers=["X-Total-Count", "X-Total-Amount", "X-Next-Cursor", "X-Page", "X-Per-Page", "Retry-After"]
+)
 
 # ✅ Config
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -33,6 +49,24 @@ app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
 app.config["BREVO_API_KEY"] = os.getenv("BREVO_API_KEY")
 app.config["UPLOAD_FOLDER"] = os.path.join(BASE_DIR, "uploads")
 app.config["JWT_SECRET_KEY"] = "super-secret-key-change-this"
+# File delivery offload: "", "x-sendfile" or "x-accel" (nginx internal location)
+app.config["SENDFILE_MODE"] = os.getenv("SENDFILE_MODE", "")
+app.config["SENDFILE_ACCEL_PREFIX"] = os.getenv("SENDFILE_ACCEL_PREFIX", "/protected-uploads")
+app.config["USE_X_SENDFILE"] = app.config["SENDFILE_MODE"].lower() == "x-sendfile"
+# Notification retention policy, applied by `flask archive-notifications`
+app.config["NOTIFICATION_RETENTION_DAYS"] = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "180"))
+app.config["NOTIFICATION_DUPLICATE_WINDOW_HOURS"] = int(os.getenv("NOTIFICATION_DUPLICATE_WINDOW_HOURS", "24"))
+# Group notification email digests, sent by `flask send-notification-digests`
+app.config["NOTIFICATION_DIGEST_WINDOW_HOURS"] = int(os.getenv("NOTIFICATION_DIGEST_WINDOW_HOURS", "24"))
+# Email delivery: "brevo" or "stub" (offline). Deployments deliver with `flask --app app email-worker`
+# as a separate service; EMAIL_WORKER_IN_PROCESS only applies to the development server (python app.py)
+app.config["EMAIL_TRANSPORT"] = os.getenv("EMAIL_TRANSPORT", "brevo")
+app.config["EMAIL_WORKER_IN_PROCESS"] = os.getenv("EMAIL_WORKER_IN_PROCESS", "1") == "1"
+# Reverse proxies in front of the app (0 = none); their X-Forwarded-For/-Proto are trusted,
+# so request.remote_addr (used by per-IP rate limits) is the real client
+app.config["TRUSTED_PROXY_COUNT"] = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))
+if app.config["TRUSTED_PROXY_COUNT"]:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["TRUSTED_PROXY_COUNT"], x_proto=app.config["TRUSTED_PROXY_COUNT"])
 jwt = JWTManager(app)
 
 # ✅ Ensure upload folders exist
@@ -47,7 +81,8 @@ for sub in [
     "receipts",
     "gcash_receipts",
     "concern_image",
-    "profile_images"
+    "profile_images",
+    "statements"
 ]:
     os.makedirs(os.path.join(app.config["UPLOAD_FOLDER"], sub), exist_ok=True)
 
@@ -68,6 +103,11 @@ app.register_blueprint(notification_bp, url_prefix="/api")
 app.register_blueprint(email_verification_bp, url_prefix="/api")
 app.register_blueprint(tenant_dashboard_bp, url_prefix="/api")
 app.register_blueprint(owner_dashboard_bp, url_prefix="/api")
+register_commands(app)
+
+# ✅ Compile the receipt and email templates once at startup instead of on first use
+get_receipt_template()
+preload_email_templates()
 
 # Example routes
 @app.route("/api/houses", methods=["GET"])
@@ -79,17 +119,51 @@ def get_houses():
 def ping():
     return jsonify({"message": "pong"})
 
+@app.route("/api/metrics/rate-limits")
+def rate_limits():
+    return jsonify(rate_limit_metrics())
+
+# Emails are delivered by the outbox worker, so this reports the breaker state the worker
+# published; "web" is this process's own breaker, which only sees in-request provider calls.
+# 503 when the worker's circuit is open or no worker reported recently. A separate
+# `flask email-worker` is only visible through a shared VERIFICATION_STORE (database or redis).
+@app.route("/api/health/email")
+def health_email():
+    worker = worker_health()
+    health = dict(worker) if worker else {"state": "unknown", "healthy": False}
+    health["worker_reporting"] = worker is not None
+    health["web"] = email_health()
+    health["outbox"] = outbox_stats()
+    return jsonify(health), 200 if worker and health["state"] != "open" else 503
+
+# ✅ Any Contract write that loses the optimistic-lock race and is not handled by its route
+@app.errorhandler(StaleDataError)
+def stale_data(e):
+    db.session.rollback()
+    return jsonify({"error": "The record was modified by another request. Please refresh and try again."}), 409
+
+# ✅ Password hashing pool saturated (e.g. User.set_password) and not handled by its route
+@app.errorhandler(HashPoolBusy)
+def hash_pool_busy(e):
+    db.session.rollback()
+    return jsonify({"message": "Server busy, please try again."}), 503, {"Retry-After": "1"}
+
 @app.route("/")
 def home():
     return jsonify({"message": "Flask backend is running!"})
 
 @app.route("/uploads/<path:subpath>/<path:filename>")
 def serve_uploads(subpath, filename):
-    full_path = os.path.join(current_app.config["UPLOAD_FOLDER"], subpath)
-    return send_from_directory(full_path, filename)
+    return send_upload(subpath, filename)
 
 
 if __name__ == "__main__":
     with app.app_context():
-        db.create_all()
-    app.run(debug=True)
+        upgrade_schema()
+    debug = os.getenv("FLASK_DEBUG", "1") == "1"
+    # ✅ Development: deliver queued emails from a thread in this process. With the
+    # reloader on, the file-watching parent never serves requests, so only the child starts it.
+    reloader_parent = debug and os.environ.get("WERKZEUG_RUN_MAIN") is None
+    if app.config["EMAIL_WORKER_IN_PROCESS"] and not reloader_parent:
+        start_email_worker(app)
+    app.run(debug=debug)
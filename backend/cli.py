@@ -0,0 +1,435 @@
+import click
+from flask import current_app
+
+
+def register_commands(app):
+    """Attach maintenance commands to `flask --app app <command>`."""
+
+    @app.cli.command("pdf-optimize")
+    @click.option("--apply", is_flag=True, help="Recompress the stored PDFs in place (default: report only).")
+    def pdf_optimize(apply):
+        """Report bytes saved by optimizing stored contracts and receipts."""
+        from utils.pdf_optimizer import measure_archive
+
+        report = measure_archive(current_app.config["UPLOAD_FOLDER"], apply=apply)
+        total_before = total_after = 0
+        for folder, stats in report.items():
+            saved = stats["before"] - stats["after"]
+            total_before += stats["before"]
+            total_after += stats["after"]
+            click.echo(f"{folder:<18} {stats['files']:>5} files  {stats['before']:>12,} -> {stats['after']:>12,} bytes  (saved {saved:,})")
+        percent = (1 - total_after / total_before) * 100 if total_before else 0
+        click.echo(f"{'total':<18} {'':>11}  {total_before:>12,} -> {total_after:>12,} bytes  ({percent:.1f}% smaller)")
+        if not apply:
+            click.echo("Dry run only. Re-run with --apply to rewrite the files.")
+
+    @app.cli.command("scan-expiring-contracts")
+    @click.option("--days", default=30, show_default=True, help="Look-ahead window in days.")
+    @click.option("--dry-run", is_flag=True, help="List expiring contracts without notifying.")
+    def scan_expiring(days, dry_run):
+        """Send renewal reminders for Active contracts ending soon (run daily from cron)."""
+        from utils.contract_expiry import scan_expiring_contracts
+
+        # Without --dry-run only the contracts this run claimed (and notified) are returned
+        contracts = scan_expiring_contracts(days=days, dry_run=dry_run)
+        for c in contracts:
+            click.echo(f"Contract {c.contractid}: {c.firstname} {c.lastname}, {c.unit_name}, ends {c.enddate}")
+        action = "found" if dry_run else "reminded"
+        click.echo(f"{len(contracts)} contract(s) {action}.")
+
+    @app.cli.command("db-upgrade")
+    def db_upgrade():
+        """Create missing tables, columns and indexes for the current models."""
+        from utils.schema import upgrade_schema
+
+        changes = upgrade_schema()
+        for change in changes:
+            click.echo(f"Added {change}")
+        click.echo("Schema is up to date." if not changes else f"{len(changes)} change(s) applied.")
+
+    @app.cli.command("bench-receipt")
+    @click.option("--count", default=500, show_default=True, help="Number of receipts to render.")
+    def bench_receipt(count):
+        """Benchmark receipt rendering and optimization."""
+        import statistics
+        import time
+        from utils.pdf_optimizer import optimize_pdf_bytes
+        from utils.receipt_template import ReceiptTemplate
+
+        start = time.perf_counter()
+        template = ReceiptTemplate()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        fields = {
+            "receipt_number": "RMS-000001",
+            "issue_date": "January 01, 2025",
+            "issue_time": "09:00 AM",
+            "tenant_id": "1",
+            "full_name": "Juan Dela Cruz",
+            "bill_id": "1",
+            "description": "Rent Payment",
+            "amount": "PHP 5,000.00"
+        }
+        timings, optimize_timings = [], []
+        for _ in range(count):
+            start = time.perf_counter()
+            pdf = template.render(fields)
+            timings.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            optimized = optimize_pdf_bytes(pdf)
+            optimize_timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        optimize_timings.sort()
+
+        click.echo(f"template build (once per process): {build_ms:.2f} ms")
+        for label, values in (("render", timings), ("optimize", optimize_timings)):
+            click.echo(f"{label} x{count}: mean {statistics.mean(values):.2f} ms, "
+                       f"p50 {values[len(values) // 2]:.2f} ms, p99 {values[int(len(values) * 0.99) - 1]:.2f} ms")
+        click.echo(f"size: {len(pdf)} bytes rendered, {min(len(pdf), len(optimized))} bytes stored")
+
+    @app.cli.command("generate-statements")
+    @click.option("--month", "period", required=True, help="Statement month as YYYY-MM.")
+    @click.option("--workers", default=None, type=int, help="Render processes (default: CPU count).")
+    def generate_statements(period, workers):
+        """Generate a monthly statement PDF for every active tenant."""
+        from datetime import datetime
+        from utils.statements import generate_monthly_statements
+
+        try:
+            month_start = datetime.strptime(period, "%Y-%m")
+        except ValueError:
+            raise click.BadParameter("Use the YYYY-MM format", param_hint="--month")
+
+        with click.progressbar(length=0, label=f"Statements {period}") as bar:
+            def progress(done, total):
+                bar.length = total
+                bar.update(1)
+
+            index = generate_monthly_statements(
+                month_start.year, month_start.month,
+                current_app.config["UPLOAD_FOLDER"],
+                workers=workers,
+                progress=progress
+            )
+
+        click.echo(f"{index['count']} statement(s) written to statements/{period}/ (index.json)")
+        for failure in index["failures"]:
+            click.echo(f"  tenant {failure['tenantid']} failed: {failure['error']}")
+
+    @app.cli.command("artifacts-gc")
+    @click.option("--dry-run", is_flag=True, help="Report what would be removed without deleting.")
+    @click.option("--grace-hours", default=24, show_default=True, help="Keep unreferenced files younger than this.")
+    @click.option("--migrate", is_flag=True, help="First rename referenced timestamped files to content addresses.")
+    def artifacts_gc(dry_run, grace_hours, migrate):
+        """Remove receipts and contracts no longer referenced by any DB row."""
+        from utils.artifact_store import collect_garbage, migrate_legacy
+
+        upload_folder = current_app.config["UPLOAD_FOLDER"]
+        if migrate and not dry_run:
+            click.echo(f"{migrate_legacy(upload_folder)} row(s) repointed to content-addressed files.")
+
+        report = collect_garbage(upload_folder, grace_seconds=grace_hours * 3600, dry_run=dry_run)
+        total_removed = total_freed = 0
+        for folder, stats in report.items():
+            total_removed += stats["removed"]
+            total_freed += stats["bytes_freed"]
+            click.echo(f"{folder:<18} {stats['files']:>6} files  {stats['referenced']:>6} referenced  "
+                       f"{stats['removed']:>6} removed  ({stats['bytes_freed']:,} bytes)")
+        verb = "would be freed" if dry_run else "freed"
+        click.echo(f"{total_removed} file(s), {total_freed:,} bytes {verb}.")
+
+    @app.cli.command("archive-notifications")
+    @click.option("--days", default=None, type=int, help="Archive notifications older than this (default: NOTIFICATION_RETENTION_DAYS).")
+    @click.option("--window-hours", default=None, type=int, help="Duplicate window (default: NOTIFICATION_DUPLICATE_WINDOW_HOURS).")
+    @click.option("--batch-size", default=1000, show_default=True, help="Rows moved per transaction.")
+    @click.option("--dry-run", is_flag=True, help="Only count what would be archived.")
+    @click.option("--full-scan", is_flag=True, help="Look for duplicates in the whole table, not only recent rows.")
+    def archive_notifications(days, window_hours, batch_size, dry_run, full_scan):
+        """Move old and duplicate notifications to the archive table."""
+        from utils.notification_retention import DUPLICATE_LOOKBACK_HOURS, apply_retention_policy
+
+        days = days if days is not None else current_app.config["NOTIFICATION_RETENTION_DAYS"]
+        window_hours = window_hours if window_hours is not None else current_app.config["NOTIFICATION_DUPLICATE_WINDOW_HOURS"]
+        report = apply_retention_policy(days, window_hours, batch_size=batch_size, dry_run=dry_run,
+                                        lookback_hours=None if full_scan else DUPLICATE_LOOKBACK_HOURS)
+        verb = "would be archived" if dry_run else "archived"
+        click.echo(f"{report['duplicates']} duplicate group notification(s) {verb}.")
+        click.echo(f"{report['expired']} notification(s) older than {days} days {verb}.")
+
+    @app.cli.command("reconcile-notification-counters")
+    def reconcile_notification_counters():
+        """Recompute the notification type counters from the table (run hourly from cron)."""
+        from extensions import db
+        from models.notifications_model import NotificationCounter
+        from utils.notification_counters import reconcile_counters
+
+        before = {c.name: int(c.value) for c in NotificationCounter.query.all()}
+        counts = reconcile_counters()
+        db.session.commit()
+        for name, value in counts.items():
+            drift = value - before.get(name, 0)
+            click.echo(f"{name:<26} {value:>10}" + (f"  (corrected by {drift:+d})" if drift else ""))
+
+    @app.cli.command("email-worker")
+    @click.option("--batch-size", default=50, show_default=True, help="Emails claimed per round.")
+    @click.option("--poll", default=5.0, show_default=True, help="Seconds to wait when the outbox is empty.")
+    def email_worker(batch_size, poll):
+        """
+        Deliver queued emails until interrupted. This is how deployments send
+        email: run it as its own service (systemd, supervisor, a container)
+        next to the web server, with EMAIL_WORKER_IN_PROCESS=0 for the web app.
+        """
+        from utils.email_outbox import EmailWorker
+
+        worker = EmailWorker(current_app._get_current_object(), batch_size=batch_size, poll_interval=poll)
+        click.echo(f"Email worker started ({worker.transport.name} transport). Ctrl+C to stop.")
+        worker.start()
+        try:
+            while worker.is_alive():
+                worker.join(1)
+        except KeyboardInterrupt:
+            worker.stop()
+            worker.join()
+
+    @app.cli.command("email-outbox")
+    @click.option("--requeue-dead", is_flag=True, help="Retry dead-lettered emails from scratch (except ones carrying a code).")
+    @click.option("--purge-sent", is_flag=True, help="Delete sent emails older than SENT_RETENTION_DAYS (run daily from cron).")
+    def email_outbox(requeue_dead, purge_sent):
+        """Show outbox counts by status."""
+        from utils.email_outbox import SENT_RETENTION_DAYS, outbox_stats, purge_sent as purge, requeue_dead as requeue
+
+        if requeue_dead:
+            click.echo(f"Requeued {requeue()} dead email(s) (expired password reset/verification codes are not resent).")
+        if purge_sent:
+            click.echo(f"Deleted {purge()} email(s) sent more than {SENT_RETENTION_DAYS} days ago.")
+        stats = outbox_stats()
+        for status in ("pending", "sending", "sent", "dead"):
+            click.echo(f"{status:<8} {stats.get(status, 0):>8}")
+
+    @app.cli.command("bench-email-outbox")
+    @click.option("--count", default=500, show_default=True, help="Emails to enqueue and deliver.")
+    @click.option("--batch-size", default=50, show_default=True, help="Emails claimed per round.")
+    @click.option("--latency", default=0.05, show_default=True, help="Simulated seconds per transport call.")
+    @click.option("--failure-rate", default=0.0, show_default=True, help="Fraction of sends that fail (retryable).")
+    def bench_email_outbox(count, batch_size, latency, failure_rate):
+        """Measure enqueue cost and outbox throughput against the stub transport (no real emails)."""
+        import time
+        from extensions import db
+        from models.email_outbox_model import EmailOutbox
+        from utils.email_outbox import enqueue_email, process_batch
+        from utils.email_transport import StubTransport
+
+        transport = StubTransport(latency=latency, failure_rate=failure_rate, seed=1)
+        html = "<p>benchmark</p>" * 50
+
+        start = time.perf_counter()
+        for i in range(count):
+            enqueue_email(f"bench{i}@example.com", "Benchmark", html, "benchmark")
+            db.session.commit()
+        enqueue_ms = (time.perf_counter() - start) * 1000 / count
+
+        totals = {"sent": 0, "retry": 0, "dead": 0}
+        start = time.perf_counter()
+        while True:
+            stats = process_batch(transport, batch_size, kind="benchmark")
+            if not stats["claimed"]:
+                break
+            for key in totals:
+                totals[key] += stats[key]
+        elapsed = time.perf_counter() - start
+
+        EmailOutbox.query.filter(EmailOutbox.kind == "benchmark").delete(synchronize_session=False)
+        db.session.commit()
+
+        click.echo(f"enqueue (request path): {enqueue_ms:.2f} ms per email")
+        click.echo(f"delivered {totals['sent']}/{count} in {elapsed:.2f} s "
+                   f"({totals['sent'] / elapsed if elapsed else 0:.0f} emails/s, {transport.calls} transport calls)")
+        click.echo(f"scheduled for retry: {totals['retry']}, dead-lettered: {totals['dead']}")
+
+    @app.cli.command("send-notification-digests")
+    @click.option("--window-hours", default=None, type=int, help="Look-back window (default: NOTIFICATION_DIGEST_WINDOW_HOURS).")
+    @click.option("--batch-size", default=500, show_default=True, help="Recipients per Brevo API call.")
+    @click.option("--rate", default=2.0, show_default=True, help="Maximum API calls per second.")
+    @click.option("--dry-run", is_flag=True, help="Only count the digests that would be sent.")
+    def send_notification_digests(window_hours, batch_size, rate, dry_run):
+        """Email each user a digest of their unseen group notifications (run from cron, e.g. daily)."""
+        from utils.email_transport import create_transport
+        from utils.notification_digest import collect_digests, send_digests
+
+        window_hours = window_hours if window_hours is not None else current_app.config["NOTIFICATION_DIGEST_WINDOW_HOURS"]
+        digests = collect_digests(window_hours)
+        if dry_run:
+            click.echo(f"{len(digests)} digest(s) would be sent.")
+            return
+        transport = create_transport(current_app.config.get("EMAIL_TRANSPORT"))
+        report = send_digests(transport, digests, batch_size=batch_size, calls_per_second=rate)
+        click.echo(f"{report['sent']}/{report['digests']} digest(s) sent in {report['calls']} API call(s), "
+                   f"{report['failed']} failed.")
+
+    @app.cli.command("bench-email-template")
+    @click.option("--count", default=1000, show_default=True, help="Emails to render and dispatch.")
+    def bench_email_template(count):
+        """Benchmark email render + dispatch per email: precompiled vs per-call template and API client."""
+        import statistics
+        import time
+        import sib_api_v3_sdk
+        from jinja2 import Environment, FileSystemLoader
+        from utils.email_templates import TEMPLATE_DIR, EmailTemplate, get_email_template
+        from utils.email_transport import DEFAULT_SENDER, StubTransport, get_brevo_api
+
+        def measure(fn):
+            timings = []
+            for i in range(count):
+                start = time.perf_counter()
+                fn(i)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            return (f"mean {statistics.mean(timings):.3f} ms, p50 {timings[len(timings) // 2]:.3f} ms, "
+                    f"p99 {timings[int(len(timings) * 0.99) - 1]:.3f} ms")
+
+        start = time.perf_counter()
+        EmailTemplate("welcome.html")
+        build_ms = (time.perf_counter() - start) * 1000
+        template = get_email_template("welcome.html")
+        transport = StubTransport()
+
+        def per_call_template(i):
+            env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=True)
+            return env.get_template("welcome.html").render(user_name=f"User {i}", login_url="http://localhost:3000/login")
+
+        def per_call_client(i):
+            configuration = sib_api_v3_sdk.Configuration()
+            api = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+            return sib_api_v3_sdk.SendSmtpEmail(to=[{"email": f"user{i}@example.com"}], sender=DEFAULT_SENDER,
+                                                subject="Welcome", html_content=per_call_template(i)), api
+
+        def shared_client(i):
+            html = template.render(user_name=f"User {i}")
+            transport.send([{"recipient": f"user{i}@example.com", "subject": "Welcome", "html": html}])
+            return sib_api_v3_sdk.SendSmtpEmail(to=[{"email": f"user{i}@example.com"}], sender=DEFAULT_SENDER,
+                                                subject="Welcome", html_content=html), get_brevo_api()
+
+        click.echo(f"template build (once per process): {build_ms:.2f} ms, "
+                   f"{'precompiled chunks' if template.precompiled else 'jinja render'}")
+        click.echo(f"render, template compiled per call:   {measure(per_call_template)}")
+        click.echo(f"render, precompiled:                  {measure(lambda i: template.render(user_name=f'User {i}'))}")
+        click.echo(f"render + dispatch, per-call client:   {measure(per_call_client)}")
+        click.echo(f"render + dispatch, shared client:     {measure(shared_client)}")
+        click.echo("(dispatch excludes the network round-trip; the stub transport stands in for Brevo)")
+
+    @app.cli.command("sweep-ttl-store")
+    def sweep_ttl_store():
+        """Delete expired verification codes and reset grants (run from cron, e.g. hourly)."""
+        from utils.ttl_store import get_verification_store
+
+        click.echo(f"Removed {get_verification_store().sweep()} expired entr(ies).")
+
+    @app.cli.command("bench-email-breaker")
+    @click.option("--threads", default=8, show_default=True, help="Concurrent senders.")
+    @click.option("--phase-seconds", default=3.0, show_default=True, help="Length of each phase.")
+    @click.option("--timeout", default=0.5, show_default=True, help="Simulated read timeout (s).")
+    def bench_email_breaker(threads, phase_seconds, timeout):
+        """Drive the stub transport through healthy -> outage -> recovery, with and without the breaker."""
+        import threading
+        import time
+        from utils.circuit_breaker import CircuitBreaker
+        from utils.email_transport import GuardedTransport, StubTransport
+
+        def run(guarded):
+            stub = StubTransport(latency=0.02, timeout=timeout)
+            breaker = CircuitBreaker("bench", failure_threshold=5, reset_timeout=1.0)
+            transport = GuardedTransport(stub, breaker) if guarded else stub
+            phases = [("healthy", 0.02), ("outage", timeout * 4), ("recovered", 0.02)]
+            report = {name: {"ok": 0, "failed": 0, "rejected": 0, "timings": []} for name, _ in phases}
+            lock = threading.Lock()
+            current = {"phase": phases[0][0]}
+            stop = threading.Event()
+
+            def sender():
+                message = {"recipient": "bench@example.com", "subject": "Benchmark", "html": "<p>x</p>"}
+                while not stop.is_set():
+                    phase = current["phase"]
+                    start = time.perf_counter()
+                    result = transport.send([message])[0]
+                    elapsed = (time.perf_counter() - start) * 1000
+                    with lock:
+                        stats = report[phase]
+                        stats["timings"].append(elapsed)
+                        outcome = "ok" if result.ok else ("rejected" if not result.attempted else "failed")
+                        stats[outcome] += 1
+                    if not result.attempted:
+                        time.sleep(0.005)
+
+            workers = [threading.Thread(target=sender, daemon=True) for _ in range(threads)]
+            for worker in workers:
+                worker.start()
+            for name, latency in phases:
+                current["phase"] = name
+                stub.latency = latency
+                time.sleep(phase_seconds)
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+            click.echo(f"{'with' if guarded else 'without'} circuit breaker:")
+            for name, stats in report.items():
+                timings = sorted(stats["timings"]) or [0]
+                click.echo(f"  {name:<10} ok {stats['ok']:>6}  failed {stats['failed']:>5}  fast-failed {stats['rejected']:>6}  "
+                           f"p50 {timings[len(timings) // 2]:8.1f} ms  p99 {timings[int(len(timings) * 0.99) - 1]:8.1f} ms")
+            if guarded:
+                click.echo(f"  breaker: {breaker.health()}")
+
+        run(guarded=False)
+        run(guarded=True)
+
+    @app.cli.command("bench-login")
+    @click.option("--methods", default="pbkdf2:sha256:600000,pbkdf2:sha256:1000000,scrypt:16384:8:1,scrypt:32768:8:1",
+                  show_default=True, help="Comma-separated hash methods to compare.")
+    @click.option("--count", default=50, show_default=True, help="Logins per method.")
+    @click.option("--concurrency", default=4, show_default=True, help="Concurrent clients.")
+    def bench_login(methods, count, concurrency):
+        """Login p50/p99 and throughput per hashing method, through the real /api/login route."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from datetime import datetime
+        from extensions import db
+        from models.users_model import User
+        from utils import passwords
+
+        email, password = "bench-login@example.invalid", "bench-login-password"
+        user = User(firstname="Bench", lastname="Login", email=email, password="-", role="Tenant",
+                    datecreated=datetime.utcnow())
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.userid
+
+        flask_app = current_app._get_current_object()
+
+        def login(_):
+            client = flask_app.test_client()
+            start = time.perf_counter()
+            response = client.post("/api/login", json={"email": email, "password": password})
+            return (time.perf_counter() - start) * 1000, response.status_code
+
+        configured = passwords.PASSWORD_HASH_METHOD
+        click.echo(f"{count} logins per method, {concurrency} concurrent clients, "
+                   f"{passwords.PASSWORD_HASH_WORKERS} hash workers")
+        try:
+            for method in [m.strip() for m in methods.split(",") if m.strip()]:
+                # Run as if `method` were configured; the stored hash matches it, so login never rehashes
+                passwords.PASSWORD_HASH_METHOD = method
+                User.query.filter_by(userid=user_id).update({"password": passwords.hash_password(password)})
+                db.session.commit()
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    results = list(pool.map(login, range(count)))
+                elapsed = time.perf_counter() - start
+                timings = sorted(ms for ms, _ in results)
+                failures = sum(1 for _, status in results if status != 200)
+                click.echo(f"{method:<24} p50 {timings[len(timings) // 2]:8.1f} ms  "
+                           f"p99 {timings[max(int(len(timings) * 0.99) - 1, 0)]:8.1f} ms  "
+                           f"{count / elapsed:7.1f} logins/s" + (f"  ({failures} failed)" if failures else ""))
+        finally:
+            passwords.PASSWORD_HASH_METHOD = configured
+            User.query.filter_by(userid=user_id).delete()
+            db.session.commit()
@@ -2,6 +2,10 @@ from extensions import db
 
 class Contract(db.Model):
     __tablename__ = "Contracts"  # ✅ matches your database table
+    __table_args__ = (
+        # Expiry scans: WHERE status = 'Active' AND enddate BETWEEN ...
+        db.Index("ix_contracts_status_enddate", "status", "enddate"),
+    )
     contractid = db.Column(db.Integer, primary_key=True)
     tenantid = db.Column(db.Integer, db.ForeignKey('Tenants.tenantid'))
     unitid = db.Column(db.Integer, db.ForeignKey('Units.unitid'))
@@ -10,6 +14,12 @@ class Contract(db.Model):
     status = db.Column(db.String(50))
     generated_contract = db.Column(db.String(255))
     signed_contract = db.Column(db.String(255))
+    reminded_enddate = db.Column(db.String(50))  # enddate the renewal reminder was sent for
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
+    # ✅ Optimistic locking: every UPDATE is "... WHERE contractid = ? AND version = ?"
+    # and raises StaleDataError if another request changed the row first.
+    __mapper_args__ = {"version_id_col": version}
 
     def to_dict(self):
         return {
@@ -21,5 +31,6 @@ class Contract(db.Model):
             "rent_amount": self.rent_amount,
             "status": self.status,
             "generated_contract": self.generated_contract,
-            "signed_contract": self.signed_contract
+            "signed_contract": self.signed_contract,
+            "version": self.version
         }
\ No newline at end of file
@@ -0,0 +1,38 @@
+from extensions import db
+from models.notifications_model import get_ph_time
+
+
+class EmailOutbox(db.Model):
+    """Emails waiting for (or done with) delivery by the outbox worker."""
+    __tablename__ = "EmailOutbox"
+    __table_args__ = (
+        # Worker claim: WHERE status IN (...) AND nextattemptat <= now ORDER BY emailid
+        db.Index("ix_emailoutbox_status_next", "status", "nextattemptat"),
+    )
+    emailid = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # password_reset, welcome, ...
+    recipient = db.Column(db.String(255), nullable=False)
+    recipientname = db.Column(db.String(255))
+    subject = db.Column(db.String(255), nullable=False)
+    htmlcontent = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, sending, sent, dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    nextattemptat = db.Column(db.DateTime, default=get_ph_time)
+    lasterror = db.Column(db.Text)
+    messageid = db.Column(db.String(255))
+    createddate = db.Column(db.DateTime, default=get_ph_time)
+    sentdate = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "emailid": self.emailid,
+            "kind": self.kind,
+            "recipient": self.recipient,
+            "subject": self.subject,
+            "status": self.status,
+            "attempts": self.attempts,
+            "nextattemptat": self.nextattemptat.isoformat() if self.nextattemptat else None,
+            "lasterror": self.lasterror,
+            "createddate": self.createddate.isoformat() if self.createddate else None,
+            "sentdate": self.sentdate.isoformat() if self.sentdate else None
+        }
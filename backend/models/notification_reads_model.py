@@ -0,0 +1,30 @@
+from extensions import db
+from models.notifications_model import get_ph_time
+
+
+class NotificationWatermark(db.Model):
+    """Per-user read watermark: every notification with id <= lastreadid is read."""
+    __tablename__ = "NotificationWatermarks"
+    userid = db.Column(db.Integer, primary_key=True)
+    lastreadid = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    updatedat = db.Column(db.DateTime, default=get_ph_time, onupdate=get_ph_time)
+
+
+class NotificationRead(db.Model):
+    """Sparse read state: one row per notification read above the user's watermark."""
+    __tablename__ = "NotificationReads"
+    userid = db.Column(db.Integer, primary_key=True)
+    notificationid = db.Column(
+        db.Integer,
+        db.ForeignKey("Notifications.notificationid", ondelete="CASCADE"),
+        primary_key=True
+    )
+    readdate = db.Column(db.DateTime, default=get_ph_time)
+
+
+class NotificationDigest(db.Model):
+    """Per-user email digest cursor: group notifications with id <= lastnotificationid were already emailed."""
+    __tablename__ = "NotificationDigests"
+    userid = db.Column(db.Integer, primary_key=True)
+    lastnotificationid = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    lastsentdate = db.Column(db.DateTime, default=get_ph_time)
@@ -9,6 +9,13 @@ def get_ph_time():
 
 class Notification(db.Model):
     __tablename__ = "Notifications"
+    __table_args__ = (
+        # Inbox lookups: (role OR user) AND notificationid > watermark
+        db.Index("ix_notifications_role_id", "targetuserrole", "notificationid"),
+        db.Index("ix_notifications_user_id", "targetuserid", "notificationid"),
+        # Retention: WHERE creationdate < cutoff
+        db.Index("ix_notifications_creationdate", "creationdate"),
+    )
     notificationid = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     message = db.Column(db.Text, nullable=False)
@@ -30,4 +37,27 @@ class Notification(db.Model):
             "recipientcount": self.recipientcount,
             "createdbyuserid": self.createdbyuserid,
             "creationdate": self.creationdate.isoformat() if self.creationdate else None
-        }
\ No newline at end of file
+        }
+
+
+class NotificationArchive(db.Model):
+    """Notifications moved out of the hot table by the retention job (same ids)."""
+    __tablename__ = "NotificationsArchive"
+    notificationid = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(255), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    targetuserrole = db.Column(db.String(50), nullable=True)
+    targetuserid = db.Column(db.Integer, nullable=True)
+    isgroupnotification = db.Column(db.Boolean, default=False)
+    recipientcount = db.Column(db.Integer, default=1)
+    createdbyuserid = db.Column(db.Integer, nullable=True)
+    creationdate = db.Column(db.DateTime)
+    archiveddate = db.Column(db.DateTime, default=get_ph_time)
+    archivereason = db.Column(db.String(20))  # 'expired' or 'duplicate'
+
+
+class NotificationCounter(db.Model):
+    """Running notification totals for the admin stats widget, kept in step with inserts/deletes."""
+    __tablename__ = "NotificationCounters"
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
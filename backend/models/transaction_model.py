@@ -2,6 +2,11 @@ from extensions import db
 
 class Transaction(db.Model):
     __tablename__ = "Transactions"  # ✅ matches your database table
+    __table_args__ = (
+        # Keyset pagination on /transactions/all: ORDER BY paymentdate DESC, transactionid DESC
+        db.Index("ix_transactions_paymentdate", "paymentdate", "transactionid"),
+        db.Index("ix_transactions_tenant_paymentdate", "tenantid", "paymentdate"),
+    )
     transactionid = db.Column(db.Integer, primary_key=True)
     billid = db.Column(db.Integer, db.ForeignKey('Bills.billid'))
     tenantid = db.Column(db.Integer, db.ForeignKey('Tenants.tenantid'))
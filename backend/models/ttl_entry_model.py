@@ -0,0 +1,13 @@
+from extensions import db
+
+
+class TTLEntry(db.Model):
+    """Short-lived key/value entries (verification codes, reset grants) shared by all workers."""
+    __tablename__ = "TTLEntries"
+    __table_args__ = (
+        # Sweep: DELETE WHERE expiresat <= now
+        db.Index("ix_ttlentries_expiresat", "expiresat"),
+    )
+    key = db.Column(db.String(255), primary_key=True)
+    value = db.Column(db.Text, nullable=False)  # JSON
+    expiresat = db.Column(db.Float, nullable=False)  # unix timestamp
@@ -1,5 +1,5 @@
 from extensions import db
-from werkzeug.security import check_password_hash, generate_password_hash
+from utils.passwords import hash_password, verify_password
 
 class User(db.Model):
     __tablename__ = "Users"
@@ -23,7 +23,7 @@ class User(db.Model):
 
     # Optional helper
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return verify_password(self.password, password)
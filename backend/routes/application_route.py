@@ -6,7 +6,7 @@ from extensions import db
 from models.applications_model import Application
 from models.users_model import User
 from models.units_model import House as Unit
-from models.notifications_model import Notification
+from utils.notification_service import notify_owners, notify_user
 
 application_bp = Blueprint("application_bp", __name__)
 
@@ -28,9 +28,6 @@ def apply_unit():
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    # Get ALL landlords in the system
-    all_landlords = User.query.filter_by(role='Owner').all()
-
     # Base folder setup
     base_folder = current_app.config["UPLOAD_FOLDER"]
     folders = {
@@ -83,27 +80,19 @@ def apply_unit():
             application_id = new_app.applicationid
 
         # ✅ Create UNIFIED notification for ALL landlords (single notification)
-        if all_landlords:
-            landlord_notification = Notification(
-                title='New Rental Application',
-                message=f'{user.firstname} {user.lastname} has submitted a new rental application. Application ID: #{application_id}',
-                targetuserrole='Owner',  # Target all landlords
-                isgroupnotification=True,
-                recipientcount=len(all_landlords),
-                createdbyuserid=user_id  # The tenant who created the application
-            )
-            db.session.add(landlord_notification)
+        notify_owners(
+            'New Rental Application',
+            f'{user.firstname} {user.lastname} has submitted a new rental application. Application ID: #{application_id}',
+            created_by=user_id  # The tenant who created the application
+        )
 
         # ✅ Create individual notification for tenant
-        tenant_notification = Notification(
-            title='Application Submitted',
-            message=f'Your rental application has been submitted successfully. Application ID: #{application_id}',
-            targetuserid=user_id,  # Specific to this tenant
-            isgroupnotification=False,
-            recipientcount=1,
-            createdbyuserid=user_id
+        notify_user(
+            user_id,
+            'Application Submitted',
+            f'Your rental application has been submitted successfully. Application ID: #{application_id}',
+            created_by=user_id
         )
-        db.session.add(tenant_notification)
 
         db.session.commit()
         return jsonify({"message": "Application submitted successfully!", "application_id": application_id})
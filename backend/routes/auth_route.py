@@ -3,9 +3,10 @@ from extensions import db
 from models.users_model import User
 from models.applications_model import Application
 from models.tenants_model import Tenant
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
 from flask_jwt_extended import create_access_token
+from utils.passwords import HashPoolBusy, hash_password, verify_and_update
+from utils.principal import load_login_principal
 
 
 auth_bp = Blueprint("auth_bp", __name__)
@@ -40,7 +41,7 @@ def register():
 
     try:
         # --- Hash password ---
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
 
         # --- Create User ---
         new_user = User(
@@ -92,6 +93,10 @@ def register():
 
         return jsonify({"message": "User, application, and tenant created successfully!"}), 201
 
+    except HashPoolBusy:
+        db.session.rollback()
+        return jsonify({"message": "Server busy, please try again."}), 503, {"Retry-After": "1"}
+
     except Exception as e:
         # --- Rollback on any error ---
         db.session.rollback()
@@ -117,34 +122,33 @@ def login():
     if not all([email, password]):
         return jsonify({"message": "Email and password required"}), 400
 
-    user = User.query.filter_by(email=email).first()
+    # ✅ One query: user columns + application status + tenant
+    user = load_login_principal(email)
     if not user:
         return jsonify({"message": "User not found"}), 404
 
-    if not user.check_password(password):
+    try:
+        password_ok, new_hash = verify_and_update(user.password, password)
+    except HashPoolBusy:
+        return jsonify({"message": "Server busy, please try again."}), 503, {"Retry-After": "1"}
+    if not password_ok:
         return jsonify({"message": "Incorrect password"}), 401
 
-    application = Application.query.filter_by(userid=user.userid).first()
-    
-    # ✅ Debug: Check what's happening with tenant lookup
-    print(f"Looking for tenant with userid: {user.userid} (type: {type(user.userid)})")
-    
-    tenant = Tenant.query.filter_by(userid=user.userid).first()
-    
-    print(f"Tenant found: {tenant}")
-    if tenant:
-        print(f"Tenant ID: {tenant.tenantid}")
-        print(f"Tenant UserID: {tenant.userid} (type: {type(tenant.userid)})")
-        print(f"Tenant Status: {tenant.status}")  # ✅ Added status debug
-    else:
-        print("❌ NO TENANT RECORD FOUND!")
+    # ✅ Hash made with older parameters: store it again with the configured method
+    if new_hash:
+        try:
+            User.query.filter_by(userid=user.userid).update({"password": new_hash}, synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print("Password rehash error:", str(e))
 
     # ✅ Generate JWT token
     access_token = create_access_token(
         identity={
             "userid": user.userid,
             "role": user.role,
-            "tenantid": tenant.tenantid if tenant else None
+            "tenantid": user.tenantid
         },
         expires_delta=timedelta(hours=1)
     )
@@ -159,7 +163,7 @@ def login():
             "middlename": user.middlename,
             "email": user.email,
             "role": user.role,
-            "application_status": application.status if application else "No Application",
-            "tenant_status": tenant.status if tenant else "No Tenant"  # ✅ Added tenant status
+            "application_status": user.application_status or "No Application",
+            "tenant_status": user.tenant_status or "No Tenant"  # ✅ Added tenant status
         }
     }), 200
\ No newline at end of file
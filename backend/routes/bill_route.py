@@ -6,7 +6,7 @@ from models.users_model import User
 from models.units_model import House as Unit
 from models.contracts_model import Contract
 from models.bills_model import Bill
-from models.notifications_model import Notification
+from utils.notification_service import notify_owners, notify_user
 from werkzeug.utils import secure_filename
 import os
 import logging
@@ -165,15 +165,12 @@ def create_bill():
             formatted_amount = f"₱{float(amount):,.2f}"
             due_date_str = safe_strftime(duedate) if duedate else "Not specified"
             
-            tenant_notification = Notification(
-                title='New Bill Issued',
-                message=f'New {billtype} bill for {formatted_amount} has been issued. Due date: {due_date_str}',
-                targetuserid=tenant.userid,
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                'New Bill Issued',
+                f'New {billtype} bill for {formatted_amount} has been issued. Due date: {due_date_str}',
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
         db.session.commit()
         
@@ -431,28 +428,19 @@ def pay_bill(bill_id):
         # ✅ Create notification for tenant
         tenant = Tenant.query.filter_by(tenantid=bill.tenantid).first()
         if tenant:
-            tenant_notification = Notification(
-                title='Payment Submitted',
-                message=f'Your payment for bill #{bill_id} has been submitted and is awaiting validation.',
-                targetuserid=tenant.userid,
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                'Payment Submitted',
+                f'Your payment for bill #{bill_id} has been submitted and is awaiting validation.',
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
         # ✅ Create notification for ALL landlords
-        all_landlords = User.query.filter_by(role='Owner').all()
-        if all_landlords:
-            landlord_notification = Notification(
-                title='New Payment Submitted',
-                message=f'Tenant has submitted a payment for bill #{bill_id}. Status: For Validation',
-                targetuserrole='Owner',
-                isgroupnotification=True,
-                recipientcount=len(all_landlords),
-                createdbyuserid=tenant.userid if tenant else None
-            )
-            db.session.add(landlord_notification)
+        notify_owners(
+            'New Payment Submitted',
+            f'Tenant has submitted a payment for bill #{bill_id}. Status: For Validation',
+            created_by=tenant.userid if tenant else None
+        )
 
         db.session.commit()
         logger.info(f"✅ Bill {bill_id} marked as 'For Validation'")
@@ -481,15 +469,12 @@ def approve_bill_payment(bill_id):
         # ✅ Create notification for tenant
         tenant = Tenant.query.filter_by(tenantid=bill.tenantid).first()
         if tenant:
-            tenant_notification = Notification(
-                title='Payment Approved',
-                message=f'Your payment for bill #{bill_id} has been approved. Thank you!',
-                targetuserid=tenant.userid,
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                'Payment Approved',
+                f'Your payment for bill #{bill_id} has been approved. Thank you!',
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
         db.session.commit()
         logger.info(f"✅ Payment approved for bill {bill_id}")
@@ -524,15 +509,12 @@ def reject_bill_payment(bill_id):
         # ✅ Create notification for tenant
         tenant = Tenant.query.filter_by(tenantid=bill.tenantid).first()
         if tenant:
-            tenant_notification = Notification(
-                title='Payment Rejected',
-                message=f'Your payment for bill #{bill_id} was rejected. Reason: {reason}. Please try again.',
-                targetuserid=tenant.userid,
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                'Payment Rejected',
+                f'Your payment for bill #{bill_id} was rejected. Reason: {reason}. Please try again.',
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
         db.session.commit()
         logger.info(f"❌ Payment rejected for bill {bill_id}. Reason: {reason}")
@@ -848,15 +830,12 @@ def create_automated_bill():
             formatted_amount = f"₱{float(data['amount']):,.2f}"
             due_date_str = due_date.strftime("%Y-%m-%d")
             
-            tenant_notification = Notification(
-                title='New Automated Bill Issued',
-                message=f'New {data["billType"]} bill for {formatted_amount} has been automatically issued. Due date: {due_date_str}',
-                targetuserid=tenant.userid,
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                'New Automated Bill Issued',
+                f'New {data["billType"]} bill for {formatted_amount} has been automatically issued. Due date: {due_date_str}',
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
         db.session.commit()
         
@@ -914,15 +893,12 @@ def create_all_automated_bills():
                 formatted_amount = f"₱{float(bill_data['amount']):,.2f}"
                 due_date_str = due_date.strftime("%Y-%m-%d")
                 
-                tenant_notification = Notification(
-                    title='New Automated Bill Issued',
-                    message=f'New {bill_data["billType"]} bill for {formatted_amount} has been automatically issued. Due date: {due_date_str}',
-                    targetuserid=tenant.userid,
-                    isgroupnotification=False,
-                    recipientcount=1,
-                    createdbyuserid=tenant.userid
+                notify_user(
+                    tenant.userid,
+                    'New Automated Bill Issued',
+                    f'New {bill_data["billType"]} bill for {formatted_amount} has been automatically issued. Due date: {due_date_str}',
+                    created_by=tenant.userid
                 )
-                db.session.add(tenant_notification)
 
         db.session.commit()
         
@@ -997,15 +973,12 @@ def mark_bill_as_paid(bill_id):
         # Create notification for tenant
         tenant = Tenant.query.filter_by(tenantid=bill.tenantid).first()
         if tenant:
-            tenant_notification = Notification(
-                title='Payment Recorded',
-                message=f'Your bill #{bill_id} has been marked as paid by the landlord.',
-                targetuserid=tenant.userid,
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                'Payment Recorded',
+                f'Your bill #{bill_id} has been marked as paid by the landlord.',
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
         db.session.commit()
         logger.info(f"✅ Bill {bill_id} marked as paid manually")
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
 from models.concerns_model import Concern
-from models.notifications_model import Notification
+from utils.notification_service import notify_owners, notify_user
 from werkzeug.utils import secure_filename
 import os
 from datetime import datetime
@@ -64,28 +64,19 @@ def add_concern():
         tenant = Tenant.query.filter_by(tenantid=tenantid).first()
         if tenant:
             # ✅ Create UNIFIED notification for tenant
-            tenant_notification = Notification(
-                title='Concern Submitted',
-                message=f'Your {concerntype} concern "{subject}" has been submitted successfully. We will review it soon.',
-                targetuserid=tenant.userid,  # Specific to this tenant
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                'Concern Submitted',
+                f'Your {concerntype} concern "{subject}" has been submitted successfully. We will review it soon.',
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
             # ✅ Create UNIFIED notification for ALL landlords
-            all_landlords = User.query.filter_by(role='Owner').all()
-            if all_landlords:
-                landlord_notification = Notification(
-                    title='New Concern Reported',
-                    message=f'New {concerntype} concern reported by tenant: "{subject}"',
-                    targetuserrole='Owner',  # Target all landlords
-                    isgroupnotification=True,
-                    recipientcount=len(all_landlords),
-                    createdbyuserid=tenant.userid
-                )
-                db.session.add(landlord_notification)
+            notify_owners(
+                'New Concern Reported',
+                f'New {concerntype} concern reported by tenant: "{subject}"',
+                created_by=tenant.userid
+            )
 
         db.session.commit()
 
@@ -213,29 +204,20 @@ def update_concern(concernid):
             message = status_messages.get(status, f'Your concern status has been updated to {status}.')
 
             # ✅ Create UNIFIED notification for tenant
-            tenant_notification = Notification(
-                title=f'Concern {status}',
-                message=message,
-                targetuserid=tenant.userid,  # Specific to this tenant
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                f'Concern {status}',
+                message,
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
             # ✅ Create UNIFIED notification for ALL landlords for important status changes
             if status in ["Resolved", "In Progress"]:
-                all_landlords = User.query.filter_by(role='Owner').all()
-                if all_landlords:
-                    landlord_notification = Notification(
-                        title=f'Concern {status}',
-                        message=f'Concern "{concern.subject}" has been marked as {status}.',
-                        targetuserrole='Owner',  # Target all landlords
-                        isgroupnotification=True,
-                        recipientcount=len(all_landlords),
-                        createdbyuserid=tenant.userid
-                    )
-                    db.session.add(landlord_notification)
+                notify_owners(
+                    f'Concern {status}',
+                    f'Concern "{concern.subject}" has been marked as {status}.',
+                    created_by=tenant.userid
+                )
 
         db.session.commit()
 
@@ -364,15 +346,12 @@ def add_concern_comment(concernid):
         tenant = Tenant.query.filter_by(tenantid=concern.tenantid).first()
         if tenant:
             # ✅ Create UNIFIED notification for tenant
-            tenant_notification = Notification(
-                title='Update on Your Concern',
-                message=f'New update on your concern "{concern.subject}": {comment}',
-                targetuserid=tenant.userid,  # Specific to this tenant
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                'Update on Your Concern',
+                f'New update on your concern "{concern.subject}": {comment}',
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
         db.session.commit()
 
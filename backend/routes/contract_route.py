@@ -7,15 +7,27 @@ from models.tenants_model import Tenant
 from models.units_model import House as Unit
 from models.applications_model import Application
 from models.users_model import User
-from models.notifications_model import Notification
+from utils.notification_service import notify_owners, notify_user
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 import os, traceback
-from flask import send_from_directory
+from utils.file_delivery import send_upload
+from utils.pdf_optimizer import prepare_signature, optimize_pdf
+from utils.artifact_store import pending_path, store_file
 from PyPDF2 import PdfReader, PdfWriter
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.exc import StaleDataError
 
 contract_bp = Blueprint("contract_bp", __name__)
 
+CONFLICT_MESSAGE = "Contract was modified by another request. Please refresh and try again."
+
+
+def is_stale(contract, data):
+    """True if the client sent the contract version it last saw and the row has moved on."""
+    expected = data.get("version")
+    return expected is not None and str(expected) != str(contract.version)
+
 # ✅ Fetch existing contracts
 @contract_bp.route("/contracts/tenants", methods=["GET"])
 def get_tenant_contracts():
@@ -32,7 +44,8 @@ def get_tenant_contracts():
             Contract.startdate,
             Contract.enddate,
             Contract.status,
-            Contract.signed_contract
+            Contract.signed_contract,
+            Contract.version
         )
         .join(Tenant, Contract.tenantid == Tenant.tenantid)
         .join(User, Tenant.userid == User.userid)
@@ -51,9 +64,10 @@ def get_tenant_contracts():
             "start_date": start_date.strftime("%Y-%m-%d"),
             "end_date": end_date.strftime("%Y-%m-%d") if end_date else None,
             "status": status,
-            "signed_contract": signed_contract
+            "signed_contract": signed_contract,
+            "version": version
         }
-        for contractid, tenantid, firstname, middlename, lastname, image, unit_name, unit_price, start_date, end_date, status, signed_contract in contracts
+        for contractid, tenantid, firstname, middlename, lastname, image, unit_name, unit_price, start_date, end_date, status, signed_contract, version in contracts
     ]
 
     return jsonify(result)
@@ -62,10 +76,31 @@ def get_tenant_contracts():
 # ✅ Applicants ready for contracts
 @contract_bp.route("/contracts/applicants", methods=["GET"])
 def get_applicants_for_contract():
-    applicants = (
+    # Optional server-side pagination: ?page=1&per_page=20
+    page = request.args.get("page", type=int)
+    per_page = request.args.get("per_page", 20, type=int)
+
+    # ✅ Eligibility is decided in SQL: applicants whose tenant record has no contract yet
+    has_contract = (
+        db.session.query(Contract.contractid)
+        .filter(Contract.tenantid == Tenant.tenantid)
+        .exists()
+    )
+
+    # One tenant row per user (the first, as Tenant.query...first() did) so the join never duplicates applicants
+    other_tenant = aliased(Tenant)
+    first_tenant = (
+        db.session.query(db.func.min(other_tenant.tenantid))
+        .filter(other_tenant.userid == User.userid)
+        .correlate(User)
+        .scalar_subquery()
+    )
+
+    query = (
         db.session.query(
             Application.applicationid,
             User.userid,
+            Tenant.tenantid,
             User.firstname,
             User.middlename,
             User.lastname,
@@ -74,27 +109,27 @@ def get_applicants_for_contract():
             Unit.unitid,
             Unit.name.label("unit_name"),
             Unit.price.label("unit_price"),
-            Application.status
+            Application.status,
+            db.func.count().over().label("total_count")
         )
         .join(User, User.userid == Application.userid)
         .join(Unit, Unit.unitid == Application.unitid)
+        .outerjoin(Tenant, Tenant.tenantid == first_tenant)
         .filter(Application.status == "Pending")
-        .all()
+        .filter(db.or_(Tenant.tenantid.is_(None), ~has_contract))
+        .order_by(Application.applicationid)
     )
 
-    result = []
-    for (
-        applicationid, userid, firstname, middlename, lastname,
-        email, phone, unitid, unit_name, unit_price, status
-    ) in applicants:
-        tenant = Tenant.query.filter_by(userid=userid).first()
-        tenantid = tenant.tenantid if tenant else None
+    filtered = query
+    if page:
+        page = max(page, 1)
+        per_page = min(max(per_page, 1), 100)
+        query = query.limit(per_page).offset((page - 1) * per_page)
 
-        # Skip if already has contract
-        if tenant and Contract.query.filter_by(tenantid=tenantid).first():
-            continue
+    applicants = query.all()
 
-        result.append({
+    result = [
+        {
             "applicationid": applicationid,
             "userid": userid,
             "tenantid": tenantid,
@@ -105,9 +140,21 @@ def get_applicants_for_contract():
             "unit_name": unit_name,
             "unit_price": unit_price,
             "status": status
-        })
+        }
+        for (
+            applicationid, userid, tenantid, firstname, middlename, lastname,
+            email, phone, unitid, unit_name, unit_price, status, total_count
+        ) in applicants
+    ]
 
-    return jsonify(result)
+    response = jsonify(result)
+    if page:
+        # Total comes from the same query via COUNT(*) OVER (); a page past the end needs its own COUNT
+        total = applicants[0].total_count if applicants else filtered.order_by(None).count()
+        response.headers["X-Total-Count"] = str(total)
+        response.headers["X-Page"] = str(page)
+        response.headers["X-Per-Page"] = str(per_page)
+    return response
 
 
 # ✅ Generate Contract PDF
@@ -122,7 +169,6 @@ def generate_contract_pdf():
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
-    from PIL import Image
 
     try:
         data = request.get_json()
@@ -140,17 +186,16 @@ def generate_contract_pdf():
             return jsonify({"error": "Missing tenant information"}), 400
 
         contracts_folder = os.path.join(current_app.config["UPLOAD_FOLDER"], "contracts")
-        os.makedirs(contracts_folder, exist_ok=True)
-
-        filename = f"contract_{tenant_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
-        file_path = os.path.join(contracts_folder, filename)
+        # Scratch file; renamed to contract_<sha256>.pdf once the PDF is final
+        file_path = pending_path(contracts_folder)
 
         # ✅ Create professional PDF document
         doc = SimpleDocTemplate(
             file_path,
             pagesize=letter,
             topMargin=0.5*inch,
-            bottomMargin=0.5*inch
+            bottomMargin=0.5*inch,
+            invariant=1  # reproducible bytes, so regenerating an unchanged contract reuses the stored file
         )
         
         story = []
@@ -315,19 +360,9 @@ def generate_contract_pdf():
                 packet = io.BytesIO()
                 can = canvas.Canvas(packet, pagesize=letter)
                 
-                # Process owner signature
+                # Process owner signature (white background, downscaled to its printed size)
                 img_data = base64.b64decode(owner_signature_data.split(",")[1])
-                sig_image = Image.open(io.BytesIO(img_data))
-
-                # Fix transparency to white background
-                if sig_image.mode == "RGBA":
-                    white_bg = Image.new("RGB", sig_image.size, (255, 255, 255))
-                    white_bg.paste(sig_image, mask=sig_image.split()[3])
-                    sig_image = white_bg
-
-                img_buffer = io.BytesIO()
-                sig_image.save(img_buffer, format="PNG")
-                img_buffer.seek(0)
+                img_buffer = prepare_signature(img_data, 120, 40)
                 signature_reader = ImageReader(img_buffer)
 
                 # UPDATED: Position for landlord signature - aligned horizontally with tenant
@@ -358,6 +393,10 @@ def generate_contract_pdf():
             except Exception as sig_error:
                 print(f"Signature addition failed, but PDF was generated: {sig_error}")
 
+        # ✅ Shrink the stored file (stream compression, image downscaling, dedup)
+        optimize_pdf(file_path)
+        filename = store_file(file_path, "contract")
+
         public_url = f"http://localhost:5000/uploads/contracts/{filename}"
 
         return jsonify({
@@ -405,28 +444,19 @@ def issue_contract():
 
         if tenant:
             # ✅ Create UNIFIED notification for tenant
-            tenant_notification = Notification(
-                title='New Contract Issued',
-                message=f'A new rental contract has been issued for {unit.name if unit else "your unit"}. Please review and sign the contract.',
-                targetuserid=tenant.userid,  # Specific to this tenant
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                'New Contract Issued',
+                f'A new rental contract has been issued for {unit.name if unit else "your unit"}. Please review and sign the contract.',
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
             # ✅ Create UNIFIED notification for ALL landlords
-            all_landlords = User.query.filter_by(role='Owner').all()
-            if all_landlords:
-                landlord_notification = Notification(
-                    title='New Contract Created',
-                    message=f'New rental contract issued to tenant for {unit.name if unit else "a unit"}. Contract ID: {new_contract.contractid}',
-                    targetuserrole='Owner',  # Target all landlords
-                    isgroupnotification=True,
-                    recipientcount=len(all_landlords),
-                    createdbyuserid=tenant.userid
-                )
-                db.session.add(landlord_notification)
+            notify_owners(
+                'New Contract Created',
+                f'New rental contract issued to tenant for {unit.name if unit else "a unit"}. Contract ID: {new_contract.contractid}',
+                created_by=tenant.userid
+            )
 
         db.session.commit()
 
@@ -450,7 +480,8 @@ def get_contracts_by_tenant(tenant_id):
             Contract.enddate,
             Contract.status,
             Contract.generated_contract,
-            Contract.signed_contract
+            Contract.signed_contract,
+            Contract.version
         )
         .join(Unit, Contract.unitid == Unit.unitid)
         .filter(Contract.tenantid == tenant_id)
@@ -466,9 +497,10 @@ def get_contracts_by_tenant(tenant_id):
             "end_date": end_date.strftime("%Y-%m-%d") if end_date else None,
             "status": status,
             "generated_contract": generated_contract,
-            "signed_contract": signed_contract
+            "signed_contract": signed_contract,
+            "version": version
         }
-        for contractid, unit_name, unit_price, start_date, end_date, status, generated_contract, signed_contract in contracts
+        for contractid, unit_name, unit_price, start_date, end_date, status, generated_contract, signed_contract, version in contracts
     ]
 
     return jsonify(result)
@@ -478,7 +510,7 @@ def get_contracts_by_tenant(tenant_id):
 @contract_bp.route("/contracts/sign", methods=["POST"])
 def sign_contract():
     from io import BytesIO
-    from PIL import Image
+    from reportlab.lib.utils import ImageReader
 
     try:
         if "signed_contract" not in request.files:
@@ -505,25 +537,16 @@ def sign_contract():
         if not os.path.exists(contract_path):
             return jsonify({"error": "Original contract file not found"}), 404
 
-        signed_pdf_path = os.path.join(signed_folder, f"signed_{contract.contractid}.pdf")
-
-        # ✅ Save signature temporarily
-        sig_temp_path = os.path.join(signed_folder, "temp_signature.png")
-        file.save(sig_temp_path)
+        signed_pdf_path = pending_path(signed_folder)
 
-        # ✅ Fix transparency (remove black box)
-        sig = Image.open(sig_temp_path)
-        if sig.mode == "RGBA":
-            white_bg = Image.new("RGB", sig.size, (255, 255, 255))
-            white_bg.paste(sig, mask=sig.split()[3])  # use alpha channel as mask
-            sig = white_bg
-            sig.save(sig_temp_path)
+        # ✅ Fix transparency (remove black box) and downscale to the printed size
+        sig_buffer = prepare_signature(file.stream, 150, 60)
 
         # ✅ Create signature overlay PDF
         packet = BytesIO()
         c = canvas.Canvas(packet, pagesize=A4)
         # UPDATED: Adjusted signature position for horizontal alignment with landlord
-        c.drawImage(sig_temp_path, 50, 65, width=150, height=60, mask='auto')  # moved to align horizontally
+        c.drawImage(ImageReader(sig_buffer), 50, 65, width=150, height=60, mask='auto')  # moved to align horizontally
         c.save()
         packet.seek(0)
 
@@ -543,9 +566,10 @@ def sign_contract():
         # ✅ Save final signed PDF
         with open(signed_pdf_path, "wb") as output_pdf:
             writer.write(output_pdf)
+        optimize_pdf(signed_pdf_path)
 
-        # ✅ Update DB
-        contract.signed_contract = os.path.basename(signed_pdf_path)
+        # ✅ Update DB (signed_<sha256>.pdf; a failed commit leaves it for `flask artifacts-gc`)
+        contract.signed_contract = store_file(signed_pdf_path, "signed")
         contract.status = "Signed"
         
         # ✅ Get tenant info for notification
@@ -554,40 +578,31 @@ def sign_contract():
 
         if tenant:
             # ✅ Create UNIFIED notification for tenant
-            tenant_notification = Notification(
-                title='Contract Signed',
-                message=f'You have successfully signed the rental contract for {unit.name if unit else "your unit"}.',
-                targetuserid=tenant.userid,  # Specific to this tenant
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                'Contract Signed',
+                f'You have successfully signed the rental contract for {unit.name if unit else "your unit"}.',
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
             # ✅ Create UNIFIED notification for ALL landlords
-            all_landlords = User.query.filter_by(role='Owner').all()
-            if all_landlords:
-                landlord_notification = Notification(
-                    title='Contract Signed by Tenant',
-                    message=f'Tenant has signed the rental contract for {unit.name if unit else "a unit"}. Contract ID: {contract.contractid}',
-                    targetuserrole='Owner',  # Target all landlords
-                    isgroupnotification=True,
-                    recipientcount=len(all_landlords),
-                    createdbyuserid=tenant.userid
-                )
-                db.session.add(landlord_notification)
+            notify_owners(
+                'Contract Signed by Tenant',
+                f'Tenant has signed the rental contract for {unit.name if unit else "a unit"}. Contract ID: {contract.contractid}',
+                created_by=tenant.userid
+            )
 
         db.session.commit()
 
-        # Cleanup temp
-        if os.path.exists(sig_temp_path):
-            os.remove(sig_temp_path)
-
         return jsonify({
             "message": "Contract signed and merged successfully!",
             "filename": contract.signed_contract
         })
 
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({"error": CONFLICT_MESSAGE}), 409
+
     except Exception as e:
         db.session.rollback()
         print(traceback.format_exc())
@@ -606,11 +621,11 @@ def download_contract(filename):
         if filename.startswith("signed_"):
             file_path = os.path.join(signed_folder, filename)
             if os.path.exists(file_path):
-                return send_from_directory(signed_folder, filename, as_attachment=True)
+                return send_upload("signed_contracts", filename, as_attachment=True)
         
         file_path = os.path.join(contracts_folder, filename)
         if os.path.exists(file_path):
-            return send_from_directory(contracts_folder, filename, as_attachment=True)
+            return send_upload("contracts", filename, as_attachment=True)
         
         return jsonify({"error": "File not found"}), 404
         
@@ -633,6 +648,9 @@ def update_contract_status(contract_id):
         if not contract:
             return jsonify({"error": "Contract not found"}), 404
 
+        if is_stale(contract, data):
+            return jsonify({"error": CONFLICT_MESSAGE, "version": contract.version}), 409
+
         old_status = contract.status
         contract.status = new_status
 
@@ -651,19 +669,23 @@ def update_contract_status(contract_id):
             message = status_messages.get(new_status, f"Contract status updated to {new_status}.")
 
             # ✅ Create UNIFIED notification for tenant
-            tenant_notification = Notification(
-                title=f'Contract {new_status}',
-                message=message,
-                targetuserid=tenant.userid,  # Specific to this tenant
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                f'Contract {new_status}',
+                message,
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
         db.session.commit()
 
-        return jsonify({"message": f"Contract status updated to {new_status} successfully!"})
+        return jsonify({
+            "message": f"Contract status updated to {new_status} successfully!",
+            "version": contract.version
+        })
+
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({"error": CONFLICT_MESSAGE}), 409
 
     except Exception as e:
         db.session.rollback()
@@ -695,6 +717,13 @@ def terminate_contract():
                 'success': False,
                 'message': 'Contract not found'
             }), 404
+
+        if is_stale(contract, data):
+            return jsonify({
+                'success': False,
+                'message': CONFLICT_MESSAGE,
+                'version': contract.version
+            }), 409
         
         contract.status = 'Terminated'
         contract.enddate = termination_date
@@ -721,37 +750,35 @@ def terminate_contract():
                 if unit:
                     unit_name = unit.name  # FIXED: Use .name instead of .unit_name
             
-            notification = Notification(
-                title="Tenancy Ended",
-                message=f"Your tenancy at {unit_name} has been terminated effective {termination_date}.",
-                targetuserid=tenant_user.userid,
-                targetuserrole=current_user_id,
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=current_user_id,
-                creationdate=datetime.utcnow()
+            notify_user(
+                tenant_user.userid,
+                "Tenancy Ended",
+                f"Your tenancy at {unit_name} has been terminated effective {termination_date}.",
+                created_by=current_user_id
             )
-            db.session.add(notification)
         
         # Create notification for owner
-        owner_notification = Notification(
-            title="Contract Terminated",
-            message=f"Tenancy for {tenant_user.firstname if tenant_user else 'Tenant'} at {unit_name} has been terminated.",
-            targetuserrole='Owner',
-            isgroupnotification=True,
-            recipientcount=1,
-            createdbyuserid=current_user_id,
-            creationdate=datetime.utcnow()
+        notify_owners(
+            "Contract Terminated",
+            f"Tenancy for {tenant_user.firstname if tenant_user else 'Tenant'} at {unit_name} has been terminated.",
+            created_by=current_user_id
         )
-        db.session.add(owner_notification)
         
         db.session.commit()
         
         return jsonify({
             'success': True,
-            'message': 'Contract terminated successfully'
+            'message': 'Contract terminated successfully',
+            'version': contract.version
         })
         
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': CONFLICT_MESSAGE
+        }), 409
+
     except Exception as e:
         db.session.rollback()
         print(f"Error terminating contract: {str(e)}")  # For debugging
@@ -784,6 +811,13 @@ def terminate_tenant_contract():
                 'success': False,
                 'message': 'Contract not found'
             }), 404
+
+        if is_stale(contract, data):
+            return jsonify({
+                'success': False,
+                'message': CONFLICT_MESSAGE,
+                'version': contract.version
+            }), 409
         
         contract.status = 'Termination Requested'
         contract.enddate = termination_date
@@ -793,41 +827,39 @@ def terminate_tenant_contract():
         current_user_id = data.get('createdbyuserid', 1)
         
         # Create notification for landlord
-        owner_notification = Notification(
-            title="Tenancy Termination Requested",
-            message=f"Tenant has requested to terminate their tenancy effective {termination_date}. Please review and approve.",
-            targetuserrole='Owner',
-            isgroupnotification=True,
-            recipientcount=1,
-            createdbyuserid=current_user_id,
-            creationdate=datetime.utcnow()
+        notify_owners(
+            "Tenancy Termination Requested",
+            f"Tenant has requested to terminate their tenancy effective {termination_date}. Please review and approve.",
+            created_by=current_user_id
         )
-        db.session.add(owner_notification)
         
         # Create notification for tenant
         tenant = Tenant.query.filter_by(tenantid=tenant_id).first()
         if tenant:
             tenant_user = User.query.filter_by(userid=tenant.userid).first()
             if tenant_user:
-                notification = Notification(
-                    title="Termination Request Sent",
-                    message=f"Your tenancy termination request has been sent to the landlord. They will review and respond.",
-                    targetuserid=tenant_user.userid,
-                    targetuserrole=None,
-                    isgroupnotification=False,
-                    recipientcount=1,
-                    createdbyuserid=current_user_id,
-                    creationdate=datetime.utcnow()
+                notify_user(
+                    tenant_user.userid,
+                    "Termination Request Sent",
+                    f"Your tenancy termination request has been sent to the landlord. They will review and respond.",
+                    created_by=current_user_id
                 )
-                db.session.add(notification)
         
         db.session.commit()
         
         return jsonify({
             'success': True,
-            'message': 'Termination request sent successfully'
+            'message': 'Termination request sent successfully',
+            'version': contract.version
         })
         
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': CONFLICT_MESSAGE
+        }), 409
+
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -859,6 +891,20 @@ def approve_termination():
                 'success': False,
                 'message': 'Contract not found'
             }), 404
+
+        if is_stale(contract, data):
+            return jsonify({
+                'success': False,
+                'message': CONFLICT_MESSAGE,
+                'version': contract.version
+            }), 409
+
+        if contract.status != 'Termination Requested':
+            return jsonify({
+                'success': False,
+                'message': f'Contract is not awaiting termination (current status: {contract.status})',
+                'version': contract.version
+            }), 409
         
         contract.status = 'Terminated'
         contract.updatedat = datetime.utcnow()
@@ -875,25 +921,28 @@ def approve_termination():
         # Create notification for tenant
         tenant_user = User.query.filter_by(userid=tenant.userid).first()
         if tenant_user:
-            notification = Notification(
-                title="Termination Approved",
-                message=f"Your tenancy termination request has been approved. Your contract will end on {contract.enddate}.",
-                targetuserid=tenant_user.userid,
-                targetuserrole=None,
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=current_user_id,
-                creationdate=datetime.utcnow()
+            notify_user(
+                tenant_user.userid,
+                "Termination Approved",
+                f"Your tenancy termination request has been approved. Your contract will end on {contract.enddate}.",
+                created_by=current_user_id
             )
-            db.session.add(notification)
         
         db.session.commit()
         
         return jsonify({
             'success': True,
-            'message': 'Termination request approved successfully'
+            'message': 'Termination request approved successfully',
+            'version': contract.version
         })
         
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': CONFLICT_MESSAGE
+        }), 409
+
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -925,6 +974,20 @@ def reject_termination():
                 'success': False,
                 'message': 'Contract not found'
             }), 404
+
+        if is_stale(contract, data):
+            return jsonify({
+                'success': False,
+                'message': CONFLICT_MESSAGE,
+                'version': contract.version
+            }), 409
+
+        if contract.status != 'Termination Requested':
+            return jsonify({
+                'success': False,
+                'message': f'Contract is not awaiting termination (current status: {contract.status})',
+                'version': contract.version
+            }), 409
         
         contract.status = 'Active'
         contract.enddate = None  # Remove the termination date
@@ -938,25 +1001,28 @@ def reject_termination():
         if tenant:
             tenant_user = User.query.filter_by(userid=tenant.userid).first()
             if tenant_user:
-                notification = Notification(
-                    title="Termination Rejected",
-                    message="Your tenancy termination request has been rejected. Please contact the landlord for more information.",
-                    targetuserid=tenant_user.userid,
-                    targetuserrole=None,
-                    isgroupnotification=False,
-                    recipientcount=1,
-                    createdbyuserid=current_user_id,
-                    creationdate=datetime.utcnow()
+                notify_user(
+                    tenant_user.userid,
+                    "Termination Rejected",
+                    "Your tenancy termination request has been rejected. Please contact the landlord for more information.",
+                    created_by=current_user_id
                 )
-                db.session.add(notification)
         
         db.session.commit()
         
         return jsonify({
             'success': True,
-            'message': 'Termination request rejected successfully'
+            'message': 'Termination request rejected successfully',
+            'version': contract.version
         })
         
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': CONFLICT_MESSAGE
+        }), 409
+
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
-from utils.email_utils import send_welcome_email
+from utils.email_utils import EMAIL_SEND_LIMIT, send_welcome_email
+from utils.rate_limit import per_email, per_ip, rate_limited
 
 email_verification_bp = Blueprint("email_verification_bp", __name__)
 
@@ -7,6 +8,11 @@ email_verification_bp = Blueprint("email_verification_bp", __name__)
 # SEND WELCOME EMAIL AFTER REGISTRATION
 # ==============================
 @email_verification_bp.route("/welcome/send", methods=["POST"])
+@rate_limited(
+    per_email("2/hour", "welcome-send-email"),
+    per_ip("10/hour", "welcome-send-ip"),
+    EMAIL_SEND_LIMIT
+)
 def send_welcome_after_register():
     data = request.get_json()
     if not data or "email" not in data or "user_name" not in data:
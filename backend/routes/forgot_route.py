@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
 from extensions import db
 from models.users_model import User
-from utils.email_utils import send_password_reset_email, verify_code
-from werkzeug.security import generate_password_hash
+from utils.email_utils import EMAIL_SEND_LIMIT, consume_reset_grant, send_password_reset_email, verify_code
+from utils.rate_limit import per_email, per_ip, rate_limited
+from utils.passwords import HashPoolBusy, hash_password
 
 forgot_bp = Blueprint("forgot_bp", __name__)
 
@@ -10,6 +11,11 @@ forgot_bp = Blueprint("forgot_bp", __name__)
 # SEND VERIFICATION CODE
 # ==============================
 @forgot_bp.route("/forgot/send", methods=["POST"])
+@rate_limited(
+    per_email("3/15minutes", "forgot-send-email"),
+    per_ip("20/hour", "forgot-send-ip"),
+    EMAIL_SEND_LIMIT
+)
 def send_code():
     data = request.get_json()
     if not data or "email" not in data:
@@ -30,6 +36,10 @@ def send_code():
 # VERIFY CODE
 # ==============================
 @forgot_bp.route("/forgot/verify", methods=["POST"])
+@rate_limited(
+    per_email("10/15minutes", "forgot-verify-email"),  # 6-digit codes: stop guessing
+    per_ip("60/hour", "forgot-verify-ip")
+)
 def verify_user_code():
     data = request.get_json()
     if not data or "email" not in data or "code" not in data:
@@ -54,8 +64,6 @@ def reset_password():
     new_password = data.get("new_password")
     confirm_password = data.get("confirm_password")
 
-    print("Resetting password for:", email, new_password, confirm_password)
-
     if not email:
         return jsonify({"message": "Email is required"}), 400
     if not new_password or not confirm_password:
@@ -67,8 +75,17 @@ def reset_password():
     if not user:
         return jsonify({"message": "User not found"}), 404
 
+    # Hash before using up the grant: a busy hash pool must not cost the user their verified code
+    try:
+        hashed_password = hash_password(new_password)
+    except HashPoolBusy:
+        return jsonify({"message": "Server busy, please try again."}), 503, {"Retry-After": "1"}
+
+    # ✅ Only after /forgot/verify accepted a code for this email
+    if not consume_reset_grant(email):
+        return jsonify({"message": "Please verify your email with the code we sent first."}), 403
+
     try:
-        hashed_password = generate_password_hash(new_password)
         user.password = hashed_password
         db.session.commit()
         return jsonify({"message": "Password reset successful!"}), 200
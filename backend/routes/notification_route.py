@@ -1,12 +1,23 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from extensions import db
 from models.notifications_model import Notification
 from models.users_model import User
 from models.tenants_model import Tenant
+from utils.notification_inbox import mark_all_read, mark_read, read_ids, unread_count, visible_filter
+from utils.notification_service import notify_role, notify_user, notify_users
+from utils.notification_counters import apply_deltas, counter_deltas, read_counters
+from utils.notification_events import format_sse, notification_broker, notification_payload
 
 notification_bp = Blueprint('notification_bp', __name__)
 
 # GET notifications for user - TANGGALIN ANG /api
+# Without query params the whole inbox is returned (newest first).
+# Paging params (newest first, keyset on notificationid):
+#   limit=50       page size (max 200; 50 when only before/since_id is given)
+#   before=<id>    older page: only ids below this (use next_before from the previous page)
+#   since_id=<id>  delta sync: only ids above the newest one the client already has
+# latest_id (the id to pass as since_id next time) is only set on head pages,
+# i.e. requests without `before`.
 @notification_bp.route('/notifications/<int:user_id>', methods=['GET'])
 def get_user_notifications(user_id):
     try:
@@ -18,37 +29,45 @@ def get_user_notifications(user_id):
                 'message': 'User not found'
             }), 404
 
-        print(f"🔔 Fetching notifications for user {user_id} with role: {user.role}")
+        limit = request.args.get('limit', type=int)
+        before = request.args.get('before', type=int)
+        since_id = request.args.get('since_id', type=int)
+        paged = limit is not None or before is not None or since_id is not None
+        if paged:
+            limit = min(max(limit or 50, 1), 200)
 
-        # Query notifications based on user role and targeting
-        if user.role == 'Owner':
-            # For landlords: get notifications targeted to 'Owner' role OR specific to this landlord
-            notifications = Notification.query.filter(
-                (Notification.targetuserrole == 'Owner') | 
-                (Notification.targetuserid == user_id)
-            ).order_by(Notification.creationdate.desc()).all()
+        # Owners: 'Owner' role notifications OR specific to this landlord
+        # Tenants: 'Tenant' role notifications OR specific to this tenant
+        # (served by the (targetuserrole, notificationid) / (targetuserid, notificationid) indexes)
+        query = Notification.query.filter(visible_filter(user_id, user.role))
+        if before:
+            query = query.filter(Notification.notificationid < before)
+        if since_id:
+            query = query.filter(Notification.notificationid > since_id)
+
+        query = query.order_by(Notification.notificationid.desc())
+        if paged:
+            notifications = query.limit(limit + 1).all()
+            has_more = len(notifications) > limit
+            notifications = notifications[:limit]
         else:
-            # ✅ FIXED: For tenants: get notifications targeted to 'Tenant' role OR specific to this tenant
-            notifications = Notification.query.filter(
-                (Notification.targetuserrole == 'Tenant') | 
-                (Notification.targetuserid == user_id)
-            ).order_by(Notification.creationdate.desc()).all()
+            notifications = query.all()
+            has_more = False
         
-        print(f"🔔 Found {len(notifications)} notifications for user {user_id}")
-        
-        # Debug: Count notification types
-        group_notifications = [n for n in notifications if n.isgroupnotification]
-        individual_notifications = [n for n in notifications if not n.isgroupnotification]
-        print(f"🔔 Group notifications: {len(group_notifications)}")
-        print(f"🔔 Individual notifications: {len(individual_notifications)}")
-
+        already_read = read_ids(user_id, [n.notificationid for n in notifications])
         notifications_data = []
         for notification in notifications:
-            notifications_data.append(notification.to_dict())  # ✅ Use model's to_dict method
+            item = notification.to_dict()  # ✅ Use model's to_dict method
+            item['is_read'] = notification.notificationid in already_read
+            item['status'] = 'read' if item['is_read'] else 'unread'
+            notifications_data.append(item)
         
         return jsonify({
             'success': True,
-            'notifications': notifications_data
+            'notifications': notifications_data,
+            'has_more': has_more,
+            'next_before': notifications[-1].notificationid if has_more else None,
+            'latest_id': None if before else (notifications[0].notificationid if notifications else since_id)
         })
         
     except Exception as e:
@@ -58,6 +77,126 @@ def get_user_notifications(user_id):
             'message': f'Error fetching notifications: {str(e)}'
         }), 500
 
+STREAM_KEEPALIVE_SECONDS = 15
+LONG_POLL_MAX_SECONDS = 30
+CATCH_UP_LIMIT = 100
+
+
+def _subscribe(user):
+    """Subscribe before any catch-up query so nothing committed in between is missed."""
+    tenant_id = None
+    if user.role != 'Owner':
+        tenant_id = db.session.query(Tenant.tenantid).filter(Tenant.userid == str(user.userid)).scalar()
+    return notification_broker.subscribe(user.userid, user.role, tenant_id)
+
+
+def _notifications_since(user, since_id):
+    return (
+        Notification.query
+        .filter(visible_filter(user.userid, user.role), Notification.notificationid > since_id)
+        .order_by(Notification.notificationid)
+        .limit(CATCH_UP_LIMIT)
+        .all()
+    )
+
+
+# SERVER-SENT EVENTS: new notifications + counter deltas
+# Events: "snapshot" (unread count on connect), "notification" (id = notificationid),
+# "counters" (deltas such as {"unpaidBills": -1}) and "resync" (client fell behind).
+# A reconnecting EventSource sends Last-Event-ID and receives what it missed.
+@notification_bp.route('/notifications/stream/<int:user_id>', methods=['GET'])
+def stream_notifications(user_id):
+    user = db.session.get(User, user_id)
+    if not user:
+        return jsonify({'success': False, 'message': 'User not found'}), 404
+
+    last_id = request.headers.get('Last-Event-ID', type=int) or request.args.get('since_id', type=int)
+    subscriber = _subscribe(user)
+    try:
+        backlog = [notification_payload(n) for n in _notifications_since(user, last_id)] if last_id else []
+        unread = unread_count(user_id, user.role)
+    except Exception:
+        notification_broker.unsubscribe(subscriber)
+        raise
+    # ✅ Idle streams hold no DB connection: everything below is fed by the broker
+    db.session.close()
+
+    def generate():
+        sent_id = last_id or 0
+        try:
+            yield "retry: 5000\n\n"
+            yield format_sse("snapshot", {"unreadNotifications": unread})
+            for item in backlog:
+                sent_id = max(sent_id, item["notificationid"])
+                yield format_sse("notification", item, item["notificationid"])
+            while True:
+                message = subscriber.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                if subscriber.overflowed:
+                    yield format_sse("resync", {})
+                    return
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                name, data, event_id = message
+                if event_id is not None:
+                    if event_id <= sent_id:
+                        continue  # already delivered in the backlog
+                    sent_id = event_id
+                yield format_sse(name, data, event_id)
+        finally:
+            notification_broker.unsubscribe(subscriber)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# LONG-POLL fallback for clients that can't keep an EventSource open.
+# Returns as soon as there is something newer than since_id, otherwise after `timeout` seconds.
+@notification_bp.route('/notifications/poll/<int:user_id>', methods=['GET'])
+def poll_notifications(user_id):
+    try:
+        user = db.session.get(User, user_id)
+        if not user:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
+
+        since_id = request.args.get('since_id', 0, type=int)
+        timeout = min(max(request.args.get('timeout', 25, type=float), 0), LONG_POLL_MAX_SECONDS)
+
+        subscriber = _subscribe(user)
+        try:
+            notifications = [notification_payload(n) for n in _notifications_since(user, since_id)]
+            counters = {}
+            if not notifications:
+                db.session.close()
+                message = subscriber.get(timeout=timeout)
+                while message is not None:
+                    name, data, event_id = message
+                    if name == 'notification' and event_id > since_id:
+                        notifications.append(data)
+                    elif name == 'counters':
+                        for key, delta in data.items():
+                            counters[key] = counters.get(key, 0) + delta
+                    message = subscriber.get(timeout=0)  # drain whatever arrived with it
+        finally:
+            notification_broker.unsubscribe(subscriber)
+
+        return jsonify({
+            'success': True,
+            'notifications': notifications,
+            'counters': counters,
+            'resync': subscriber.overflowed,
+            'last_id': max([since_id] + [n['notificationid'] for n in notifications])
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error polling notifications: {str(e)}'
+        }), 500
+
 # GET notifications for user by role (alternative endpoint)
 @notification_bp.route('/notifications/role/<string:user_role>', methods=['GET'])
 def get_notifications_by_role(user_role):
@@ -98,21 +237,26 @@ def delete_notification(notification_id):
         return jsonify({"success": False, "message": str(e)}), 500
 
 # MARK AS READ - TANGGALIN ANG /api
+# The reader is passed as ?user_id= (or "user_id" in the JSON body) because
+# role notifications are shared by every recipient.
 @notification_bp.route('/notifications/<int:notification_id>/read', methods=['PUT'])
 def mark_as_read(notification_id):
     try:
-        notification = Notification.query.get(notification_id)
+        data = request.get_json(silent=True) or {}
+        user_id = request.args.get('user_id', type=int) or data.get('user_id')
+        if not user_id:
+            return jsonify({"success": False, "message": "user_id is required"}), 400
+
+        notification = db.session.get(Notification, notification_id)
         if not notification:
             return jsonify({"success": False, "message": "Notification not found"}), 404
-        
-        # Add your mark as read logic here
-        # You might want to add an 'is_read' field to your Notification model
-        # if notification.is_read is not None:
-        #     notification.is_read = True
-        #     db.session.commit()
+
+        mark_read(int(user_id), notification_id)
+        db.session.commit()
         
         return jsonify({"success": True, "message": "Notification marked as read"})
     except Exception as e:
+        db.session.rollback()
         return jsonify({"success": False, "message": str(e)}), 500
 
 # GET notification statistics
@@ -126,27 +270,14 @@ def get_notification_stats(user_id):
                 'message': 'User not found'
             }), 404
 
-        # Count total notifications for this user
-        if user.role == 'Owner':
-            total_count = Notification.query.filter(
-                (Notification.targetuserrole == 'Owner') | 
-                (Notification.targetuserid == user_id)
-            ).count()
-        else:
-            total_count = Notification.query.filter_by(
-                targetuserid=user_id
-            ).count()
-
-        # Count unread notifications (if you implement read status)
-        # unread_count = Notification.query.filter_by(
-        #     targetuserid=user_id, is_read=False
-        # ).count()
+        # Count total notifications for this user (same visibility rule as the unread count)
+        total_count = Notification.query.filter(visible_filter(user_id, user.role)).count()
 
         return jsonify({
             'success': True,
             'stats': {
                 'total_notifications': total_count,
-                # 'unread_notifications': unread_count
+                'unread_notifications': unread_count(user_id, user.role)
             }
         })
         
@@ -171,11 +302,13 @@ def clear_all_notifications(user_id):
         if user.role == 'Owner':
             # For landlords: delete notifications targeted to them specifically
             # Note: We don't delete group notifications as they belong to all landlords
+            apply_deltas(counter_deltas(Notification.targetuserid == user_id))
             deleted_count = Notification.query.filter_by(
                 targetuserid=user_id
             ).delete()
         else:
             # For tenants: delete all their notifications
+            apply_deltas(counter_deltas(Notification.targetuserid == user_id))
             deleted_count = Notification.query.filter_by(
                 targetuserid=user_id
             ).delete()
@@ -202,25 +335,8 @@ def mark_all_as_read(user_id):
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
 
-        # Update all unread notifications for this user
-        if user.role == 'Owner':
-            # For landlords: update notifications targeted to them specifically
-            updated_count = Notification.query.filter_by(
-                targetuserid=user_id
-                # Add is_read condition when implemented: , is_read=False
-            ).update({
-                # 'is_read': True
-                # Add update logic when is_read field is implemented
-            })
-        else:
-            # For tenants: update all their notifications
-            updated_count = Notification.query.filter_by(
-                targetuserid=user_id
-                # Add is_read condition when implemented: , is_read=False
-            ).update({
-                # 'is_read': True
-                # Add update logic when is_read field is implemented
-            })
+        # ✅ Move the read watermark to the newest notification (covers role notifications too)
+        updated_count = mark_all_read(user_id, user.role)
         
         db.session.commit()
         
@@ -262,33 +378,17 @@ def send_notification():
                 'message': 'Only owners can send notifications'
             }), 403
         
-        recipient_count = 1  # Default for individual notifications
-        
         # Handle group notifications (all tenants)
         if is_group_notification and target_user_role == 'Tenant':
-            # Count all active tenants
-            active_tenants_count = Tenant.query.filter_by(status='Active').count()
-            recipient_count = active_tenants_count
-            
-            # Create the group notification
-            new_notification = Notification(
-                title=title,
-                message=message,
-                targetuserrole=target_user_role,
-                targetuserid=None,  # No specific user for group notifications
-                isgroupnotification=True,
-                recipientcount=recipient_count,
-                createdbyuserid=created_by_user_id
-                # ✅ creationdate is automatically handled by the model
-            )
-            
-            db.session.add(new_notification)
+            # ✅ One shared row; recipient count comes from the service's cached active-tenant count
+            new_notification = notify_role('Tenant', title, message, created_by=created_by_user_id)
+            recipient_count = new_notification.recipientcount if new_notification else 0
             db.session.commit()
             
             return jsonify({
                 'success': True,
                 'message': f'Notification sent to all {recipient_count} tenants',
-                'notification_id': new_notification.notificationid
+                'notification_id': new_notification.notificationid if new_notification else None
             })
         
         # Handle individual notifications (specific tenant)
@@ -302,18 +402,7 @@ def send_notification():
                 }), 400
             
             # Create the individual notification
-            new_notification = Notification(
-                title=title,
-                message=message,
-                targetuserrole=None,  # No role for individual notifications
-                targetuserid=target_user_id,
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=created_by_user_id
-                # ✅ creationdate is automatically handled by the model
-            )
-            
-            db.session.add(new_notification)
+            new_notification = notify_user(target_user_id, title, message, created_by=created_by_user_id)
             db.session.commit()
             
             return jsonify({
@@ -376,13 +465,14 @@ def get_active_tenants():
 @notification_bp.route('/notifications/types-stats', methods=['GET'])
 def get_notification_types_stats():
     try:
-        # Get notification statistics by type
+        # ✅ Pre-computed counters (primary-key read), maintained on insert/delete
+        counters = read_counters()
         stats = {
-            'total': Notification.query.count(),
-            'group_notifications': Notification.query.filter_by(isgroupnotification=True).count(),
-            'individual_notifications': Notification.query.filter_by(isgroupnotification=False).count(),
-            'tenant_notifications': Notification.query.filter_by(targetuserrole='Tenant').count(),
-            'owner_notifications': Notification.query.filter_by(targetuserrole='Owner').count()
+            'total': counters['total'],
+            'group_notifications': counters['group_notifications'],
+            'individual_notifications': counters['individual_notifications'],
+            'tenant_notifications': counters['tenant_notifications'],
+            'owner_notifications': counters['owner_notifications']
         }
         
         return jsonify({
@@ -422,35 +512,43 @@ def bulk_send_notifications():
                 'message': 'Only owners can send notifications'
             }), 403
         
-        successful_sends = 0
-        failed_sends = 0
-        
+        # ✅ Resolve every tenant -> user mapping with one IN query
+        requested = []
         for tenant_id in tenant_ids:
             try:
-                # Get tenant user ID
-                tenant = Tenant.query.filter_by(tenantid=tenant_id).first()
-                if tenant:
-                    user = User.query.filter_by(userid=tenant.userid).first()
-                    if user and user.role == 'Tenant':
-                        # Create individual notification
-                        new_notification = Notification(
-                            title=title,
-                            message=message,
-                            targetuserrole=None,
-                            targetuserid=user.userid,
-                            isgroupnotification=False,
-                            recipientcount=1,
-                            createdbyuserid=created_by_user_id
-                            # ✅ creationdate is automatically handled by the model
-                        )
-                        db.session.add(new_notification)
-                        successful_sends += 1
-                    else:
-                        failed_sends += 1
-                else:
-                    failed_sends += 1
-            except Exception:
-                failed_sends += 1
+                requested.append(int(tenant_id))
+            except (TypeError, ValueError):
+                requested.append(None)
+        recipients = {
+            row.tenantid: row
+            for row in db.session.query(Tenant.tenantid, User.userid, User.role)
+            .outerjoin(User, Tenant.userid == User.userid)
+            .filter(Tenant.tenantid.in_({tid for tid in requested if tid is not None}))
+        }
+
+        results = []
+        target_user_ids = []
+        seen = set()
+        for raw_id, tenant_id in zip(tenant_ids, requested):
+            recipient = recipients.get(tenant_id)
+            if tenant_id is None:
+                results.append({'tenant_id': raw_id, 'status': 'failed', 'reason': 'Invalid tenant ID'})
+            elif tenant_id in seen:
+                results.append({'tenant_id': tenant_id, 'status': 'skipped', 'reason': 'Duplicate tenant ID'})
+            elif recipient is None:
+                results.append({'tenant_id': tenant_id, 'status': 'failed', 'reason': 'Tenant not found'})
+            elif recipient.userid is None or recipient.role != 'Tenant':
+                results.append({'tenant_id': tenant_id, 'status': 'failed', 'reason': 'No tenant user account'})
+            else:
+                results.append({'tenant_id': tenant_id, 'status': 'sent', 'user_id': recipient.userid})
+                target_user_ids.append(recipient.userid)
+            if tenant_id is not None:
+                seen.add(tenant_id)
+
+        # ✅ All notifications go out in one multi-row INSERT
+        notify_users(target_user_ids, title, message, created_by=created_by_user_id)
+        successful_sends = len(target_user_ids)
+        failed_sends = sum(1 for r in results if r['status'] == 'failed')
         
         db.session.commit()
         
@@ -458,7 +556,8 @@ def bulk_send_notifications():
             'success': True,
             'message': f'Successfully sent {successful_sends} notifications, {failed_sends} failed',
             'successful_sends': successful_sends,
-            'failed_sends': failed_sends
+            'failed_sends': failed_sends,
+            'results': results
         })
         
     except Exception as e:
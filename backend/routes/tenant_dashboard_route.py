@@ -9,6 +9,7 @@ from models.transaction_model import Transaction
 from models.concerns_model import Concern
 from models.units_model import House as Unit
 from models.notifications_model import Notification
+from utils.notification_inbox import unread_count
 
 tenant_dashboard_bp = Blueprint('tenant_dashboard_bp', __name__)
 
@@ -227,10 +228,7 @@ def get_quick_stats(tenant_id):
         ).count()
 
         # Count unread notifications
-        unread_notifications = Notification.query.filter(
-            (Notification.targetuserid == tenant.userid) | 
-            (Notification.targetuserrole == "Tenant")
-        ).count()
+        unread_notifications = unread_count(int(tenant.userid), "Tenant")
 
         return jsonify({
             "unpaidBills": unpaid_count,
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, current_app, Response, stream_with_context
 from extensions import db
 from models.users_model import User
 from models.tenants_model import Tenant
@@ -6,8 +6,12 @@ from models.contracts_model import Contract
 from models.units_model import House as Unit
 from models.applications_model import Application
 from models.bills_model import Bill
-from models.notifications_model import Notification
+from utils.notification_service import notify_owners, notify_user
+from models.transaction_model import Transaction
+from utils.file_delivery import stream_zip
 from datetime import datetime
+from sqlalchemy.orm.exc import StaleDataError
+import os
 
 tenant_bp = Blueprint("tenant_bp", __name__)
 
@@ -161,28 +165,19 @@ def approve_applicant(application_id):
         unit.status = "Occupied"
 
         # ✅ Create UNIFIED notification for tenant
-        tenant_notification = Notification(
-            title='Application Approved!',
-            message='Congratulations! Your rental application has been approved. You can now move into your unit.',
-            targetuserid=tenant.userid,  # Specific to this tenant
-            isgroupnotification=False,
-            recipientcount=1,
-            createdbyuserid=tenant.userid
+        notify_user(
+            tenant.userid,
+            'Application Approved!',
+            'Congratulations! Your rental application has been approved. You can now move into your unit.',
+            created_by=tenant.userid
         )
-        db.session.add(tenant_notification)
 
         # ✅ Create UNIFIED notification for ALL landlords
-        all_landlords = User.query.filter_by(role='Owner').all()
-        if all_landlords:
-            landlord_notification = Notification(
-                title='Tenant Application Approved',
-                message=f'Tenant application #{application_id} has been approved and is now active.',
-                targetuserrole='Owner',  # Target all landlords
-                isgroupnotification=True,
-                recipientcount=len(all_landlords),
-                createdbyuserid=tenant.userid
-            )
-            db.session.add(landlord_notification)
+        notify_owners(
+            'Tenant Application Approved',
+            f'Tenant application #{application_id} has been approved and is now active.',
+            created_by=tenant.userid
+        )
 
         db.session.commit()
 
@@ -191,6 +186,10 @@ def approve_applicant(application_id):
             "message": f"Application {application_id} approved and contract activated successfully."
         })
 
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({"success": False, "message": "Contract was modified by another request. Please refresh and try again."}), 409
+
     except Exception as e:
         db.session.rollback()
         print("❌ ERROR approving applicant:", e)
@@ -217,28 +216,19 @@ def reject_applicant(application_id):
         tenant = Tenant.query.filter_by(applicationid=application_id).first()
         if tenant:
             # ✅ Create UNIFIED notification for tenant
-            tenant_notification = Notification(
-                title='Application Status Update',
-                message='Your rental application has been reviewed. Unfortunately, it was not approved.',
-                targetuserid=tenant.userid,  # Specific to this tenant
-                isgroupnotification=False,
-                recipientcount=1,
-                createdbyuserid=tenant.userid
+            notify_user(
+                tenant.userid,
+                'Application Status Update',
+                'Your rental application has been reviewed. Unfortunately, it was not approved.',
+                created_by=tenant.userid
             )
-            db.session.add(tenant_notification)
 
             # ✅ Create UNIFIED notification for ALL landlords
-            all_landlords = User.query.filter_by(role='Owner').all()
-            if all_landlords:
-                landlord_notification = Notification(
-                    title='Tenant Application Rejected',
-                    message=f'Tenant application #{application_id} has been rejected.',
-                    targetuserrole='Owner',  # Target all landlords
-                    isgroupnotification=True,
-                    recipientcount=len(all_landlords),
-                    createdbyuserid=tenant.userid
-                )
-                db.session.add(landlord_notification)
+            notify_owners(
+                'Tenant Application Rejected',
+                f'Tenant application #{application_id} has been rejected.',
+                created_by=tenant.userid
+            )
 
         db.session.commit()
         return jsonify({
@@ -248,4 +238,72 @@ def reject_applicant(application_id):
 
     except Exception as e:
         db.session.rollback()
-        return jsonify({"success": False, "message": f"Failed to reject application: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"success": False, "message": f"Failed to reject application: {str(e)}"}), 500
+
+# Download every document of a tenancy as one streamed ZIP
+@tenant_bp.route("/tenants/<int:tenant_id>/documents/bundle", methods=["GET"])
+def download_tenant_documents(tenant_id):
+    tenant_row = (
+        db.session.query(
+            Tenant.tenantid,
+            Application.valid_id,
+            Application.brgy_clearance,
+            Application.proof_of_income
+        )
+        .join(User, Tenant.userid == User.userid)
+        .outerjoin(Application, Application.applicationid == Tenant.applicationid)
+        .filter(Tenant.tenantid == tenant_id)
+        .first()
+    )
+    if not tenant_row:
+        return jsonify({"error": "Tenant not found"}), 404
+
+    contracts = (
+        db.session.query(Contract.generated_contract, Contract.signed_contract)
+        .filter(Contract.tenantid == tenant_id)
+        .all()
+    )
+    receipts = (
+        db.session.query(Transaction.receipt)
+        .filter(Transaction.tenantid == tenant_id, Transaction.receipt.isnot(None))
+        .all()
+    )
+    gcash_receipts = (
+        db.session.query(Bill.gcash_receipt)
+        .filter(Bill.tenantid == tenant_id, Bill.gcash_receipt.isnot(None))
+        .all()
+    )
+
+    upload_root = current_app.config["UPLOAD_FOLDER"]
+
+    def entry(folder, filename):
+        filename = os.path.basename(filename)  # DB values are plain file names
+        return f"{folder}/{filename}", os.path.join(upload_root, folder, filename)
+
+    entries = []
+    for folder, filename in [
+        ("valid_ids", tenant_row.valid_id),
+        ("brgy_clearances", tenant_row.brgy_clearance),
+        ("proof_of_income", tenant_row.proof_of_income)
+    ]:
+        if filename:
+            entries.append(entry(folder, filename))
+    for generated_contract, signed_contract in contracts:
+        if generated_contract and generated_contract != "N/A":
+            entries.append(entry("contracts", generated_contract))
+        if signed_contract:
+            entries.append(entry("signed_contracts", signed_contract))
+    entries.extend(entry("receipts", r.receipt) for r in receipts)
+    entries.extend(entry("gcash_receipts", b.gcash_receipt) for b in gcash_receipts)
+    # Content-addressed files can be referenced by several rows: one ZIP member each
+    entries = list(dict(entries).items())
+
+    bundle_name = f"tenant_{tenant_id}_documents.zip"
+    return Response(
+        stream_with_context(stream_zip(entries)),
+        mimetype="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{bundle_name}"',
+            "Cache-Control": "no-store"
+        }
+    )
@@ -1,12 +1,15 @@
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, jsonify, current_app, request
 from extensions import db
 from models.bills_model import Bill
 from models.tenants_model import Tenant
 from models.transaction_model import Transaction
 from models.users_model import User
-from models.notifications_model import Notification
+from utils.notification_service import notify_owners, notify_user
 from datetime import datetime
-from reportlab.pdfgen import canvas
+from utils.file_delivery import send_upload
+from utils.receipt_template import get_receipt_template
+from utils.artifact_store import pending_path, store_file
+from utils.pdf_optimizer import optimize_pdf
 import os
 
 transaction_bp = Blueprint("transactions", __name__)
@@ -40,186 +43,26 @@ def issue_receipt(billid):
 
         # ✅ Use the configured UPLOAD_FOLDER (consistent with contracts)
         receipts_folder = os.path.join(current_app.config["UPLOAD_FOLDER"], "receipts")
-        os.makedirs(receipts_folder, exist_ok=True)
-
-        receipt_filename = f"receipt_{bill.billid}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        receipt_path = os.path.join(receipts_folder, receipt_filename)
-
-        # 🧾 Generate Professional PDF using ReportLab
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.pdfbase import pdfmetrics
-        from reportlab.pdfbase.ttfonts import TTFont
-        from reportlab.lib.units import inch
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            receipt_path,
-            pagesize=A4,
-            topMargin=0.5*inch,
-            bottomMargin=0.5*inch
-        )
-        
-        # Story to hold elements
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#2E86AB'),
-            spaceAfter=30,
-            alignment=1  # Center
-        )
-        
-        header_style = ParagraphStyle(
-            'CustomHeader',
-            parent=styles['Heading2'],
-            fontSize=12,
-            textColor=colors.HexColor('#333333'),
-            spaceAfter=12
-        )
-        
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#666666')
-        )
-        
-        highlight_style = ParagraphStyle(
-            'CustomHighlight',
-            parent=styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor('#2E86AB'),
-            fontWeight='bold'
-        )
 
-        # Company Header - FIXED: Use proper formatting without <b> tags
-        company_header = [
-            Paragraph("RENTAL MANAGEMENT SYSTEM", title_style),
-            Paragraph("Official Payment Receipt", styles['Heading2']),
-            Spacer(1, 20)
-        ]
-        story.extend(company_header)
-
-        # Receipt Details in a table format - FIXED: Remove HTML tags and use proper formatting
-        receipt_data = [
-            ['RECEIPT INFORMATION', ''],
-            ['Receipt Number:', f'RMS-{bill.billid:06d}'],
-            ['Issue Date:', datetime.now().strftime("%B %d, %Y")],
-            ['Issue Time:', datetime.now().strftime("%I:%M %p")]
-        ]
-        
-        receipt_table = Table(receipt_data, colWidths=[2.5*inch, 3.5*inch])
-        receipt_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
-            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),  # Labels in bold
-            ('FONTNAME', (1, 1), (1, -1), 'Helvetica'),      # Values in normal
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-            ('LEFTPADDING', (0, 0), (-1, -1), 12),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 12),
-        ]))
-        
-        story.append(receipt_table)
-        story.append(Spacer(1, 20))
-
-        # Tenant Information - FIXED: Remove HTML tags
-        story.append(Paragraph("TENANT INFORMATION", header_style))
-        tenant_data = [
-            ['Tenant ID:', str(tenant.tenantid)],
-            ['Full Name:', full_name],
-            ['Bill ID:', str(bill.billid)]
-        ]
-        
-        tenant_table = Table(tenant_data, colWidths=[1.5*inch, 4.5*inch])
-        tenant_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),  # Labels in bold
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),       # Values in normal
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('LEFTPADDING', (0, 0), (-1, -1), 12),
-        ]))
-        
-        story.append(tenant_table)
-        story.append(Spacer(1, 20))
-
-        # Payment Details - FIXED: Use proper peso sign and formatting
-        story.append(Paragraph("PAYMENT DETAILS", header_style))
-        
-        # Format amount with proper peso sign - use PHP symbol instead of HTML entity
+        # 🧾 Render from the receipt template (static background drawn as a form XObject)
+        issued_at = datetime.now()
         amount_formatted = f"PHP {float(bill.amount):,.2f}"
-        
-        payment_data = [
-            ['Description', 'Amount'],
-            [f'{bill.billtype} Payment', amount_formatted]
-        ]
-        
-        payment_table = Table(payment_data, colWidths=[4*inch, 2*inch])
-        payment_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E86AB')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('ALIGN', (0, 1), (0, 1), 'LEFT'),
-            ('ALIGN', (1, 1), (1, 1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (-1, 1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-            ('LEFTPADDING', (0, 0), (-1, -1), 12),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#DDDDDD'))
-        ]))
-        
-        story.append(payment_table)
-        story.append(Spacer(1, 30))
-
-        # Total Amount - FIXED: Use proper peso sign
-        total_data = [
-            ['TOTAL PAID:', amount_formatted]
-        ]
-        
-        total_table = Table(total_data, colWidths=[4*inch, 2*inch])
-        total_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1A5276')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ]))
-        
-        story.append(total_table)
-        story.append(Spacer(1, 30))
-
-        # Footer - FIXED: Remove HTML tags and use proper formatting
-        footer_text = """Thank you for your payment!
-        
-This receipt serves as an official record of your transaction.
-Please keep this document for your records.
-For any inquiries, please contact our administration office."""
-        
-        footer_paragraph = Paragraph(footer_text, normal_style)
-        story.append(footer_paragraph)
-
-        # Build PDF
-        doc.build(story)
+        receipt_pdf = get_receipt_template().render({
+            "receipt_number": f"RMS-{bill.billid:06d}",
+            "issue_date": issued_at.strftime("%B %d, %Y"),
+            "issue_time": issued_at.strftime("%I:%M %p"),
+            "tenant_id": str(tenant.tenantid),
+            "full_name": full_name,
+            "bill_id": str(bill.billid),
+            "description": f"{bill.billtype} Payment",
+            "amount": amount_formatted
+        })
+        receipt_path = pending_path(receipts_folder)
+        with open(receipt_path, "wb") as f:
+            f.write(receipt_pdf)
+        optimize_pdf(receipt_path)
+        # ✅ Stored under its SHA-256 (receipt_<digest>.pdf); identical receipts share one file
+        receipt_filename = store_file(receipt_path, "receipt")
 
         # ✅ Update Bill status to Paid
         bill.status = "Paid"
@@ -236,28 +79,19 @@ For any inquiries, please contact our administration office."""
         db.session.add(transaction)
 
         # ✅ Create UNIFIED notification for tenant
-        tenant_notification = Notification(
-            title='Payment Confirmed',
-            message=f'Your payment for {bill.billtype} (PHP {float(bill.amount):,.2f}) has been confirmed. Receipt #RMS-{bill.billid:06d}',
-            targetuserid=tenant.userid,  # Specific to this tenant
-            isgroupnotification=False,
-            recipientcount=1,
-            createdbyuserid=tenant.userid
+        notify_user(
+            tenant.userid,
+            'Payment Confirmed',
+            f'Your payment for {bill.billtype} (PHP {float(bill.amount):,.2f}) has been confirmed. Receipt #RMS-{bill.billid:06d}',
+            created_by=tenant.userid
         )
-        db.session.add(tenant_notification)
 
         # ✅ Create UNIFIED notification for ALL landlords
-        all_landlords = User.query.filter_by(role='Owner').all()
-        if all_landlords:
-            landlord_notification = Notification(
-                title='Payment Received',
-                message=f'Tenant {full_name} has paid {bill.billtype} of PHP {float(bill.amount):,.2f}. Receipt #RMS-{bill.billid:06d}',
-                targetuserrole='Owner',  # Target all landlords
-                isgroupnotification=True,
-                recipientcount=len(all_landlords),
-                createdbyuserid=tenant.userid
-            )
-            db.session.add(landlord_notification)
+        notify_owners(
+            'Payment Received',
+            f'Tenant {full_name} has paid {bill.billtype} of PHP {float(bill.amount):,.2f}. Receipt #RMS-{bill.billid:06d}',
+            created_by=tenant.userid
+        )
 
         # ✅ Commit all changes
         db.session.commit()
@@ -269,8 +103,8 @@ For any inquiries, please contact our administration office."""
         })
     except Exception as e:
         db.session.rollback()
-        if 'receipt_path' in locals() and os.path.exists(receipt_path):
-            os.remove(receipt_path)
+        # An unreferenced receipt file is removed later by `flask artifacts-gc`
+        # (it may be shared with another row, so it is not deleted here)
         return jsonify({"error": f"Failed to issue receipt: {str(e)}"}), 500
 
 
@@ -311,28 +145,19 @@ def reject_payment(billid):
         db.session.add(bill)
 
         # Create notification for tenant
-        tenant_notification = Notification(
-            title='Payment Rejected',
-            message=f'Your payment for {bill.billtype} (PHP {float(bill.amount):,.2f}) has been rejected. Please check your payment details and try again.',
-            targetuserid=tenant.userid,
-            isgroupnotification=False,
-            recipientcount=1,
-            createdbyuserid=tenant.userid
+        notify_user(
+            tenant.userid,
+            'Payment Rejected',
+            f'Your payment for {bill.billtype} (PHP {float(bill.amount):,.2f}) has been rejected. Please check your payment details and try again.',
+            created_by=tenant.userid
         )
-        db.session.add(tenant_notification)
 
         # Create notification for landlords
-        all_landlords = User.query.filter_by(role='Owner').all()
-        if all_landlords:
-            landlord_notification = Notification(
-                title='Payment Rejected',
-                message=f'Payment from {full_name} for {bill.billtype} (PHP {float(bill.amount):,.2f}) has been rejected.',
-                targetuserrole='Owner',
-                isgroupnotification=True,
-                recipientcount=len(all_landlords),
-                createdbyuserid=tenant.userid
-            )
-            db.session.add(landlord_notification)
+        notify_owners(
+            'Payment Rejected',
+            f'Payment from {full_name} for {bill.billtype} (PHP {float(bill.amount):,.2f}) has been rejected.',
+            created_by=tenant.userid
+        )
 
         # Commit changes
         db.session.commit()
@@ -388,11 +213,11 @@ def download_receipt(billid):
         if not os.path.exists(receipt_path):
             return jsonify({"error": "Receipt file not found"}), 404
             
-        from flask import send_file
-        return send_file(
-            receipt_path,
+        return send_upload(
+            "receipts",
+            transaction.receipt,
             as_attachment=True,
-            download_name=transaction.receipt,
+            download_name=f"receipt_{billid}.pdf",
             mimetype='application/pdf'
         )
         
@@ -401,27 +226,82 @@ def download_receipt(billid):
 
 
 # ✅ Additional route to get all transactions (for admin/landlord view)
+# Query params:
+#   limit=50            page size (max 500)
+#   cursor=<token>      X-Next-Cursor from the previous page (keyset pagination)
+#   from=YYYY-MM-DD     paymentdate lower bound (inclusive)
+#   to=YYYY-MM-DD       paymentdate upper bound (inclusive)
+#   tenant_id=<id>      only this tenant's transactions
+#   totals=true         X-Total-Count / X-Total-Amount for the filtered set
 @transaction_bp.route("/transactions/all", methods=["GET"])
 def get_all_transactions():
     try:
-        transactions = (
-            db.session.query(
-                Transaction.transactionid,
-                Transaction.billid,
-                Transaction.tenantid,
-                Transaction.paymentdate,
-                Transaction.amountpaid,
-                Transaction.receipt,
-                User.firstname,
-                User.lastname,
-                Bill.billtype
+        limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+        cursor = request.args.get("cursor")
+        date_from = request.args.get("from")
+        date_to = request.args.get("to")
+        tenant_id = request.args.get("tenant_id", type=int)
+        include_totals = request.args.get("totals", "").lower() in ("1", "true", "yes")
+
+        filters = []
+        if date_from:
+            filters.append(Transaction.paymentdate >= date_from)
+        if date_to:
+            filters.append(Transaction.paymentdate <= date_to)
+        if tenant_id:
+            filters.append(Transaction.tenantid == tenant_id)
+
+        def listed(*columns):
+            # The joined, filtered set the page lists; the totals are taken over the same set
+            return (
+                db.session.query(*columns)
+                .select_from(Transaction)
+                .join(Bill, Transaction.billid == Bill.billid)
+                .join(Tenant, Transaction.tenantid == Tenant.tenantid)
+                .join(User, Tenant.userid == User.userid)
+                .filter(*filters)
             )
-            .join(Bill, Transaction.billid == Bill.billid)
-            .join(Tenant, Transaction.tenantid == Tenant.tenantid)
-            .join(User, Tenant.userid == User.userid)
-            .order_by(Transaction.paymentdate.desc())
+
+        query = listed(
+            Transaction.transactionid,
+            Transaction.billid,
+            Transaction.tenantid,
+            Transaction.paymentdate,
+            Transaction.amountpaid,
+            Transaction.receipt,
+            User.firstname,
+            User.lastname,
+            Bill.billtype
+        )
+
+        total_count_expr = db.func.count(Transaction.transactionid)
+        total_amount_expr = db.func.coalesce(db.func.sum(db.cast(Transaction.amountpaid, db.Numeric(12, 2))), 0)
+        if include_totals:
+            # Uncorrelated scalar subqueries: evaluated once and returned with the page in the same statement
+            query = query.add_columns(
+                listed(total_count_expr).correlate(None).scalar_subquery().label("total_count"),
+                listed(total_amount_expr).correlate(None).scalar_subquery().label("total_amount")
+            )
+
+        if cursor:
+            try:
+                cursor_date, cursor_id = cursor.rsplit("_", 1)
+                cursor_id = int(cursor_id)
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
+            query = query.filter(db.or_(
+                Transaction.paymentdate < cursor_date,
+                db.and_(Transaction.paymentdate == cursor_date, Transaction.transactionid < cursor_id)
+            ))
+
+        transactions = (
+            query
+            .order_by(Transaction.paymentdate.desc(), Transaction.transactionid.desc())
+            .limit(limit + 1)
             .all()
         )
+        has_more = len(transactions) > limit
+        transactions = transactions[:limit]
 
         result = []
         for t in transactions:
@@ -430,13 +310,25 @@ def get_all_transactions():
                 "billid": t.billid,
                 "tenantid": t.tenantid,
                 "tenant_name": f"{t.firstname} {t.lastname}",
-                "payment_date": t.paymentdate.strftime("%Y-%m-%d") if t.paymentdate else None,
+                "payment_date": str(t.paymentdate)[:10] if t.paymentdate else None,
                 "amount_paid": float(t.amountpaid),
                 "receipt": t.receipt,
                 "bill_type": t.billtype
             })
 
-        return jsonify(result), 200
+        response = jsonify(result)
+        if has_more:
+            last = transactions[-1]
+            response.headers["X-Next-Cursor"] = f"{str(last.paymentdate)[:10]}_{last.transactionid}"
+        if include_totals:
+            if transactions:
+                total_count, total_amount = transactions[0].total_count, transactions[0].total_amount
+            else:
+                # Empty page (e.g. past the end): the totals still describe the filtered set
+                total_count, total_amount = listed(total_count_expr, total_amount_expr).one()
+            response.headers["X-Total-Count"] = str(total_count)
+            response.headers["X-Total-Amount"] = f"{float(total_amount):.2f}"
+        return response, 200
 
     except Exception as e:
         return jsonify({"error": f"Failed to fetch transactions: {str(e)}"}), 500
@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app reads DATABASE_URL at import time, so point it at a throwaway SQLite file first
+_db_file = os.path.join(tempfile.mkdtemp(prefix="rentahanan-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("EMAIL_TRANSPORT", "stub")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+
+from app import app as flask_app  # noqa: E402
+from extensions import db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app.config["TESTING"] = True
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager counting the SQL statements executed inside it."""
+
+    class Counter:
+        def __init__(self):
+            self.count = 0
+
+        def _on_execute(self, *args):
+            self.count += 1
+
+        def __enter__(self):
+            event.listen(db.engine, "before_cursor_execute", self._on_execute)
+            return self
+
+        def __exit__(self, *exc):
+            event.remove(db.engine, "before_cursor_execute", self._on_execute)
+
+    return Counter
+
+
+@pytest.fixture
+def upload_folder(app, tmp_path):
+    """Point UPLOAD_FOLDER at a temporary directory for the test."""
+    original = app.config["UPLOAD_FOLDER"]
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    yield tmp_path
+    app.config["UPLOAD_FOLDER"] = original
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from extensions import db
+from models.notifications_model import Notification
+from models.tenants_model import Tenant
+from models.users_model import User
+
+
+def add_user(userid, role):
+    db.session.add(User(userid=userid, firstname=f"User{userid}", lastname="Last", email=f"u{userid}@example.com",
+                        password="x", role=role, datecreated=datetime.utcnow()))
+
+
+def seed_tenants():
+    add_user(1, "Owner")
+    for userid in (2, 3, 4):
+        add_user(userid, "Tenant")
+    add_user(5, "Owner")
+    db.session.flush()
+    db.session.add_all([
+        Tenant(tenantid=10, userid="2", status="Active"),
+        Tenant(tenantid=11, userid="3", status="Active"),
+        Tenant(tenantid=12, userid="4", status="Active"),
+        Tenant(tenantid=13, userid="5", status="Active"),   # linked to an Owner account
+        Tenant(tenantid=14, userid="404", status="Active"),  # user was removed
+    ])
+    db.session.commit()
+
+
+def test_bulk_send_reports_each_tenant_id(client):
+    seed_tenants()
+    tenant_ids = [10, 11, "abc", 10, 99, 13, 14, "12"]
+
+    tenant_lookups = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and 'FROM "Tenants"' in statement:
+            tenant_lookups.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = client.post("/api/notifications/bulk-send", json={
+            "title": "Water interruption", "message": "Body", "createdbyuserid": 1, "tenant_ids": tenant_ids
+        })
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["results"] == [
+        {"tenant_id": 10, "status": "sent", "user_id": 2},
+        {"tenant_id": 11, "status": "sent", "user_id": 3},
+        {"tenant_id": "abc", "status": "failed", "reason": "Invalid tenant ID"},
+        {"tenant_id": 10, "status": "skipped", "reason": "Duplicate tenant ID"},
+        {"tenant_id": 99, "status": "failed", "reason": "Tenant not found"},
+        {"tenant_id": 13, "status": "failed", "reason": "No tenant user account"},
+        {"tenant_id": 14, "status": "failed", "reason": "No tenant user account"},
+        {"tenant_id": 12, "status": "sent", "user_id": 4},
+    ]
+    assert (body["successful_sends"], body["failed_sends"]) == (3, 4)
+    assert len(tenant_lookups) == 1 and " IN " in tenant_lookups[0]
+    assert sorted(n.targetuserid for n in Notification.query.all()) == [2, 3, 4]
+
+
+def test_bulk_send_requires_an_owner(client):
+    seed_tenants()
+
+    response = client.post("/api/notifications/bulk-send", json={
+        "title": "Hi", "message": "Body", "createdbyuserid": 2, "tenant_ids": [10]
+    })
+
+    assert response.status_code == 403
+    assert Notification.query.count() == 0
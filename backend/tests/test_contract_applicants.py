@@ -0,0 +1,57 @@
+from datetime import date, datetime
+
+from extensions import db
+from models.applications_model import Application
+from models.contracts_model import Contract
+from models.tenants_model import Tenant
+from models.units_model import House
+from models.users_model import User
+
+
+def seed_applicants(count):
+    """`count` pending applicants; every second one already has a tenant record, every fourth a contract."""
+    db.session.add(House(unitid=1, name="Unit 1", price=1000, status="Available"))
+    for i in range(1, count + 1):
+        db.session.add(User(userid=i, firstname=f"First{i}", lastname="Last", email=f"user{i}@example.com",
+                            password="x", datecreated=datetime.utcnow()))
+        db.session.flush()
+        db.session.add(Application(applicationid=i, unitid=1, userid=i, status="Pending"))
+        if i % 2 == 0:
+            db.session.add(Tenant(tenantid=i, userid=str(i), applicationid=i, status="Registered"))
+        if i % 4 == 0:
+            db.session.add(Contract(contractid=i, tenantid=i, unitid=1, startdate=date(2025, 1, 1), status="Active"))
+    db.session.commit()
+
+
+def test_applicants_query_count_does_not_grow(app, client, count_queries):
+    seed_applicants(1)
+    with count_queries() as one:
+        assert len(client.get("/api/contracts/applicants").get_json()) == 1
+
+    db.drop_all()
+    db.create_all()
+    seed_applicants(40)
+    with count_queries() as many:
+        assert len(client.get("/api/contracts/applicants").get_json()) == 30
+
+    assert many.count == one.count
+
+
+def test_applicant_with_several_tenant_rows_is_listed_once(app, client):
+    seed_applicants(2)
+    db.session.add(Tenant(tenantid=100, userid="2", applicationid=2, status="Registered"))
+    db.session.commit()
+
+    applicants = client.get("/api/contracts/applicants").get_json()
+
+    assert [a["applicationid"] for a in applicants] == [1, 2]
+    assert applicants[1]["tenantid"] == 2
+
+
+def test_page_past_the_end_keeps_total(app, client):
+    seed_applicants(8)
+
+    response = client.get("/api/contracts/applicants?page=5&per_page=5")
+
+    assert response.get_json() == []
+    assert response.headers["X-Total-Count"] == "6"
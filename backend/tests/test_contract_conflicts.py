@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from extensions import db
+from models.contracts_model import Contract
+from models.tenants_model import Tenant
+from models.units_model import House
+from models.users_model import User
+from routes.contract_route import CONFLICT_MESSAGE
+
+
+def seed_contract():
+    db.session.add(House(unitid=1, name="Unit 1", price=1000, status="Available"))
+    db.session.add(User(userid=1, firstname="Ana", lastname="Cruz", email="ana@example.com", role="Tenant",
+                        password="x", datecreated=datetime.utcnow()))
+    db.session.flush()
+    db.session.add(Tenant(tenantid=1, userid="1", status="Registered"))
+    db.session.add(Contract(contractid=1, tenantid=1, unitid=1, startdate="2025-01-01", status="Signed"))
+    db.session.commit()
+    db.session.remove()
+
+
+def test_edit_committed_between_load_and_commit_returns_409(app, client):
+    seed_contract()
+
+    def concurrent_edit(conn, cursor, statement, *args):
+        # Another request commits its change after this one loaded the contract
+        if statement.lstrip().upper().startswith('UPDATE "CONTRACTS"'):
+            conn.connection.dbapi_connection.cursor().execute(
+                'UPDATE "Contracts" SET status = \'Cancelled\', version = version + 1 WHERE contractid = 1'
+            )
+
+    event.listen(db.engine, "before_cursor_execute", concurrent_edit)
+    try:
+        response = client.put("/api/contracts/update-status/1", json={"status": "Approved", "version": 1})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", concurrent_edit)
+
+    assert response.status_code == 409
+    assert response.get_json()["error"] == CONFLICT_MESSAGE
+    assert db.session.get(Contract, 1).status != "Approved"
+
+
+def test_stale_version_from_the_client_returns_409(app, client):
+    seed_contract()
+
+    response = client.put("/api/contracts/update-status/1", json={"status": "Approved", "version": 0})
+
+    assert response.status_code == 409
+    assert response.get_json() == {"error": CONFLICT_MESSAGE, "version": 1}
+
+
+def test_current_version_updates_and_bumps_it(app, client):
+    seed_contract()
+
+    response = client.put("/api/contracts/update-status/1", json={"status": "Approved", "version": 1})
+
+    assert response.status_code == 200
+    assert response.get_json()["version"] == 2
@@ -0,0 +1,57 @@
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from extensions import db
+from models.contracts_model import Contract
+from models.notifications_model import Notification
+from models.tenants_model import Tenant
+from models.units_model import House
+from models.users_model import User
+from utils.contract_expiry import scan_expiring_contracts
+
+TODAY = date(2025, 2, 1)
+
+
+def seed_expiring(count):
+    db.session.add(House(unitid=1, name="Unit 1", price=1000, status="Occupied"))
+    db.session.add(User(userid=99, firstname="Owner", lastname="One", email="owner@example.com", role="Owner",
+                        password="x", datecreated=datetime.utcnow()))
+    for i in range(1, count + 1):
+        db.session.add(User(userid=i, firstname=f"Tenant{i}", lastname="Last", email=f"t{i}@example.com",
+                            role="Tenant", password="x", datecreated=datetime.utcnow()))
+        db.session.flush()
+        db.session.add(Tenant(tenantid=i, userid=str(i), status="Active"))
+        db.session.add(Contract(contractid=i, tenantid=i, unitid=1, startdate="2024-02-10",
+                                enddate="2025-02-10", status="Active"))
+    db.session.commit()
+
+
+def test_reminds_each_contract_once(app):
+    seed_expiring(2)
+
+    assert [c.contractid for c in scan_expiring_contracts(30, today=TODAY)] == [1, 2]
+    assert scan_expiring_contracts(30, today=TODAY) == []
+    assert Notification.query.filter_by(title="Contract Expiring Soon").count() == 2
+    assert Notification.query.filter_by(title="Lease Renewal Due").count() == 2
+
+
+def test_contract_changed_during_the_scan_is_not_notified(app):
+    seed_expiring(2)
+
+    def edit_before_claim(conn, cursor, statement, *args):
+        # A request updates contract 2 between the job's scan and its claim
+        if statement.lstrip().upper().startswith("UPDATE") and "RETURNING" in statement.upper():
+            conn.connection.dbapi_connection.cursor().execute(
+                'UPDATE "Contracts" SET version = version + 1 WHERE contractid = 2'
+            )
+
+    event.listen(db.engine, "before_cursor_execute", edit_before_claim)
+    try:
+        claimed = scan_expiring_contracts(30, today=TODAY)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", edit_before_claim)
+
+    assert [c.contractid for c in claimed] == [1]
+    assert [n.targetuserid for n in Notification.query.filter_by(title="Contract Expiring Soon")] == [1]
+    assert db.session.get(Contract, 2).reminded_enddate is None
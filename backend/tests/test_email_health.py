@@ -0,0 +1,39 @@
+from utils import email_outbox
+from utils.email_outbox import EmailWorker, publish_worker_health
+from utils.email_transport import create_transport
+
+
+def test_health_fails_without_a_reporting_worker(app, client):
+    response = client.get("/api/health/email")
+
+    assert response.status_code == 503
+    assert response.get_json()["worker_reporting"] is False
+
+
+def test_health_reports_the_worker_breaker(app, client):
+    transport = create_transport("stub")
+    publish_worker_health(transport)
+
+    body = client.get("/api/health/email").get_json()
+    assert body["worker_reporting"] is True
+    assert body["state"] == "closed"
+
+    for _ in range(transport.breaker.failure_threshold):
+        transport.breaker.record_failure()
+    publish_worker_health(transport)
+
+    response = client.get("/api/health/email")
+    assert response.status_code == 503
+    assert response.get_json()["state"] == "open"
+    transport.breaker.record_success()
+
+
+def test_health_falls_back_to_the_in_process_worker(app, client, monkeypatch):
+    worker = EmailWorker(app, transport=create_transport("stub"))
+    monkeypatch.setattr(worker, "is_alive", lambda: True)
+    monkeypatch.setattr(email_outbox, "_worker", worker)
+
+    response = client.get("/api/health/email")
+
+    assert response.status_code == 200
+    assert response.get_json()["state"] == "closed"
@@ -0,0 +1,30 @@
+from extensions import db
+from models.email_outbox_model import EmailOutbox
+from utils.email_outbox import claim_batch, enqueue_email, record_results, requeue_dead
+from utils.email_transport import SendResult
+
+
+def dead_letter_all():
+    enqueue_email("a@example.com", "Your code", "<p>Code: 123456</p>", "password_reset")
+    enqueue_email("b@example.com", "Welcome", "<p>Welcome!</p>", "welcome")
+    db.session.commit()
+    batch = claim_batch()
+    record_results(batch, [SendResult(False, error="rejected", retryable=False) for _ in batch])
+    return {row.kind: row for row in EmailOutbox.query.all()}
+
+
+def test_dead_letter_drops_codes(app):
+    rows = dead_letter_all()
+
+    assert rows["password_reset"].status == "dead"
+    assert rows["password_reset"].htmlcontent == ""
+    assert rows["welcome"].htmlcontent == "<p>Welcome!</p>"
+
+
+def test_requeue_skips_emails_with_codes(app):
+    dead_letter_all()
+
+    assert requeue_dead() == 1
+
+    statuses = {row.kind: (row.status, row.attempts) for row in EmailOutbox.query.all()}
+    assert statuses == {"password_reset": ("dead", 1), "welcome": ("pending", 0)}
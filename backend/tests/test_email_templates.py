@@ -0,0 +1,47 @@
+import pytest
+from jinja2 import ChoiceLoader, DictLoader
+from markupsafe import Markup
+
+from utils import email_templates
+from utils.email_templates import EmailTemplate
+
+VALUES = [
+    "Ana",
+    "<script>alert('x')</script> & \"quotes\"",
+    Markup("<b>trusted</b>"),
+    123456,
+    None,
+]
+
+
+@pytest.mark.parametrize("name, variable", [("welcome.html", "user_name"), ("password_reset.html", "code")])
+@pytest.mark.parametrize("value", VALUES)
+def test_precompiled_output_matches_jinja(name, variable, value):
+    template = EmailTemplate(name)
+    assert template.precompiled
+
+    assert template.render(**{variable: value}) == template.template.render(**{variable: value})
+
+
+@pytest.mark.parametrize("name", ["welcome.html", "password_reset.html"])
+def test_missing_variables_render_empty_like_jinja(name):
+    template = EmailTemplate(name)
+
+    assert template.render() == template.template.render()
+
+
+def test_value_dependent_templates_fall_back_to_jinja(monkeypatch):
+    loader = ChoiceLoader([DictLoader({"list.html": "{% for n in items %}<li>{{ n }}</li>{% endfor %}"}),
+                           email_templates._env.loader])
+    monkeypatch.setattr(email_templates._env, "loader", loader)
+    template = EmailTemplate("list.html")
+
+    assert not template.precompiled
+    assert template.render(items=["<a>", "b"]) == "<li>&lt;a&gt;</li><li>b</li>"
+
+
+def test_digest_keeps_the_brevo_placeholders():
+    template = EmailTemplate("notification_digest.html")
+
+    assert template.precompiled
+    assert "{{ params.name }}" in template.render()
@@ -0,0 +1,50 @@
+import hashlib
+
+import pytest
+
+
+@pytest.fixture
+def receipt(upload_folder):
+    data = b"%PDF-1.4 receipt bytes " * 100
+    folder = upload_folder / "receipts"
+    folder.mkdir()
+    name = f"receipt_{hashlib.sha256(data).hexdigest()}.pdf"
+    (folder / name).write_bytes(data)
+    return name, data
+
+
+def test_matching_etag_returns_304(client, receipt):
+    name, data = receipt
+    first = client.get(f"/uploads/receipts/{name}")
+    assert first.status_code == 200
+    assert first.data == data
+    assert "immutable" in first.headers["Cache-Control"]
+
+    again = client.get(f"/uploads/receipts/{name}", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert again.status_code == 304
+    assert again.data == b""
+
+
+def test_range_request_returns_206(client, receipt):
+    name, data = receipt
+
+    response = client.get(f"/uploads/receipts/{name}", headers={"Range": "bytes=4-15"})
+
+    assert response.status_code == 206
+    assert response.data == data[4:16]
+    assert response.headers["Content-Range"] == f"bytes 4-15/{len(data)}"
+
+
+def test_x_accel_mode_hands_the_file_to_nginx(app, client, receipt):
+    name, _ = receipt
+    app.config["SENDFILE_MODE"] = "x-accel"
+    try:
+        response = client.get(f"/uploads/receipts/{name}")
+        cached = client.get(f"/uploads/receipts/{name}", headers={"If-None-Match": response.headers["ETag"]})
+    finally:
+        app.config["SENDFILE_MODE"] = ""
+
+    assert response.headers["X-Accel-Redirect"] == f"/protected-uploads/receipts/{name}"
+    assert response.data == b""
+    assert cached.status_code == 304
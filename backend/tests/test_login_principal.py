@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from extensions import db
+from models.applications_model import Application
+from models.tenants_model import Tenant
+from models.units_model import House
+from models.users_model import User
+from utils import principal
+from utils.passwords import PASSWORD_HASH_METHOD, hash_password
+from utils.principal import get_principal
+
+
+def seed_user(role="Tenant"):
+    db.session.add(House(unitid=1, name="Unit 1", price=1000, status="Available"))
+    db.session.add(User(userid=1, firstname="Ana", lastname="Cruz", email="ana@example.com", role=role,
+                        password=hash_password("secret", PASSWORD_HASH_METHOD), datecreated=datetime.utcnow()))
+    db.session.flush()
+
+
+def test_login_reports_the_latest_application_once(app, client, count_queries):
+    seed_user()
+    db.session.add_all([
+        Application(applicationid=1, unitid=1, userid=1, status="Rejected"),
+        Application(applicationid=2, unitid=1, userid=1, status="Pending"),
+        Tenant(tenantid=1, userid="1", applicationid=1, status="Registered"),
+        Tenant(tenantid=2, userid="1", applicationid=2, status="Active"),
+    ])
+    db.session.commit()
+
+    with count_queries() as queries:
+        response = client.post("/api/login", json={"email": "ana@example.com", "password": "secret"})
+
+    user = response.get_json()["user"]
+    assert response.status_code == 200
+    assert user["application_status"] == "Pending"
+    assert user["tenant_status"] == "Active"  # the tenant record of that application
+    assert queries.count == 1
+
+
+def test_tenant_falls_back_to_the_first_record(app):
+    seed_user()
+    db.session.add_all([
+        Application(applicationid=1, unitid=1, userid=1, status="Approved"),
+        Application(applicationid=2, unitid=1, userid=1, status="Pending"),
+        Tenant(tenantid=3, userid="1", applicationid=None, status="Terminated"),
+        Tenant(tenantid=1, userid="1", applicationid=1, status="Active"),
+    ])
+    db.session.commit()
+
+    assert get_principal(1) == {"userid": 1, "role": "Tenant", "tenantid": 1,
+                                "tenant_status": "Active", "application_status": "Pending"}
+
+
+def test_principal_is_cached_until_a_change_is_committed(app):
+    seed_user()
+    db.session.add(Tenant(tenantid=1, userid="1", status="Registered"))
+    db.session.commit()
+    assert get_principal(1)["tenant_status"] == "Registered"
+
+    # Written behind the ORM's back: the cached principal is still served
+    db.session.execute(db.text('UPDATE "Tenants" SET status = \'Active\' WHERE tenantid = 1'))
+    db.session.commit()
+    assert get_principal(1)["tenant_status"] == "Registered"
+
+    tenant = db.session.get(Tenant, 1)
+    tenant.status = "Terminated"
+    db.session.flush()
+    db.session.rollback()
+    assert get_principal(1)["tenant_status"] == "Registered"
+
+    db.session.get(User, 1).role = "Owner"
+    db.session.commit()
+    assert get_principal(1)["role"] == "Owner"
+    assert get_principal(1)["tenant_status"] == "Active"
+
+
+def test_current_principal_reads_the_jwt_identity(app, monkeypatch):
+    seed_user()
+    db.session.commit()
+    monkeypatch.setattr(principal, "get_jwt_identity", lambda: {"userid": 1, "role": "Tenant"})
+
+    assert principal.current_principal()["userid"] == 1
+    assert get_principal(404) is None
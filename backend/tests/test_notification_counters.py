@@ -0,0 +1,41 @@
+from sqlalchemy import event
+
+from extensions import db
+from models.notifications_model import Notification, NotificationCounter
+from utils.notification_counters import read_counters, reconcile_counters
+from utils.notification_service import notify_users
+
+
+def test_counters_follow_inserts_and_reconcile_fixes_drift(app):
+    read_counters()  # seeds the rows
+    notify_users([1, 2], "Hello", "Body")
+    db.session.add(Notification(title="Broadcast", message="Body", targetuserrole="Owner", isgroupnotification=True))
+    db.session.commit()
+    assert read_counters() == {"total": 3, "group_notifications": 1, "individual_notifications": 2,
+                               "tenant_notifications": 0, "owner_notifications": 1}
+
+    db.session.get(NotificationCounter, "total").value = 99
+    db.session.commit()
+    reconcile_counters()
+    db.session.commit()
+
+    assert read_counters()["total"] == 3
+
+
+def test_reconcile_locks_the_counters_before_counting(app):
+    read_counters()
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        reconcile_counters()
+        db.session.commit()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    lock = next(i for i, s in enumerate(statements) if s.startswith("SELECT") and 'FROM "NotificationCounters"' in s)
+    scan = next(i for i, s in enumerate(statements) if 'FROM "Notifications"' in s)
+    assert lock < scan
@@ -0,0 +1,63 @@
+import time
+from datetime import datetime
+
+from extensions import db
+from models.notification_reads_model import NotificationRead
+from models.users_model import User
+from utils import notification_digest
+from utils.email_transport import StubTransport
+from utils.notification_digest import collect_digests, send_digests
+from utils.notification_service import notify_owners
+
+
+def seed_owners(count):
+    for userid in range(1, count + 1):
+        db.session.add(User(userid=userid, firstname=f"Owner{userid}", lastname="Last", email=f"o{userid}@example.com",
+                            password="x", role="Owner", datecreated=datetime.utcnow()))
+    db.session.commit()
+
+
+def test_digests_go_out_in_batches_and_advance_cursors(app):
+    seed_owners(5)
+    notification = notify_owners("Rent <due>", "Pay by Friday")
+    db.session.commit()
+    db.session.add(NotificationRead(userid=1, notificationid=notification.notificationid))
+    db.session.commit()
+
+    digests = collect_digests(24)
+    assert sorted(d["userid"] for d in digests) == [2, 3, 4, 5]
+
+    transport = StubTransport()
+    report = send_digests(transport, digests, batch_size=3, calls_per_second=100)
+
+    assert report == {"digests": 4, "sent": 4, "failed": 0, "calls": 2}
+    assert transport.calls == 2
+    assert sorted(m["recipient"] for m in transport.sent) == [f"o{i}@example.com" for i in (2, 3, 4, 5)]
+    assert "Rent &lt;due&gt;" in transport.sent[0]["html"]
+    assert collect_digests(24) == []  # cursors moved past the notification
+
+
+def test_failed_batch_keeps_cursors(app, monkeypatch):
+    monkeypatch.setattr(notification_digest, "DIGEST_MAX_RETRIES", 0)  # skip the backoff sleeps
+    seed_owners(2)
+    notify_owners("Water interruption", "Tomorrow 9-12")
+    db.session.commit()
+
+    report = send_digests(StubTransport(outage=True), collect_digests(24), calls_per_second=100)
+
+    assert (report["sent"], report["failed"]) == (0, 2)
+    assert len(collect_digests(24)) == 2
+
+
+def test_calls_are_paced_by_the_token_bucket(app):
+    seed_owners(3)
+    notify_owners("Inspection", "Next week")
+    db.session.commit()
+
+    transport = StubTransport()
+    started = time.monotonic()
+    send_digests(transport, collect_digests(24), batch_size=1, calls_per_second=10)
+    elapsed = time.monotonic() - started
+
+    assert transport.calls == 3
+    assert elapsed >= 0.18  # the first call is immediate, then one every 0.1 s
@@ -0,0 +1,66 @@
+import threading
+import time
+from datetime import datetime
+
+from extensions import db
+from models.users_model import User
+from utils.notification_events import notification_broker
+from utils.notification_service import notify_user
+
+
+def seed_user():
+    db.session.add(User(userid=1, firstname="Tenant", lastname="One", email="tenant@example.com",
+                        password="x", role="Tenant", datecreated=datetime.utcnow()))
+    db.session.commit()
+
+
+def test_commit_publishes_to_subscribers(app):
+    seed_user()
+    subscriber = notification_broker.subscribe(1, "Tenant")
+    try:
+        notification = notify_user(1, "Bill due", "Body")
+        db.session.flush()
+        assert subscriber.get(timeout=0) is None  # nothing is published before the commit
+        db.session.commit()
+
+        events = [subscriber.get(timeout=0), subscriber.get(timeout=0)]
+    finally:
+        notification_broker.unsubscribe(subscriber)
+
+    name, data, event_id = events[0]
+    assert (name, event_id, data["title"]) == ("notification", notification.notificationid, "Bill due")
+    assert events[1] == ("counters", {"unreadNotifications": 1}, None)
+
+
+def test_poll_catches_up_from_since_id(client):
+    seed_user()
+    first = notify_user(1, "First", "Body")
+    db.session.commit()
+    second = notify_user(1, "Second", "Body")
+    db.session.commit()
+
+    body = client.get(f"/api/notifications/poll/1?since_id={first.notificationid}&timeout=0").get_json()
+
+    assert [n["notificationid"] for n in body["notifications"]] == [second.notificationid]
+    assert body["last_id"] == second.notificationid
+
+
+def test_poll_waits_for_a_published_event(client):
+    seed_user()
+    event = {"notificationid": 41, "title": "Live"}
+
+    def publish_when_subscribed():
+        while not notification_broker.subscriber_count():
+            time.sleep(0.01)
+        notification_broker.publish([
+            (("user", 2), "notification", {"notificationid": 42}, 42),  # someone else's
+            (("user", 1), "notification", event, 41),
+        ])
+
+    publisher = threading.Thread(target=publish_when_subscribed)
+    publisher.start()
+    body = client.get("/api/notifications/poll/1?since_id=40&timeout=5").get_json()
+    publisher.join()
+
+    assert body["notifications"] == [event]
+    assert body["last_id"] == 41
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from extensions import db
+from models.tenants_model import Tenant
+from models.users_model import User
+from utils.notification_service import notify_role, notify_users
+
+
+def seed_inbox(count):
+    db.session.add(User(userid=1, firstname="Tenant", lastname="One", email="tenant@example.com",
+                        password="x", role="Tenant", datecreated=datetime.utcnow()))
+    db.session.flush()
+    for i in range(count):
+        notify_users([1], f"Notice {i}", "Body")
+    db.session.commit()
+
+
+def test_inbox_without_paging_params_is_complete(app, client):
+    seed_inbox(60)
+
+    body = client.get("/api/notifications/1").get_json()
+
+    assert len(body["notifications"]) == 60
+    assert body["has_more"] is False
+    assert body["latest_id"] == body["notifications"][0]["notificationid"]
+
+
+def test_older_pages_do_not_move_latest_id(app, client):
+    seed_inbox(5)
+
+    head = client.get("/api/notifications/1?limit=2").get_json()
+    older = client.get(f"/api/notifications/1?limit=2&before={head['next_before']}").get_json()
+
+    assert head["has_more"] is True
+    assert head["latest_id"] == head["notifications"][0]["notificationid"]
+    assert [n["notificationid"] for n in older["notifications"]] == [head["next_before"] - 1, head["next_before"] - 2]
+    assert older["latest_id"] is None
+
+
+def test_stats_count_tenant_broadcasts(app, client):
+    seed_inbox(2)
+    db.session.add(Tenant(tenantid=1, userid="1", status="Active"))
+    db.session.commit()
+    notify_role("Tenant", "Water interruption", "Body")
+    db.session.commit()
+
+    stats = client.get("/api/notifications/stats/1").get_json()["stats"]
+
+    assert stats == {"total_notifications": 3, "unread_notifications": 3}
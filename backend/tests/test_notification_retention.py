@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from extensions import db
+from models.notification_reads_model import NotificationRead
+from models.notifications_model import Notification, NotificationArchive, get_ph_time
+from utils.notification_retention import archive_expired, collapse_duplicates
+
+
+def add_notification(age, title="Notice", group=False, **fields):
+    notification = Notification(title=title, message="Body", creationdate=get_ph_time() - age,
+                                isgroupnotification=group, **fields)
+    db.session.add(notification)
+    db.session.flush()
+    return notification.notificationid
+
+
+def test_archive_expired_moves_rows_in_batches(app):
+    old_ids = [add_notification(timedelta(days=100), targetuserid=1) for _ in range(5)]
+    recent_id = add_notification(timedelta(days=1), targetuserid=1)
+    db.session.add(NotificationRead(userid=1, notificationid=old_ids[0]))
+    db.session.commit()
+
+    batches = []
+
+    def count_batches(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('INSERT INTO "NOTIFICATIONSARCHIVE"'):
+            batches.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count_batches)
+    try:
+        assert archive_expired(90, batch_size=2) == 5
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_batches)
+
+    assert len(batches) == 3
+    assert [n.notificationid for n in Notification.query.all()] == [recent_id]
+    archived = NotificationArchive.query.order_by(NotificationArchive.notificationid).all()
+    assert [(a.notificationid, a.archivereason) for a in archived] == [(nid, "expired") for nid in old_ids]
+    assert NotificationRead.query.count() == 0
+
+
+def test_collapse_only_looks_back_48_hours(app):
+    # An old run of duplicates is left alone: earlier nightly runs handled that period
+    old_first = add_notification(timedelta(days=10), "Old", group=True, targetuserrole="Owner")
+    old_repeat = add_notification(timedelta(days=10) - timedelta(hours=1), "Old", group=True, targetuserrole="Owner")
+    # A repeat inside the lookback is compared with its original just before it
+    first = add_notification(timedelta(hours=49), "Rent due", group=True, targetuserrole="Tenant")
+    repeat = add_notification(timedelta(hours=47), "Rent due", group=True, targetuserrole="Tenant")
+    other_role = add_notification(timedelta(hours=46), "Rent due", group=True, targetuserrole="Owner")
+    db.session.commit()
+
+    assert collapse_duplicates(window_hours=24) == 1
+
+    remaining = {n.notificationid for n in Notification.query.all()}
+    assert remaining == {old_first, old_repeat, first, other_role}
+    assert [(a.notificationid, a.archivereason) for a in NotificationArchive.query.all()] == [(repeat, "duplicate")]
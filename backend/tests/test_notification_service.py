@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from extensions import db
+from models.notifications_model import Notification
+from models.tenants_model import Tenant
+from models.users_model import User
+from utils.notification_service import notify_role, notify_users, role_recipient_count
+
+
+def add_user(userid, role):
+    db.session.add(User(userid=userid, firstname=f"User{userid}", lastname="Last", email=f"u{userid}@example.com",
+                        password="x", role=role, datecreated=datetime.utcnow()))
+
+
+def test_notify_role_counts_recipients_as_they_change(app):
+    add_user(1, "Owner")
+    db.session.commit()
+    assert notify_role("Owner", "Hello", "Body").recipientcount == 1
+
+    add_user(2, "Owner")
+    db.session.commit()
+    assert notify_role("Owner", "Hello", "Body").recipientcount == 2
+
+    db.session.delete(db.session.get(User, 2))
+    db.session.commit()
+    assert notify_role("Owner", "Hello", "Body").recipientcount == 1
+
+
+def test_notify_role_skips_roles_without_recipients(app):
+    add_user(1, "Tenant")
+    db.session.commit()
+    assert notify_role("Tenant", "Hello", "Body") is None
+
+    db.session.add(Tenant(tenantid=1, userid="1", status="Active"))
+    db.session.commit()
+    notification = notify_role("Tenant", "Hello", "Body")
+    db.session.commit()
+
+    assert (notification.targetuserrole, notification.recipientcount) == ("Tenant", 1)
+
+
+def test_rolled_back_change_does_not_stick_in_the_cache(app):
+    add_user(1, "Owner")
+    db.session.commit()
+    add_user(2, "Owner")
+    db.session.flush()
+    assert role_recipient_count("Owner") == 2  # counted inside the open transaction
+
+    db.session.rollback()
+
+    assert role_recipient_count("Owner") == 1
+
+
+def test_notify_users_inserts_one_row_per_user(app):
+    for userid in (1, 2, 3):
+        add_user(userid, "Tenant")
+    db.session.commit()
+
+    notify_users([1, 2, 3], "Rent reminder", "Body", created_by=1)
+    db.session.commit()
+
+    rows = Notification.query.order_by(Notification.targetuserid).all()
+    assert [(n.targetuserid, n.recipientcount, n.isgroupnotification) for n in rows] == [
+        (1, 1, False), (2, 1, False), (3, 1, False)
+    ]
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from extensions import db
+from models.users_model import User
+from utils import passwords
+from utils.email_utils import _grant_key
+from utils.passwords import HashPoolBusy, canonical_method, verify_and_update
+from utils.ttl_store import get_verification_store
+
+REGISTRATION = {
+    "firstname": "Ana", "lastname": "Cruz", "email": "ana@example.com", "phone": "09170000000",
+    "password": "secret", "dob": "2000-01-01", "street": "1 Main", "barangay": "Centro",
+    "city": "Naga", "province": "Camarines Sur", "zipcode": "4400",
+}
+
+
+def busy(*args, **kwargs):
+    raise HashPoolBusy()
+
+
+def test_register_answers_503_when_the_hash_pool_is_busy(client, monkeypatch):
+    monkeypatch.setattr(passwords, "_run", busy)
+
+    response = client.post("/api/register", json=REGISTRATION)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert User.query.count() == 0
+
+
+def test_busy_reset_keeps_the_verified_grant(client, monkeypatch):
+    db.session.add(User(userid=1, firstname="Ana", lastname="Cruz", email="ana@example.com", role="Tenant",
+                        password="x", datecreated=datetime.utcnow()))
+    db.session.commit()
+    get_verification_store().set(_grant_key("ana@example.com"), True, 60)
+    body = {"email": "ana@example.com", "new_password": "new-secret", "confirm_password": "new-secret"}
+
+    with monkeypatch.context() as patch:
+        patch.setattr(passwords, "_run", busy)
+        response = client.post("/api/forgot/reset", json=body)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    assert client.post("/api/forgot/reset", json=body).status_code == 200
+
+
+def test_legacy_hash_is_upgraded_on_verify():
+    legacy = generate_password_hash("secret", method="pbkdf2:sha256:1000")
+
+    ok, new_hash = verify_and_update(legacy, "secret")
+
+    assert ok is True
+    assert new_hash.split("$", 1)[0] == canonical_method()
+    assert check_password_hash(new_hash, "secret")
+    assert verify_and_update(new_hash, "secret") == (True, None)
+    assert verify_and_update(legacy, "wrong") == (False, None)
+
+
+def test_login_stores_the_upgraded_hash(client):
+    db.session.add(User(userid=1, firstname="Ana", lastname="Cruz", email="ana@example.com", role="Tenant",
+                        password=generate_password_hash("secret", method="pbkdf2:sha256:1000"),
+                        datecreated=datetime.utcnow()))
+    db.session.commit()
+
+    response = client.post("/api/login", json={"email": "ana@example.com", "password": "secret"})
+
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(User, 1).password.split("$", 1)[0] == canonical_method()
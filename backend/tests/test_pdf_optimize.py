@@ -0,0 +1,29 @@
+import hashlib
+import io
+
+from reportlab.pdfgen import canvas
+
+from utils.artifact_store import store_bytes
+
+
+def uncompressed_pdf():
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pageCompression=0)
+    for line in range(60):
+        pdf.drawString(72, 800 - line * 12, "Rental receipt line that compresses well " * 2)
+    pdf.save()
+    return buffer.getvalue()
+
+
+def test_apply_keeps_content_addressed_names_valid(app, upload_folder):
+    receipts = upload_folder / "receipts"
+    stored = store_bytes(str(receipts), "receipt", uncompressed_pdf())
+    (receipts / "receipt_legacy.pdf").write_bytes(uncompressed_pdf())
+
+    result = app.test_cli_runner().invoke(args=["pdf-optimize", "--apply"])
+    assert result.exit_code == 0, result.output
+
+    data = (receipts / stored).read_bytes()
+    assert stored == f"receipt_{hashlib.sha256(data).hexdigest()}.pdf"
+    # Files without a content address are still recompressed
+    assert len((receipts / "receipt_legacy.pdf").read_bytes()) < len(uncompressed_pdf())
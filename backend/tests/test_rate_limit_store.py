@@ -0,0 +1,83 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from extensions import db
+from models.users_model import User
+from utils.rate_limit import Limit, StoreBucketBackend
+from utils.ttl_store import DatabaseTTLStore, LocalRedis, MemoryTTLStore, RedisTTLStore
+
+
+def store_factories():
+    return {
+        "memory": MemoryTTLStore,
+        "redis": lambda: RedisTTLStore(LocalRedis()),
+        "database": DatabaseTTLStore,
+    }
+
+
+@pytest.mark.parametrize("store_name", ["memory", "redis", "database"])
+def test_bucket_allows_capacity_then_limits(app, store_name):
+    backend = StoreBucketBackend(store_factories()[store_name]())
+    limit = Limit("test", "3/hour")
+
+    waits = [backend.take(limit, "a@example.com") for _ in range(4)]
+
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3] > 0
+    backend.refund(limit, "a@example.com")
+    assert backend.take(limit, "a@example.com") == 0
+    assert backend.take(limit, "b@example.com") == 0
+
+
+@pytest.mark.parametrize("store_name", ["memory", "redis"])
+def test_concurrent_takes_never_share_a_token(app, store_name):
+    backend = StoreBucketBackend(store_factories()[store_name]())
+    limit = Limit("test", "5/hour")
+    allowed = []
+    start = threading.Barrier(20)
+
+    def worker():
+        start.wait()
+        if backend.take(limit, "key") == 0:
+            allowed.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(allowed) == 5
+
+
+def test_database_store_leaves_the_request_session_alone(app):
+    store = DatabaseTTLStore()
+    db.session.add(User(userid=1, firstname="Pending", lastname="User", email="pending@example.com",
+                        password="x", datecreated=datetime.utcnow()))
+
+    store.set("code", "123456", 60)
+    db.session.rollback()
+
+    assert store.get("code") == "123456"
+    assert db.session.get(User, 1) is None
+    assert store.pop("code") == "123456"
+    assert store.pop("code") is None
+
+
+def test_memory_modify_sweeps_and_evicts_like_set():
+    now = [1000.0]
+    store = MemoryTTLStore(max_entries=3, clock=lambda: now[0])
+    store.set("expiring", 1, 1)
+    now[0] += 5
+
+    store.modify("a", lambda current: (1, 60, None))
+    assert len(store) == 1  # the expired entry was swept
+
+    for key in ("b", "c", "d"):
+        store.modify(key, lambda current: (1, 60, None))
+
+    assert len(store) == 3
+    assert store.get("a") is None  # evicted as the oldest
+    assert [store.get(key) for key in ("b", "c", "d")] == [1, 1, 1]
@@ -0,0 +1,37 @@
+import io
+
+from PyPDF2 import PdfReader
+
+from utils.receipt_template import get_receipt_template
+
+FIELDS = {
+    "receipt_number": "RMS-000042",
+    "issue_date": "February 01, 2025",
+    "issue_time": "09:30 AM",
+    "tenant_id": "7",
+    "full_name": "Ana Cruz",
+    "bill_id": "42",
+    "description": "Rent Payment",
+    "amount": "PHP 5,000.00"
+}
+
+
+def test_receipt_has_background_and_fields():
+    pdf = get_receipt_template().render(FIELDS)
+
+    reader = PdfReader(io.BytesIO(pdf))
+    text = reader.pages[0].extract_text()
+    assert len(reader.pages) == 1
+    assert reader.metadata.title == "Receipt RMS-000042"
+    for expected in ("RENTAL MANAGEMENT SYSTEM", "TOTAL PAID:", "RMS-000042", "Ana Cruz", "PHP 5,000.00"):
+        assert expected in text
+    # The static part is a form XObject carrying its own fonts
+    xobjects = reader.pages[0]["/Resources"]["/XObject"]
+    assert any("/Font" in xobject.get_object()["/Resources"] for xobject in xobjects.values())
+
+
+def test_equal_fields_render_equal_bytes():
+    template = get_receipt_template()
+
+    assert template.render(FIELDS) == template.render(dict(FIELDS))
+    assert template.render(FIELDS) != template.render({**FIELDS, "amount": "PHP 1.00"})
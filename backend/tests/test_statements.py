@@ -0,0 +1,38 @@
+import json
+from datetime import datetime
+
+from PyPDF2 import PdfReader
+
+from extensions import db
+from models.bills_model import Bill
+from models.tenants_model import Tenant
+from models.transaction_model import Transaction
+from models.users_model import User
+from utils.statements import generate_monthly_statements
+
+
+def test_generates_statements_and_index(app, upload_folder):
+    for i, status in ((1, "Active"), (2, "Active"), (3, "Terminated")):
+        db.session.add(User(userid=i, firstname=f"Tenant{i}", lastname="Last", email=f"t{i}@example.com",
+                            role="Tenant", password="x", datecreated=datetime.utcnow()))
+        db.session.flush()
+        db.session.add(Tenant(tenantid=i, userid=str(i), status=status))
+    db.session.add_all([
+        Bill(billid=1, tenantid=1, issuedate="2025-01-05", amount=1000, billtype="Rent", status="Paid"),
+        Bill(billid=2, tenantid=1, issuedate="2025-01-20", amount=250, billtype="Water", status="Unpaid"),
+        Bill(billid=3, tenantid=1, issuedate="2025-02-05", amount=1000, billtype="Rent", status="Unpaid"),
+        Transaction(transactionid=1, billid=1, tenantid=1, paymentdate="2025-01-06", amountpaid="1000"),
+    ])
+    db.session.commit()
+
+    index = generate_monthly_statements(2025, 1, str(upload_folder), workers=1)
+
+    folder = upload_folder / "statements" / "2025-01"
+    assert json.loads((folder / "index.json").read_text()) == index
+    assert index["count"] == 2 and index["failures"] == []
+    first, second = index["statements"]
+    assert (first["tenantid"], first["bills"], first["payments"]) == (1, 2, 1)
+    assert (first["total_billed"], first["total_paid"]) == (1250, 1000)
+    assert (second["tenantid"], second["bills"]) == (2, 0)
+    text = PdfReader(str(folder / "statement_1_2025-01.pdf")).pages[0].extract_text()
+    assert "MONTHLY STATEMENT" in text and "January 2025" in text
@@ -0,0 +1,50 @@
+import io
+import zipfile
+from datetime import datetime
+
+from extensions import db
+from models.applications_model import Application
+from models.bills_model import Bill
+from models.tenants_model import Tenant
+from models.transaction_model import Transaction
+from models.users_model import User
+from utils.file_delivery import stream_zip
+
+
+def test_bundle_has_each_file_once_and_lists_missing_ones(client, upload_folder):
+    for folder in ("valid_ids", "receipts"):
+        (upload_folder / folder).mkdir()
+    (upload_folder / "valid_ids" / "id.png").write_bytes(b"id image")
+    (upload_folder / "receipts" / "receipt_abc.pdf").write_bytes(b"%PDF receipt")
+
+    db.session.add(User(userid=1, firstname="Ana", lastname="Cruz", email="ana@example.com", role="Tenant",
+                        password="x", datecreated=datetime.utcnow()))
+    db.session.flush()
+    db.session.add(Application(applicationid=1, userid=1, valid_id="id.png", brgy_clearance="gone.png"))
+    db.session.add(Tenant(tenantid=1, userid="1", applicationid=1, status="Active"))
+    db.session.add_all([Bill(billid=1, tenantid=1, amount=1000), Bill(billid=2, tenantid=1, amount=1000)])
+    # Identical receipts are stored once and referenced by both transactions
+    db.session.add_all([Transaction(transactionid=1, billid=1, tenantid=1, receipt="receipt_abc.pdf"),
+                        Transaction(transactionid=2, billid=2, tenantid=1, receipt="receipt_abc.pdf")])
+    db.session.commit()
+
+    response = client.get("/api/tenants/1/documents/bundle")
+
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    assert sorted(archive.namelist()) == ["MANIFEST.txt", "receipts/receipt_abc.pdf", "valid_ids/id.png"]
+    assert archive.read("receipts/receipt_abc.pdf") == b"%PDF receipt"
+    manifest = archive.read("MANIFEST.txt").decode()
+    assert "Missing files:\n  brgy_clearances/gone.png" in manifest
+
+
+def test_stream_zip_never_seeks(tmp_path):
+    path = tmp_path / "big.bin"
+    path.write_bytes(bytes(range(256)) * 2000)
+
+    chunks = list(stream_zip([("big.bin", str(path))]))
+
+    assert len(chunks) > 2  # streamed, not built in one piece
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.read("big.bin") == path.read_bytes()
+    assert archive.testzip() is None
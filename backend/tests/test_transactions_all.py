@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from extensions import db
+from models.bills_model import Bill
+from models.tenants_model import Tenant
+from models.transaction_model import Transaction
+from models.users_model import User
+
+
+def seed_transactions():
+    db.session.add(User(userid=1, firstname="Ana", lastname="Cruz", email="ana@example.com", role="Tenant",
+                        password="x", datecreated=datetime.utcnow()))
+    db.session.flush()
+    db.session.add(Tenant(tenantid=1, userid="1", status="Active"))
+    db.session.add(Bill(billid=1, tenantid=1, amount=100, billtype="Rent", status="Paid"))
+    dates = ["2025-03-01", "2025-03-05", "2025-03-05", "2025-03-05", "2025-03-09"]
+    for transactionid, paymentdate in enumerate(dates, start=1):
+        db.session.add(Transaction(transactionid=transactionid, billid=1, tenantid=1,
+                                   paymentdate=paymentdate, amountpaid="100"))
+    # Its bill is gone, so the listing's join drops it: it must not be counted either
+    db.session.add(Transaction(transactionid=6, billid=404, tenantid=1, paymentdate="2025-03-05", amountpaid="999"))
+    db.session.commit()
+
+
+def test_cursor_walks_equal_dates_once(client):
+    seed_transactions()
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/transactions/all?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url)
+        assert response.status_code == 200
+        seen.extend((t["payment_date"], t["transactionid"]) for t in response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == [
+        ("2025-03-09", 5),
+        ("2025-03-05", 4),
+        ("2025-03-05", 3),
+        ("2025-03-05", 2),
+        ("2025-03-01", 1),
+    ]
+
+
+def test_totals_match_the_listed_rows(client):
+    seed_transactions()
+
+    response = client.get("/api/transactions/all?limit=2&totals=1")
+    assert response.headers["X-Total-Count"] == "5"
+    assert response.headers["X-Total-Amount"] == "500.00"
+
+    response = client.get("/api/transactions/all?totals=1&cursor=2025-03-01_1")
+    assert response.get_json() == []
+    assert response.headers["X-Total-Count"] == "5"
+    assert response.headers["X-Total-Amount"] == "500.00"
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import tempfile
+import time
+
+from sqlalchemy import literal, select, union_all
+
+from extensions import db
+from models.contracts_model import Contract
+from models.transaction_model import Transaction
+from utils.file_delivery import CHUNK_SIZE, is_hashed_name
+
+# -------------------
+# Content-addressed artifact store
+# -------------------
+# Generated PDFs are stored as <prefix>_<sha256>.pdf inside their usual
+# upload folder, so identical documents share one file and the DB keeps
+# holding plain file names. A file's reference count is the number of DB
+# rows naming it; files nobody references are removed by collect_garbage().
+
+# folder -> columns whose values are file names inside that folder
+ARTIFACT_REFERENCES = {
+    "receipts": [Transaction.receipt],
+    "contracts": [Contract.generated_contract],
+    "signed_contracts": [Contract.signed_contract],
+}
+
+# Files younger than this are never collected: a document is written before
+# the row that references it is committed (or, for generated contracts,
+# before the landlord issues it).
+DEFAULT_GRACE_SECONDS = 24 * 60 * 60
+
+
+def _digest_file(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def store_file(path, prefix):
+    """
+    Move the file at `path` to its content address in the same folder and
+    return the new file name. If the content is already stored the new copy
+    is dropped and the existing file is reused.
+    """
+    folder, original = os.path.split(path)
+    extension = os.path.splitext(original)[1] or ".pdf"
+    name = f"{prefix}_{_digest_file(path)}{extension}"
+    target = os.path.join(folder, name)
+
+    if os.path.exists(target):
+        os.remove(path)
+        os.utime(target)  # restart the GC grace period until the new row is committed
+    else:
+        os.replace(path, target)
+    return name
+
+
+def pending_path(folder, extension=".pdf"):
+    """Unique scratch path inside `folder` for a document that store_file() will adopt."""
+    os.makedirs(folder, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".pending_", suffix=extension)
+    os.close(fd)
+    return temp_path
+
+
+def store_bytes(folder, prefix, data, extension=".pdf"):
+    """Write `data` to its content address inside `folder` and return the file name."""
+    temp_path = pending_path(folder, extension)
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    return store_file(temp_path, prefix)
+
+
+def reference_counts():
+    """{(folder, file_name): number of DB rows referencing it} in one query."""
+    selects = [
+        select(literal(folder).label("folder"), column.label("name")).where(column.isnot(None))
+        for folder, columns in ARTIFACT_REFERENCES.items()
+        for column in columns
+    ]
+    refs = union_all(*selects).subquery()
+    rows = (
+        db.session.query(refs.c.folder, refs.c.name, db.func.count())
+        .group_by(refs.c.folder, refs.c.name)
+        .all()
+    )
+    return {(folder, os.path.basename(name)): count for folder, name, count in rows}
+
+
+def migrate_legacy(upload_folder):
+    """
+    Rename referenced timestamp-named files to their content address and
+    repoint the rows. Duplicates collapse onto one file. Returns the number
+    of rows updated.
+    """
+    prefixes = {"receipts": "receipt", "contracts": "contract", "signed_contracts": "signed"}
+    updated = 0
+    for (folder, name), _ in reference_counts().items():
+        path = os.path.join(upload_folder, folder, name)
+        if is_hashed_name(name) or not os.path.isfile(path):
+            continue
+        new_name = store_file(path, prefixes[folder])
+        for column in ARTIFACT_REFERENCES[folder]:
+            updated += (
+                db.session.query(column.class_)
+                .filter(column == name)
+                .update({column: new_name}, synchronize_session=False)
+            )
+        db.session.commit()
+    return updated
+
+
+def collect_garbage(upload_folder, grace_seconds=DEFAULT_GRACE_SECONDS, dry_run=False):
+    """
+    Delete files in the artifact folders that no DB row references and that
+    are older than `grace_seconds`. Returns
+    {folder: {"files": n, "referenced": n, "removed": n, "bytes_freed": n}}.
+    """
+    # List files before reading references: anything stored after the listing
+    # is simply not considered in this run.
+    listing = {}
+    for folder in ARTIFACT_REFERENCES:
+        folder_path = os.path.join(upload_folder, folder)
+        listing[folder] = sorted(os.listdir(folder_path)) if os.path.isdir(folder_path) else []
+    refs = reference_counts()
+
+    cutoff = time.time() - grace_seconds
+    report = {}
+    for folder, names in listing.items():
+        stats = {"files": len(names), "referenced": 0, "removed": 0, "bytes_freed": 0}
+        for name in names:
+            if refs.get((folder, name)):
+                stats["referenced"] += 1
+                continue
+            path = os.path.join(upload_folder, folder, name)
+            try:
+                stat = os.stat(path)  # re-stat: store_file() may have just reused it
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime > cutoff or not os.path.isfile(path):
+                continue
+            if not dry_run:
+                os.remove(path)
+            stats["removed"] += 1
+            stats["bytes_freed"] += stat.st_size
+        report[folder] = stats
+    return report
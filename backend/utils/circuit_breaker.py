@@ -0,0 +1,84 @@
+import threading
+import time
+
+# -------------------
+# Circuit breaker
+# -------------------
+# closed     calls go through; `failure_threshold` consecutive failures open it
+# open       calls are rejected immediately for `reset_timeout` seconds
+# half_open  one trial call is let through: success closes the circuit,
+#            failure opens it again
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._totals = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+        self._lock = threading.Lock()
+
+    def _current_state(self, now):
+        if self._state == "open" and now - self._opened_at >= self.reset_timeout:
+            self._state = "half_open"
+            self._trial_in_flight = False
+        return self._state
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def allow(self):
+        """True if a call may be made now. Every allowed call must be followed by record_success/record_failure."""
+        with self._lock:
+            state = self._current_state(self._clock())
+            if state == "closed" or (state == "half_open" and not self._trial_in_flight):
+                self._trial_in_flight = state == "half_open"
+                self._totals["calls"] += 1
+                return True
+            self._totals["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._totals["failures"] += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self._totals["opened"] += 1
+                self._state = "open"
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+    def retry_in(self):
+        """Seconds until calls are allowed again (0 if they are now)."""
+        with self._lock:
+            now = self._clock()
+            if self._current_state(now) != "open":
+                return 0
+            return max(0.0, self._opened_at + self.reset_timeout - now)
+
+    def health(self):
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            return {
+                "name": self.name,
+                "state": state,
+                "healthy": state == "closed",
+                "consecutive_failures": self._failures,
+                "retry_in": round(max(0.0, self._opened_at + self.reset_timeout - now), 1) if state == "open" else 0,
+                **self._totals
+            }
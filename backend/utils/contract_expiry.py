@@ -0,0 +1,108 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import tuple_, update
+
+from extensions import db
+from models.contracts_model import Contract
+from models.tenants_model import Tenant
+from models.units_model import House as Unit
+from models.users_model import User
+from models.notifications_model import get_ph_time
+from utils.notification_service import notify_owners, notify_user
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def scan_expiring_contracts(days=30, today=None, dry_run=False):
+    """
+    Find Active contracts ending within `days` days and notify the tenant and
+    the owners once per end date.
+
+    Cost per run: one indexed range query (status, enddate), one UPDATE ...
+    RETURNING that claims the contracts by recording the reminded end date,
+    and one batched notification insert through the notification service
+    (counters and live events follow from the flush), regardless of how many
+    contracts are expiring.
+
+    Contracts use optimistic locking. A contract is only claimed if it still
+    has the version the scan read, and only claimed contracts are notified; a
+    contract a request changed in between is looked at again on the next run.
+    The marker is bookkeeping, so it does not bump the version (an owner's
+    open page stays valid). Returns the claimed contracts (all selected ones
+    for a dry run).
+
+    Meant to be run daily from cron:
+        0 7 * * *  cd backend && flask --app app scan-expiring-contracts --days 30
+    """
+    today = today or get_ph_time().date()
+    window_start = today.strftime("%Y-%m-%d")
+    window_end = (today + timedelta(days=days)).strftime("%Y-%m-%d")
+
+    expiring = (
+        db.session.query(
+            Contract.contractid,
+            Contract.enddate,
+            Contract.version,
+            Tenant.userid,
+            User.firstname,
+            User.lastname,
+            Unit.name.label("unit_name")
+        )
+        .join(Tenant, Contract.tenantid == Tenant.tenantid)
+        .join(User, Tenant.userid == User.userid)
+        .outerjoin(Unit, Contract.unitid == Unit.unitid)
+        .filter(
+            Contract.status == "Active",
+            Contract.enddate >= window_start,
+            Contract.enddate <= window_end,
+            db.or_(
+                Contract.reminded_enddate.is_(None),
+                Contract.reminded_enddate != Contract.enddate
+            )
+        )
+        .order_by(Contract.enddate)
+        .all()
+    )
+
+    if dry_run or not expiring:
+        return expiring
+
+    try:
+        contracts = Contract.__table__
+        claimed_ids = set(db.session.execute(
+            update(contracts)
+            .where(tuple_(contracts.c.contractid, contracts.c.version).in_(
+                [(c.contractid, c.version) for c in expiring]
+            ))
+            .values(reminded_enddate=contracts.c.enddate)
+            .returning(contracts.c.contractid)
+        ).scalars())
+        claimed = [c for c in expiring if c.contractid in claimed_ids]
+
+        for c in claimed:
+            end_date = _as_date(c.enddate)
+            days_left = (end_date - today).days
+            end_display = end_date.strftime("%B %d, %Y")
+
+            notify_user(
+                c.userid,
+                "Contract Expiring Soon",
+                f"Your rental contract for {c.unit_name or 'your unit'} ends on {end_display} ({days_left} day(s) left). Please contact the landlord if you wish to renew."
+            )
+            notify_owners(
+                "Lease Renewal Due",
+                f"The contract of {c.firstname} {c.lastname} for {c.unit_name or 'a unit'} ends on {end_display} ({days_left} day(s) left). Contract ID: {c.contractid}"
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return claimed
+
@@ -0,0 +1,303 @@
+import random
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import update
+
+from extensions import db
+from models.email_outbox_model import EmailOutbox
+from models.notifications_model import get_ph_time
+from utils.email_transport import SendResult, create_transport
+from utils.ttl_store import get_verification_store
+
+# -------------------
+# Email outbox
+# -------------------
+# Requests only insert an EmailOutbox row. A worker claims due rows in
+# batches, hands them to the transport and records the outcome: sent,
+# retried later with exponential backoff, or dead-lettered after
+# MAX_ATTEMPTS. Sent rows keep no body (reset codes must not linger) and
+# are deleted after SENT_RETENTION_DAYS by `flask email-outbox --purge-sent`.
+# Dead-lettered emails carrying a code (CODE_KINDS) are cleared as well and
+# never requeued: by the time anyone looks at them the code has expired.
+#
+# Deployment: run `flask --app app email-worker` as its own service next to
+# the web server (set EMAIL_WORKER_IN_PROCESS=0). Several workers may run at
+# once; claims skip rows locked by another worker. The in-process thread is
+# only started by `python app.py` for development. Messages the
+# transport did not attempt because its circuit breaker is open go back to
+# pending without using up an attempt, and the worker pauses until the
+# breaker lets calls through again.
+#
+# Each worker publishes its breaker state to the shared TTL store every
+# HEALTH_PUBLISH_SECONDS; /api/health/email reports that, not the web
+# process's own breaker (which never sees the worker's failures). A separate
+# worker's reports only reach the web processes through a shared store
+# (VERIFICATION_STORE=database, the default, or redis). With
+# VERIFICATION_STORE=memory only an in-process worker can be seen, and it is
+# reported directly.
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+LEASE_SECONDS = 5 * 60  # a claimed row is retried if its worker dies mid-send
+POLL_INTERVAL_SECONDS = 5
+SENT_RETENTION_DAYS = 7
+HEALTH_KEY = "health:email-worker"
+HEALTH_PUBLISH_SECONDS = 10
+HEALTH_TTL_SECONDS = 60  # no report for this long: no worker is delivering
+CODE_KINDS = ("password_reset", "verification")  # bodies hold short-lived codes
+
+
+def enqueue_email(recipient, subject, html, kind, recipient_name=None):
+    """Queue an email. The caller commits, then calls wake_worker()."""
+    email = EmailOutbox(
+        kind=kind,
+        recipient=recipient,
+        recipientname=recipient_name,
+        subject=subject,
+        htmlcontent=html,
+        status="pending",
+        attempts=0,
+        nextattemptat=get_ph_time()
+    )
+    db.session.add(email)
+    return email
+
+
+def backoff_seconds(attempts):
+    """Delay before retry number `attempts` (30 s, 1 min, 2 min, ... capped at 1 h, +/-20% jitter)."""
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_batch(batch_size=BATCH_SIZE, now=None, kind=None):
+    """
+    Lease up to `batch_size` due emails (optionally only one `kind`) to this
+    worker and return them as plain dicts. Rows locked by another worker
+    are skipped.
+    """
+    now = now or get_ph_time()
+    query = EmailOutbox.query.filter(
+        EmailOutbox.status.in_(("pending", "sending")),
+        EmailOutbox.nextattemptat <= now
+    )
+    if kind:
+        query = query.filter(EmailOutbox.kind == kind)
+    rows = (
+        query
+        .order_by(EmailOutbox.emailid)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    batch = []
+    for row in rows:
+        row.status = "sending"
+        row.attempts = (row.attempts or 0) + 1
+        row.nextattemptat = now + timedelta(seconds=LEASE_SECONDS)
+        batch.append({
+            "emailid": row.emailid,
+            "kind": row.kind,
+            "recipient": row.recipient,
+            "recipient_name": row.recipientname,
+            "subject": row.subject,
+            "html": row.htmlcontent,
+            "attempts": row.attempts
+        })
+    db.session.commit()
+    return batch
+
+
+def record_results(batch, results, now=None, defer_seconds=0):
+    """Store the outcome of a send with one executemany UPDATE by primary key."""
+    now = now or get_ph_time()
+    changes = []
+    stats = {"sent": 0, "retry": 0, "dead": 0, "deferred": 0}
+    for message, result in zip(batch, results):
+        if not result.ok and not result.attempted:
+            changes.append({"emailid": message["emailid"], "status": "pending",
+                            "attempts": message["attempts"] - 1,
+                            "nextattemptat": now + timedelta(seconds=defer_seconds),
+                            "lasterror": result.error})
+            stats["deferred"] += 1
+        elif result.ok:
+            changes.append({"emailid": message["emailid"], "status": "sent", "sentdate": now,
+                            "messageid": result.message_id, "lasterror": None, "htmlcontent": ""})
+            stats["sent"] += 1
+        elif not result.retryable or message["attempts"] >= MAX_ATTEMPTS:
+            change = {"emailid": message["emailid"], "status": "dead", "lasterror": result.error}
+            if message["kind"] in CODE_KINDS:
+                change["htmlcontent"] = ""
+            changes.append(change)
+            stats["dead"] += 1
+        else:
+            retry_at = now + timedelta(seconds=backoff_seconds(message["attempts"]))
+            changes.append({"emailid": message["emailid"], "status": "pending",
+                            "nextattemptat": retry_at, "lasterror": result.error})
+            stats["retry"] += 1
+    if changes:
+        db.session.execute(update(EmailOutbox), changes)
+        db.session.commit()
+    return stats
+
+
+def process_batch(transport, batch_size=BATCH_SIZE, kind=None):
+    """Claim, send and record one batch. Returns counts for this round."""
+    batch = claim_batch(batch_size, kind=kind)
+    if not batch:
+        return {"claimed": 0, "sent": 0, "retry": 0, "dead": 0, "deferred": 0}
+    try:
+        results = transport.send(batch)
+    except Exception as e:
+        results = [SendResult(False, error=str(e), retryable=True) for _ in batch]
+    stats = record_results(batch, results, defer_seconds=_retry_in(transport))
+    stats["claimed"] = len(batch)
+    return stats
+
+
+def _retry_in(transport):
+    """Seconds until a guarded transport accepts calls again (0 for unguarded ones)."""
+    retry_in = getattr(transport, "retry_in", None)
+    return retry_in() if retry_in else 0
+
+
+def outbox_stats():
+    """{status: count} for the whole outbox."""
+    rows = db.session.query(EmailOutbox.status, db.func.count(EmailOutbox.emailid)).group_by(EmailOutbox.status)
+    return {status: count for status, count in rows}
+
+
+def requeue_dead():
+    """
+    Give dead-lettered emails a fresh set of attempts. Emails carrying a code
+    (CODE_KINDS) are left dead; the user requests a new code instead.
+    Returns how many were requeued.
+    """
+    count = (
+        EmailOutbox.query
+        .filter(EmailOutbox.status == "dead", EmailOutbox.kind.notin_(CODE_KINDS))
+        .update({"status": "pending", "attempts": 0, "nextattemptat": get_ph_time()},
+                synchronize_session=False)
+    )
+    db.session.commit()
+    return count
+
+
+def purge_sent(days=SENT_RETENTION_DAYS):
+    """
+    Delete emails sent more than `days` days ago (and clear any body left on
+    older sent rows or dead code-bearing rows). Returns how many were deleted.
+    """
+    EmailOutbox.query.filter(
+        db.or_(
+            EmailOutbox.status == "sent",
+            db.and_(EmailOutbox.status == "dead", EmailOutbox.kind.in_(CODE_KINDS))
+        ),
+        EmailOutbox.htmlcontent != ""
+    ).update({"htmlcontent": ""}, synchronize_session=False)
+    count = (
+        EmailOutbox.query
+        .filter(EmailOutbox.status == "sent", EmailOutbox.sentdate < get_ph_time() - timedelta(days=days))
+        .delete(synchronize_session=False)
+    )
+    db.session.commit()
+    return count
+
+
+def publish_worker_health(transport):
+    """Store the transport's breaker state for health checks in other processes (last worker to report wins)."""
+    breaker = getattr(transport, "breaker", None)
+    if breaker is None:
+        return
+    health = breaker.health()
+    health["reported_at"] = get_ph_time().isoformat()
+    get_verification_store().set(HEALTH_KEY, health, HEALTH_TTL_SECONDS)
+
+
+def worker_health():
+    """
+    Breaker state last published by a delivery worker, or None if none
+    reported within HEALTH_TTL_SECONDS. Falls back to the live in-process
+    worker of this process when nothing reached the store.
+    """
+    health = get_verification_store().get(HEALTH_KEY)
+    if health is None and _worker is not None and _worker.is_alive():
+        breaker = getattr(_worker.transport, "breaker", None)
+        if breaker is not None:
+            health = breaker.health()
+            health["reported_at"] = get_ph_time().isoformat()
+    return health
+
+
+class EmailWorker(threading.Thread):
+    """Background delivery loop. Drains full batches back to back, then sleeps until woken or polled."""
+
+    def __init__(self, app, transport=None, batch_size=BATCH_SIZE, poll_interval=POLL_INTERVAL_SECONDS):
+        super().__init__(name="email-outbox-worker", daemon=True)
+        self.app = app
+        self.transport = transport or create_transport(app.config.get("EMAIL_TRANSPORT"))
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+
+    def _publish_health(self):
+        try:
+            publish_worker_health(self.transport)
+        except Exception as e:
+            print(f"[Email Outbox] Could not publish worker health: {e}")
+
+    def run(self):
+        with self.app.app_context():
+            published = 0
+            while not self._stopping.is_set():
+                if time.monotonic() - published >= HEALTH_PUBLISH_SECONDS:
+                    self._publish_health()
+                    published = time.monotonic()
+                paused = _retry_in(self.transport)
+                if paused:
+                    # Provider circuit is open: leave the queue alone until it may close
+                    self._wake.wait(min(paused, self.poll_interval))
+                    self._wake.clear()
+                    continue
+                try:
+                    stats = process_batch(self.transport, self.batch_size)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[Email Outbox] Worker error: {e}")
+                    stats = {"claimed": 0}
+                finally:
+                    db.session.remove()
+
+                if stats["claimed"] == self.batch_size:
+                    continue  # more may be waiting
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+
+_worker = None
+
+
+def start_email_worker(app, **kwargs):
+    """Start the in-process worker once per process."""
+    global _worker
+    if _worker is None or not _worker.is_alive():
+        _worker = EmailWorker(app, **kwargs)
+        _worker.start()
+    return _worker
+
+
+def wake_worker():
+    """Nudge the in-process worker after committing new outbox rows (no-op without one)."""
+    if _worker is not None:
+        _worker.wake()
@@ -0,0 +1,102 @@
+import os
+import re
+import threading
+
+from jinja2 import Environment, FileSystemLoader, meta
+from markupsafe import Markup, escape
+
+# -------------------
+# Precompiled email templates
+# -------------------
+# Templates live in templates/email/ and are compiled once per process.
+# Values that never change (login URL, ...) are Jinja globals. Each
+# template is rendered once with marker values for its per-email
+# variables and split into static chunks, so sending an email only joins
+# those chunks with the escaped values. Templates whose structure depends
+# on the values (loops, conditions, filters) fall back to a normal render.
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "email")
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000").rstrip("/")
+
+_env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=True, auto_reload=False)
+_env.globals.update({
+    "login_url": f"{FRONTEND_URL}/login",
+})
+
+
+def _variables(name):
+    """Per-email variables used by `name` and the templates it extends/includes."""
+    source = _env.loader.get_source(_env, name)[0]
+    ast = _env.parse(source)
+    names = meta.find_undeclared_variables(ast)
+    for parent in meta.find_referenced_templates(ast):
+        if parent:
+            names |= _variables(parent)
+    return names - set(_env.globals)
+
+
+def _split(template, variables, suffix):
+    """Render with marker values and split on them: [static, index, static, index, ..., static]."""
+    rendered = template.render(**{var: Markup(f"\x00{i}{suffix}\x00") for i, var in enumerate(variables)})
+    return re.split(f"\x00(\\d+){suffix}\x00", rendered)
+
+
+class EmailTemplate:
+    def __init__(self, name):
+        self.name = name
+        self.template = _env.get_template(name)
+        self.variables = sorted(_variables(name))
+        self._chunks = self._precompile()
+
+    def _precompile(self):
+        if not self.variables:
+            return [self.template.render()]
+        # Two renders with different markers must give the same static text,
+        # otherwise the output depends on the values and can't be cached
+        first = _split(self.template, self.variables, "")
+        second = _split(self.template, self.variables, ":")
+        if first != second:
+            return None
+        return [chunk if i % 2 == 0 else self.variables[int(chunk)] for i, chunk in enumerate(first)]
+
+    @property
+    def precompiled(self):
+        return self._chunks is not None
+
+    def render(self, **context):
+        if self._chunks is None:
+            return self.template.render(**context)
+        parts = []
+        for i, chunk in enumerate(self._chunks):
+            if i % 2 == 0:
+                parts.append(chunk)
+            else:
+                # Same output as Jinja: missing variables are empty, anything else is escaped
+                parts.append(str(escape(context[chunk])) if chunk in context else "")
+        return "".join(parts)
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_email_template(name):
+    """Compiled template for `name`, built on first use and shared by all threads."""
+    template = _templates.get(name)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(name)
+            if template is None:
+                template = _templates[name] = EmailTemplate(name)
+    return template
+
+
+def render_email(name, **context):
+    return get_email_template(name).render(**context)
+
+
+def preload_email_templates():
+    """Compile every template up front (at startup) instead of on the first email."""
+    for name in sorted(os.listdir(TEMPLATE_DIR)):
+        if name.endswith(".html") and name != "base.html":
+            get_email_template(name)
@@ -0,0 +1,261 @@
+import os
+import random
+import threading
+import time
+
+import sib_api_v3_sdk
+from jinja2 import Environment
+from sib_api_v3_sdk.rest import ApiException
+
+from utils.circuit_breaker import CircuitBreaker
+
+# -------------------
+# Email transports
+# -------------------
+# The outbox worker hands a batch of messages to a transport and gets one
+# SendResult per message back. BrevoTransport talks to the real API;
+# StubTransport delivers to memory so the pipeline can be exercised and
+# benchmarked offline (EMAIL_TRANSPORT=stub).
+#
+# send_versions() submits one shared template with per-recipient
+# `messageVersions` (to, subject, params) in a single API call.
+#
+# create_transport() wraps the transport in a GuardedTransport: calls that
+# fail for Brevo-side reasons (timeouts, 5xx, 429) trip a per-process
+# circuit breaker, and while it is open messages are handed back unsent
+# at once (attempted=False) so the outbox keeps them queued.
+
+DEFAULT_SENDER = {"name": "Rentahanan App", "email": "padillacarlosnino.pdm@gmail.com"}
+
+
+class SendResult:
+    __slots__ = ("ok", "message_id", "error", "retryable", "attempted")
+
+    def __init__(self, ok, message_id=None, error=None, retryable=True, attempted=True):
+        self.ok = ok
+        self.message_id = message_id
+        self.error = error
+        self.retryable = retryable
+        self.attempted = attempted  # False: never reached the provider (circuit open)
+
+
+BREVO_POOL_SIZE = int(os.getenv("BREVO_POOL_SIZE", "8"))  # keep-alive HTTPS connections to Brevo
+BREVO_TIMEOUT = (
+    float(os.getenv("BREVO_CONNECT_TIMEOUT", "3")),
+    float(os.getenv("BREVO_READ_TIMEOUT", "10"))
+)
+
+brevo_breaker = CircuitBreaker(
+    "brevo",
+    failure_threshold=int(os.getenv("BREVO_BREAKER_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("BREVO_BREAKER_RESET_SECONDS", "30"))
+)
+
+_shared_api = None
+_shared_api_lock = threading.Lock()
+
+
+def _build_api(api_key):
+    configuration = sib_api_v3_sdk.Configuration()
+    configuration.api_key["api-key"] = api_key
+    configuration.connection_pool_maxsize = BREVO_POOL_SIZE
+    return sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+
+
+def get_brevo_api():
+    """One TransactionalEmailsApi (and its connection pool) per process, created on first use."""
+    global _shared_api
+    if _shared_api is None:
+        with _shared_api_lock:
+            if _shared_api is None:
+                _shared_api = _build_api(os.getenv("BREVO_API_KEY"))
+    return _shared_api
+
+
+class BrevoTransport:
+    """Brevo transactional API, one send_transac_email call per message."""
+
+    name = "brevo"
+
+    def __init__(self, api_key=None, sender=None):
+        self.sender = sender or DEFAULT_SENDER
+        self.api = _build_api(api_key) if api_key else get_brevo_api()
+
+    def send(self, messages):
+        results = []
+        for message in messages:
+            to = {"email": message["recipient"]}
+            if message.get("recipient_name"):
+                to["name"] = message["recipient_name"]
+            email = sib_api_v3_sdk.SendSmtpEmail(
+                to=[to],
+                sender=self.sender,
+                subject=message["subject"],
+                html_content=message["html"]
+            )
+            try:
+                response = self.api.send_transac_email(email, _request_timeout=BREVO_TIMEOUT)
+                results.append(SendResult(True, message_id=getattr(response, "message_id", None)))
+            except ApiException as e:
+                # 4xx other than 429 (bad address, invalid payload) won't succeed on retry
+                retryable = e.status is None or e.status == 429 or e.status >= 500
+                results.append(SendResult(False, error=f"{e.status} {e.reason}", retryable=retryable))
+            except Exception as e:  # network errors, timeouts
+                results.append(SendResult(False, error=str(e), retryable=True))
+        return results
+
+    def send_versions(self, subject, html, versions):
+        """
+        One API call for many recipients. `html` uses Brevo template syntax
+        ({{ params.x }}); each version is {"recipient", "recipient_name",
+        "subject", "params"}. Returns a single SendResult for the call.
+        """
+        message_versions = []
+        for version in versions:
+            to = {"email": version["recipient"]}
+            if version.get("recipient_name"):
+                to["name"] = version["recipient_name"]
+            message_versions.append(sib_api_v3_sdk.SendSmtpEmailMessageVersions(
+                to=[to],
+                subject=version.get("subject"),
+                params=version["params"]
+            ))
+        email = sib_api_v3_sdk.SendSmtpEmail(
+            sender=self.sender,
+            subject=subject,
+            html_content=html,
+            message_versions=message_versions
+        )
+        try:
+            response = self.api.send_transac_email(email, _request_timeout=BREVO_TIMEOUT)
+            message_ids = getattr(response, "message_ids", None) or [getattr(response, "message_id", None)]
+            return SendResult(True, message_id=",".join(filter(None, message_ids)))
+        except ApiException as e:
+            retryable = e.status is None or e.status == 429 or e.status >= 500
+            return SendResult(False, error=f"{e.status} {e.reason}", retryable=retryable)
+        except Exception as e:
+            return SendResult(False, error=str(e), retryable=True)
+
+
+class StubTransport:
+    """
+    In-memory transport for tests and offline benchmarks, with fault
+    injection: `latency` seconds are spent per call, `failure_rate` of
+    messages fail with a retryable error, `outage=True` fails every call,
+    and a call slower than `timeout` fails as a read timeout.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None, timeout=None, outage=False):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.timeout = timeout
+        self.outage = outage
+        self.sent = []
+        self.calls = 0
+        self._templates = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call_fault(self):
+        """Simulate the call's network time. Returns an error if the whole call fails."""
+        if self.timeout is not None and self.latency > self.timeout:
+            time.sleep(self.timeout)
+            return "stub: read timed out"
+        if self.latency:
+            time.sleep(self.latency)
+        if self.outage:
+            return "stub: 503 Service Unavailable"
+        return None
+
+    def send(self, messages):
+        fault = self._call_fault()
+        if fault:
+            with self._lock:
+                self.calls += 1
+            return [SendResult(False, error=fault, retryable=True) for _ in messages]
+        results = []
+        with self._lock:
+            self.calls += 1
+            for message in messages:
+                if self.failure_rate and self._random.random() < self.failure_rate:
+                    results.append(SendResult(False, error="stub: injected failure", retryable=True))
+                    continue
+                self.sent.append(message)
+                results.append(SendResult(True, message_id=f"<stub-{len(self.sent)}@localhost>"))
+        return results
+
+    def send_versions(self, subject, html, versions):
+        """Render every version locally (Brevo's syntax is Jinja-compatible) so the output can be inspected."""
+        fault = self._call_fault()
+        with self._lock:
+            self.calls += 1
+            if fault:
+                return SendResult(False, error=fault, retryable=True)
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                return SendResult(False, error="stub: injected failure", retryable=True)
+            template = self._templates.get(html)
+            if template is None:
+                template = self._templates[html] = Environment(autoescape=True).from_string(html)
+            for version in versions:
+                self.sent.append({
+                    "recipient": version["recipient"],
+                    "recipient_name": version.get("recipient_name"),
+                    "subject": version.get("subject") or subject,
+                    "html": template.render(params=version["params"])
+                })
+            return SendResult(True, message_id=f"<stub-batch-{self.calls}@localhost>")
+
+
+class GuardedTransport:
+    """Runs every provider call of `transport` through `breaker`."""
+
+    def __init__(self, transport, breaker):
+        self.transport = transport
+        self.breaker = breaker
+        self.name = transport.name
+
+    def _rejected(self):
+        return SendResult(False, error=f"circuit open ({self.breaker.name})", retryable=True, attempted=False)
+
+    def _record(self, result):
+        # A rejected address (4xx) says nothing about the provider's health
+        if result.ok or not result.retryable:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def retry_in(self):
+        return self.breaker.retry_in()
+
+    def send(self, messages):
+        results = []
+        for message in messages:
+            if not self.breaker.allow():
+                results.append(self._rejected())
+                continue
+            result = self.transport.send([message])[0]
+            self._record(result)
+            results.append(result)
+        return results
+
+    def send_versions(self, subject, html, versions):
+        if not self.breaker.allow():
+            return self._rejected()
+        result = self.transport.send_versions(subject, html, versions)
+        self._record(result)
+        return result
+
+
+def create_transport(name=None):
+    """Transport selected by `name` or the EMAIL_TRANSPORT env var (brevo by default), behind the breaker."""
+    name = (name or os.getenv("EMAIL_TRANSPORT") or "brevo").lower()
+    if name == "stub":
+        return GuardedTransport(StubTransport(), brevo_breaker)
+    return GuardedTransport(BrevoTransport(), brevo_breaker)
+
+
+def email_health():
+    """Breaker state of the email provider, for health checks."""
+    return brevo_breaker.health()
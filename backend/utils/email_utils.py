@@ -1,272 +1,107 @@
-import os
 import random
-import time
-import sib_api_v3_sdk
-from sib_api_v3_sdk.rest import ApiException
 from dotenv import load_dotenv
 
+from extensions import db
+from utils.email_outbox import enqueue_email, wake_worker
+from utils.email_templates import render_email
+from utils.rate_limit import global_limit
+from utils.ttl_store import get_verification_store
+
 load_dotenv()
 
 # -------------------
-# Brevo (Sendinblue) Setup
+# Delivery
 # -------------------
-BREVO_API_KEY = os.getenv("BREVO_API_KEY")
-
-configuration = sib_api_v3_sdk.Configuration()
-configuration.api_key["api-key"] = BREVO_API_KEY
+# Emails are written to the EmailOutbox table and delivered through Brevo
+# by the outbox worker (utils/email_outbox.py), so requests never wait on
+# the Brevo API. The HTML comes from the precompiled templates in
+# templates/email/ (utils/email_templates.py).
 
-# Temporary in-memory storage for verification codes (for password reset only)
-# Structure: { email: {"code": "123456", "timestamp": 1234567890} }
-verification_codes = {}
+# Shared by every route that sends an email, to protect the Brevo quota
+EMAIL_SEND_LIMIT = global_limit("200/hour", "email-send-global")
 
 # -------------------
-# Utility Functions
+# Verification codes
 # -------------------
-def generate_code():
-    """Generate a random 6-digit code."""
-    return str(random.randint(100000, 999999))
+# Codes and reset grants live in the shared TTL store (utils/ttl_store.py)
+# so every worker sees them and they expire on their own.
+# A correct code is exchanged for a reset grant that /forgot/reset consumes.
+CODE_TTL = 15 * 60  # 15 minutes in seconds
+RESET_GRANT_TTL = 15 * 60
 
 
-def send_password_reset_email(email):
-    """
-    Send password reset verification code via Brevo.
-    Returns True if successful, False otherwise.
-    """
-    code = generate_code()
+def _code_key(email):
+    return f"reset-code:{email.strip().lower()}"
 
-    # Save code + timestamp
-    verification_codes[email] = {
-        "code": code,
-        "timestamp": time.time()
-    }
 
-    html_content = f"""
-<div style="
-    font-family: 'Segoe UI', Roboto, Arial, sans-serif;
-    background-color: #f4f6f8;
-    padding: 40px 0;
-">
-    <div style="
-        max-width: 600px;
-        margin: auto;
-        background: #ffffff;
-        border-radius: 10px;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.08);
-        border: 1px solid #e0e0e0;
-    ">
+def _grant_key(email):
+    return f"reset-grant:{email.strip().lower()}"
 
-        <!-- HEADER -->
-        <div style="
-            background-color: #0048b4;
-            color: white;
-            padding: 20px 30px;
-            border-top-left-radius: 10px;
-            border-top-right-radius: 10px;
-            text-align: center;
-        ">
-            <h1 style="font-size: 22px; font-weight: 600; margin: 0;">
-                Password Reset Verification
-            </h1>
-        </div>
-
-        <!-- BODY -->
-        <div style="padding: 30px 40px;">
-            <p style="font-size: 15px; color: #444; line-height: 1.6; margin-bottom: 20px;">
-                Hello,
-                <br><br>
-                We received a request to reset your password. Please use the verification code below to proceed with your request:
-            </p>
-
-            <div style="text-align: center; margin: 35px 0;">
-                <span style="
-                    display: inline-block;
-                    background-color: #0048b4;
-                    color: white;
-                    font-size: 26px;
-                    font-weight: 700;
-                    letter-spacing: 6px;
-                    padding: 15px 40px;
-                    border-radius: 6px;
-                ">
-                    {code}
-                </span>
-            </div>
-
-            <p style="font-size: 14px; color: #666; line-height: 1.6;">
-                This code will expire in <strong>15 minutes</strong>.
-                <br>
-                If you didn't request this password reset, please ignore this message.
-            </p>
-
-            <p style="font-size: 14px; color: #666; margin-top: 25px;">
-                Thank you,<br>
-                <strong>The Rentahanan Team</strong>
-            </p>
-        </div>
-
-        <!-- FOOTER -->
-        <div style="
-            background-color: #f8f9fb;
-            text-align: center;
-            padding: 15px;
-            font-size: 12px;
-            color: #999;
-            border-top: 1px solid #e0e0e0;
-        ">
-            © 2025 Rentahanan | All Rights Reserved
-        </div>
-    </div>
-</div>
-"""
+# -------------------
+# Utility Functions
+# -------------------
+def generate_code():
+    """Generate a random 6-digit code."""
+    return str(random.randint(100000, 999999))
 
-    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-        to=[{"email": email}],
-        sender={"name": "Rentahanan App", "email": "padillacarlosnino.pdm@gmail.com"},
-        subject="Your Password Reset Verification Code",
-        html_content=html_content
-    )
 
+def _queue(email, subject, html_content, kind, recipient_name=None):
+    """Write the email to the outbox and wake the delivery worker."""
     try:
-        api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-        api_instance.send_transac_email(send_smtp_email)
-        print(f"[Brevo] Sent password reset email to {email} with code {code}")
+        enqueue_email(email, subject, html_content, kind, recipient_name=recipient_name)
+        db.session.commit()
+        wake_worker()
+        print(f"[Email Outbox] Queued {kind} email to {email}")
         return True
-    except ApiException as e:
-        print(f"[Brevo Error] Failed to send password reset email to {email}: {e}")
+    except Exception as e:
+        db.session.rollback()
+        print(f"[Email Outbox Error] Failed to queue {kind} email to {email}: {e}")
         return False
 
 
-def send_welcome_email(email, user_name):
+def send_password_reset_email(email):
     """
-    Send welcome email after registration (no verification code needed).
-    Returns True if successful, False otherwise.
+    Queue the password reset verification code for delivery.
+    Returns True if queued, False otherwise.
     """
-    html_content = f"""
-<div style="
-    font-family: 'Segoe UI', Roboto, Arial, sans-serif;
-    background-color: #f4f6f8;
-    padding: 40px 0;
-">
-    <div style="
-        max-width: 600px;
-        margin: auto;
-        background: #ffffff;
-        border-radius: 10px;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.08);
-        border: 1px solid #e0e0e0;
-    ">
-
-        <!-- HEADER -->
-        <div style="
-            background-color: #0048b4;
-            color: white;
-            padding: 20px 30px;
-            border-top-left-radius: 10px;
-            border-top-right-radius: 10px;
-            text-align: center;
-        ">
-            <h1 style="font-size: 22px; font-weight: 600; margin: 0;">
-                Welcome to Rentahanan!
-            </h1>
-        </div>
-
-        <!-- BODY -->
-        <div style="padding: 30px 40px;">
-            <p style="font-size: 15px; color: #444; line-height: 1.6; margin-bottom: 20px;">
-                Hello <strong>{user_name}</strong>,
-                <br><br>
-                Thank you for registering with Rentahanan! We're excited to have you on board.
-            </p>
-
-            <div style="background-color: #f8f9fb; padding: 20px; border-radius: 6px; margin: 20px 0;">
-                <p style="font-size: 14px; color: #444; margin: 0;">
-                    <strong>What you can do now:</strong>
-                </p>
-                <ul style="font-size: 14px; color: #444; margin: 10px 0; padding-left: 20px;">
-                    <li>Browse available properties</li>
-                    <li>Contact property owners</li>
-                    <li>Save your favorite listings</li>
-                    <li>Manage your rental applications</li>
-                </ul>
-            </div>
-
-            <p style="font-size: 14px; color: #666; line-height: 1.6;">
-                If you have any questions or need assistance, feel free to reply to this email.
-                <br>
-                We're here to help you find your perfect home!
-            </p>
-
-            <div style="text-align: center; margin: 30px 0;">
-                <a href="http://localhost:3000/login" style="
-                    display: inline-block;
-                    background-color: #0048b4;
-                    color: white;
-                    padding: 12px 30px;
-                    text-decoration: none;
-                    border-radius: 6px;
-                    font-weight: 600;
-                ">
-                    Start Exploring Rentahanan
-                </a>
-            </div>
+    code = generate_code()
 
-            <p style="font-size: 14px; color: #666; margin-top: 25px;">
-                Welcome aboard!<br>
-                <strong>The Rentahanan Team</strong>
-            </p>
-        </div>
+    get_verification_store().set(_code_key(email), code, CODE_TTL)
 
-        <!-- FOOTER -->
-        <div style="
-            background-color: #f8f9fb;
-            text-align: center;
-            padding: 15px;
-            font-size: 12px;
-            color: #999;
-            border-top: 1px solid #e0e0e0;
-        ">
-            © 2025 Rentahanan | All Rights Reserved
-        </div>
-    </div>
-</div>
-"""
+    html_content = render_email("password_reset.html", code=code)
+    return _queue(email, "Your Password Reset Verification Code", html_content, "password_reset")
 
-    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-        to=[{"email": email}],
-        sender={"name": "Rentahanan App", "email": "padillacarlosnino.pdm@gmail.com"},
-        subject=f"Welcome to Rentahanan, {user_name}!",
-        html_content=html_content
-    )
 
-    try:
-        api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-        api_instance.send_transac_email(send_smtp_email)
-        print(f"[Brevo] Sent welcome email to {email}")
-        return True
-    except ApiException as e:
-        print(f"[Brevo Error] Failed to send welcome email to {email}: {e}")
-        return False
+def send_welcome_email(email, user_name):
+    """
+    Queue the welcome email sent after registration (no verification code needed).
+    Returns True if queued, False otherwise.
+    """
+    html_content = render_email("welcome.html", user_name=user_name)
+    return _queue(email, f"Welcome to Rentahanan, {user_name}!", html_content, "welcome", recipient_name=user_name)
 
 
 def verify_code(email, code):
     """
     Verify if the provided code matches the stored one and is not expired.
+    A match allows one password reset for this email within RESET_GRANT_TTL.
     Returns (True, "message") or (False, "error message")
     """
-    MAX_AGE = 15 * 60  # 15 minutes in seconds
-    entry = verification_codes.get(email)
-
-    if not entry:
-        return False, "No verification code found for this email."
+    store = get_verification_store()
+    stored = store.get(_code_key(email))
 
-    # Check expiration
-    if time.time() - entry["timestamp"] > MAX_AGE:
-        del verification_codes[email]
-        return False, "Verification code expired. Please request a new one."
+    if stored is None:
+        return False, "No valid verification code found for this email. Please request a new one."
 
     # Check match
-    if entry["code"] == code:
-        del verification_codes[email]
+    if stored == code:
+        store.delete(_code_key(email))
+        store.set(_grant_key(email), True, RESET_GRANT_TTL)
         return True, "Code verified successfully."
 
-    return False, "Invalid verification code."
\ No newline at end of file
+    return False, "Invalid verification code."
+
+
+def consume_reset_grant(email):
+    """True (once) if the email's code was verified recently."""
+    return get_verification_store().pop(_grant_key(email)) is not None
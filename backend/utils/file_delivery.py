@@ -0,0 +1,146 @@
+import hashlib
+import mimetypes
+import os
+import re
+import zipfile
+from functools import lru_cache
+
+from flask import current_app, request, send_file, abort, make_response
+from werkzeug.security import safe_join
+
+# -------------------
+# Upload delivery helpers
+# -------------------
+# Files whose name carries a content digest never change, so browsers may
+# cache them forever. Everything else is revalidated with the ETag.
+HASHED_NAME_RE = re.compile(r"(^|[_.-])[0-9a-f]{32,64}([_.-]|$)")
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+CHUNK_SIZE = 64 * 1024
+
+
+@lru_cache(maxsize=4096)
+def _file_digest(path, size, mtime_ns):
+    """SHA-256 of a file, cached per (path, size, mtime) so it is hashed once per version."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def file_etag(path):
+    """Strong ETag value for the file at `path`."""
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_size, stat.st_mtime_ns)
+
+
+def is_hashed_name(filename):
+    return bool(HASHED_NAME_RE.search(os.path.splitext(filename)[0].lower()))
+
+
+def send_upload(subpath, filename, as_attachment=False, download_name=None, mimetype=None):
+    """
+    Send a file from UPLOAD_FOLDER/<subpath>/<filename> with a strong ETag,
+    Range support and optional X-Accel-Redirect / X-Sendfile offload.
+
+    SENDFILE_MODE config:
+      None / ""     -> stream from Python (Range + conditional handled by Werkzeug)
+      "x-sendfile"  -> Apache/lighttpd X-Sendfile header (Flask USE_X_SENDFILE)
+      "x-accel"     -> nginx X-Accel-Redirect to SENDFILE_ACCEL_PREFIX/<subpath>/<filename>
+    """
+    upload_root = current_app.config["UPLOAD_FOLDER"]
+    folder = safe_join(upload_root, subpath)
+    path = safe_join(folder, filename) if folder else None
+    if not path or not os.path.isfile(path):
+        abort(404)
+
+    etag = file_etag(path)
+    immutable = is_hashed_name(filename)
+    download_name = download_name or filename
+    mimetype = mimetype or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    mode = (current_app.config.get("SENDFILE_MODE") or "").lower()
+    if mode == "x-accel":
+        if request.if_none_match.contains(etag):
+            response = make_response("", 304)
+            response.set_etag(etag)
+            return response
+        response = make_response("")
+        prefix = current_app.config.get("SENDFILE_ACCEL_PREFIX", "/protected-uploads").rstrip("/")
+        relative = os.path.relpath(path, upload_root).replace(os.sep, "/")
+        response.headers["X-Accel-Redirect"] = f"{prefix}/{relative}"
+        response.headers["Content-Type"] = mimetype
+        if as_attachment:
+            response.headers.set("Content-Disposition", "attachment", filename=download_name)
+        response.set_etag(etag)
+    else:
+        # Flask emits X-Sendfile itself when USE_X_SENDFILE is on
+        response = send_file(
+            path,
+            mimetype=mimetype,
+            as_attachment=as_attachment,
+            download_name=download_name,
+            etag=etag,
+            conditional=True,
+            max_age=IMMUTABLE_MAX_AGE if immutable else 0,
+        )
+
+    if immutable:
+        response.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    response.headers["Accept-Ranges"] = "bytes"
+    return response
+
+
+class _ZipChunkBuffer:
+    """Write-only, non-seekable sink for ZipFile; chunks are drained after every write."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return b"".join(chunks)
+
+
+def stream_zip(entries, manifest_name="MANIFEST.txt"):
+    """
+    Generate a ZIP archive of `entries` ([(archive_name, absolute_path), ...])
+    chunk by chunk. Nothing is buffered beyond one CHUNK_SIZE read, so memory
+    stays constant regardless of the bundle size. Missing files are listed in
+    the manifest instead of failing the download.
+    """
+    sink = _ZipChunkBuffer()
+    included, missing = [], []
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for arcname, path in entries:
+            if not path or not os.path.isfile(path):
+                missing.append(arcname)
+                continue
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(path, "rb") as src, archive.open(info, mode="w", force_zip64=True) as dest:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                    dest.write(chunk)
+                    yield sink.drain()
+            included.append(arcname)
+            yield sink.drain()
+
+        manifest = ["Included files:"] + [f"  {name}" for name in included]
+        if missing:
+            manifest += ["", "Missing files:"] + [f"  {name}" for name in missing]
+        archive.writestr(manifest_name, "\n".join(manifest) + "\n")
+    yield sink.drain()
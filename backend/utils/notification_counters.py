@@ -0,0 +1,116 @@
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models.notifications_model import Notification, NotificationCounter
+
+# -------------------
+# Notification type counters
+# -------------------
+# The admin stats widget reads five pre-computed rows by primary key.
+# ORM inserts/deletes adjust them in the same transaction (after_flush);
+# bulk statements that bypass the ORM apply counter_deltas() themselves.
+# reconcile_counters() recomputes everything with one conditional-aggregate
+# scan and is run periodically to correct any drift. It locks the counter
+# rows before counting, so a writer's delta is either already in the count
+# or applied after the recomputed value; counter rows are always locked in
+# name order so writers and the reconciler cannot deadlock.
+
+COUNTER_NAMES = ("total", "group_notifications", "individual_notifications",
+                 "tenant_notifications", "owner_notifications")
+
+
+def _aggregate_columns():
+    def count_where(condition):
+        return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+
+    return [
+        db.func.count(Notification.notificationid),
+        count_where(Notification.isgroupnotification.is_(True)),
+        count_where(Notification.isgroupnotification.is_(False)),
+        count_where(Notification.targetuserrole == "Tenant"),
+        count_where(Notification.targetuserrole == "Owner"),
+    ]
+
+
+def count_by_type(*criteria):
+    """All five counts for the notifications matching `criteria`, in one pass."""
+    row = db.session.query(*_aggregate_columns()).filter(*criteria).one()
+    return {name: int(value or 0) for name, value in zip(COUNTER_NAMES, row)}
+
+
+def row_deltas(rows, sign=1):
+    """Counter deltas for notification-like objects or dicts being inserted (+1) or deleted (-1)."""
+    deltas = dict.fromkeys(COUNTER_NAMES, 0)
+    for row in rows:
+        get = row.get if isinstance(row, dict) else lambda key, _row=row: getattr(_row, key, None)
+        is_group = get("isgroupnotification")
+        role = get("targetuserrole")
+        deltas["total"] += sign
+        if is_group is True:
+            deltas["group_notifications"] += sign
+        elif is_group is False:
+            deltas["individual_notifications"] += sign
+        if role == "Tenant":
+            deltas["tenant_notifications"] += sign
+        elif role == "Owner":
+            deltas["owner_notifications"] += sign
+    return deltas
+
+
+def apply_deltas(deltas, connection=None):
+    """Atomically add `deltas` to the counter rows (value = value + delta)."""
+    execute = connection.execute if connection is not None else db.session.execute
+    for name, delta in sorted(deltas.items()):
+        if delta:
+            execute(
+                update(NotificationCounter)
+                .where(NotificationCounter.name == name)
+                .values(value=NotificationCounter.value + delta)
+            )
+
+
+def counter_deltas(*criteria):
+    """Negative deltas for a bulk DELETE of the notifications matching `criteria` (call before deleting)."""
+    return {name: -count for name, count in count_by_type(*criteria).items()}
+
+
+def reconcile_counters():
+    """Recompute every counter from the table (one scan) and store it. Caller commits."""
+    # Lock first: in-flight writers finish (and are counted) or wait for our commit
+    locked = (
+        NotificationCounter.query
+        .order_by(NotificationCounter.name)
+        .with_for_update()
+        .populate_existing()
+        .all()
+    )
+    existing = {c.name: c for c in locked}
+    counts = count_by_type()
+    for name, value in counts.items():
+        if name in existing:
+            existing[name].value = value
+        else:
+            db.session.add(NotificationCounter(name=name, value=value))
+    return counts
+
+
+def read_counters():
+    """Counter values by primary key; seeds them with a reconciliation on first use."""
+    values = {c.name: int(c.value) for c in NotificationCounter.query.filter(NotificationCounter.name.in_(COUNTER_NAMES))}
+    if len(values) < len(COUNTER_NAMES):
+        values = reconcile_counters()
+        db.session.commit()
+    return values
+
+
+@event.listens_for(Session, "after_flush")
+def _track_counters(session, flush_context):
+    added = [obj for obj in session.new if isinstance(obj, Notification)]
+    removed = [obj for obj in session.deleted if isinstance(obj, Notification)]
+    if not added and not removed:
+        return
+    deltas = row_deltas(added)
+    for name, delta in row_deltas(removed, sign=-1).items():
+        deltas[name] += delta
+    apply_deltas(deltas, connection=session.connection())
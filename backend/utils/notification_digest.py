@@ -0,0 +1,162 @@
+import time
+from datetime import timedelta
+
+from sqlalchemy import insert, update
+
+from extensions import db
+from models.notification_reads_model import NotificationDigest, NotificationRead, NotificationWatermark
+from models.notifications_model import Notification, get_ph_time
+from models.tenants_model import Tenant
+from models.users_model import User
+from utils.email_templates import render_email
+from utils.rate_limit import TokenBucket
+
+# -------------------
+# Group notification email digests
+# -------------------
+# Group notifications are otherwise in-app only. A periodic job collects,
+# per recipient, the group notifications from the last window they have not
+# read and have not been emailed about, and sends one digest email each.
+# All digests share one template; each recipient is a Brevo message
+# version carrying its own params, so one API call covers a whole batch.
+# A user's cursor only advances once their batch was accepted.
+
+DIGEST_BATCH_SIZE = 500  # message versions per API call
+DIGEST_CALLS_PER_SECOND = 2
+DIGEST_MAX_ITEMS = 10  # notifications listed per email, the rest are summarised
+DIGEST_MAX_RETRIES = 3
+
+DIGEST_SUBJECT = "Your Rentahanan notifications"
+DIGEST_TEMPLATE = "notification_digest.html"  # Brevo template syntax, also rendered by the stub with Jinja2
+
+
+def _recipients(role):
+    """(userid, email, firstname, lastreadid, lastnotificationid) for everyone a `role` notification reaches."""
+    query = (
+        db.session.query(
+            User.userid,
+            User.email,
+            User.firstname,
+            NotificationWatermark.lastreadid,
+            NotificationDigest.lastnotificationid
+        )
+        .outerjoin(NotificationWatermark, NotificationWatermark.userid == User.userid)
+        .outerjoin(NotificationDigest, NotificationDigest.userid == User.userid)
+    )
+    if role == "Owner":
+        return query.filter(User.role == "Owner").all()
+    return (
+        query.join(Tenant, Tenant.userid == User.userid)
+        .filter(Tenant.status == "Active")
+        .distinct()
+        .all()
+    )
+
+
+def collect_digests(window_hours, now=None):
+    """
+    One digest per recipient with unseen group notifications created in the
+    last `window_hours`. A fixed number of queries regardless of user count.
+    """
+    since = (now or get_ph_time()) - timedelta(hours=window_hours)
+    notifications = (
+        db.session.query(
+            Notification.notificationid,
+            Notification.title,
+            Notification.message,
+            Notification.targetuserrole,
+            Notification.creationdate
+        )
+        .filter(Notification.isgroupnotification.is_(True), Notification.creationdate >= since)
+        .order_by(Notification.notificationid.desc())
+        .all()
+    )
+    if not notifications:
+        return []
+
+    by_role = {}
+    for n in notifications:
+        by_role.setdefault(n.targetuserrole, []).append(n)
+
+    read = set(
+        db.session.query(NotificationRead.userid, NotificationRead.notificationid)
+        .filter(NotificationRead.notificationid.in_([n.notificationid for n in notifications]))
+    )
+
+    pending = {}  # userid -> (email, first name, has cursor, unseen notifications)
+    for role, items in by_role.items():
+        for user_id, email, first_name, last_read, last_digest in _recipients(role):
+            floor = max(last_read or 0, last_digest or 0)
+            unseen = [n for n in items if n.notificationid > floor and (user_id, n.notificationid) not in read]
+            if unseen:
+                entry = pending.setdefault(user_id, (email, first_name, last_digest is not None, []))
+                entry[3].extend(unseen)
+
+    digests = []
+    for user_id, (email, first_name, has_cursor, unseen) in pending.items():
+        unseen.sort(key=lambda n: n.notificationid, reverse=True)
+        digests.append({
+            "userid": user_id,
+            "has_cursor": has_cursor,
+            "last_id": unseen[0].notificationid,
+            "recipient": email,
+            "recipient_name": first_name,
+            "subject": f"You have {len(unseen)} new announcement(s) on Rentahanan",
+            "params": {
+                "name": first_name,
+                "total": len(unseen),
+                "more": max(len(unseen) - DIGEST_MAX_ITEMS, 0),
+                "notifications": [
+                    {
+                        "title": n.title,
+                        "message": n.message,
+                        "date": n.creationdate.strftime("%B %d, %Y %I:%M %p") if n.creationdate else ""
+                    }
+                    for n in unseen[:DIGEST_MAX_ITEMS]
+                ]
+            }
+        })
+    return digests
+
+
+def _advance_cursors(digests):
+    """Record the newest emailed notification per user (executemany update + insert). Caller commits."""
+    now = get_ph_time()
+    existing = [{"userid": d["userid"], "lastnotificationid": d["last_id"], "lastsentdate": now}
+                for d in digests if d["has_cursor"]]
+    new = [{"userid": d["userid"], "lastnotificationid": d["last_id"], "lastsentdate": now}
+           for d in digests if not d["has_cursor"]]
+    if existing:
+        db.session.execute(update(NotificationDigest), existing)
+    if new:
+        db.session.execute(insert(NotificationDigest), new)
+
+
+def send_digests(transport, digests, batch_size=DIGEST_BATCH_SIZE, calls_per_second=DIGEST_CALLS_PER_SECOND):
+    """
+    Submit the digests in batches of `batch_size` message versions, at most
+    `calls_per_second` API calls per second. Retryable failures are retried
+    with backoff; a batch that still fails keeps its cursors, so the next
+    run picks it up again.
+    """
+    html = render_email(DIGEST_TEMPLATE)
+    bucket = TokenBucket(calls_per_second, capacity=1)
+    report = {"digests": len(digests), "sent": 0, "failed": 0, "calls": 0}
+    for start in range(0, len(digests), batch_size):
+        batch = digests[start:start + batch_size]
+        for attempt in range(DIGEST_MAX_RETRIES + 1):
+            bucket.acquire()
+            report["calls"] += 1
+            result = transport.send_versions(DIGEST_SUBJECT, html, batch)
+            if result.ok or not result.retryable or not result.attempted:
+                break
+            time.sleep(2 ** attempt)
+
+        if result.ok:
+            _advance_cursors(batch)
+            db.session.commit()
+            report["sent"] += len(batch)
+        else:
+            report["failed"] += len(batch)
+            print(f"[Digest Error] Batch of {len(batch)} failed: {result.error}")
+    return report
@@ -0,0 +1,179 @@
+import json
+import queue
+import threading
+from itertools import chain
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models.applications_model import Application
+from models.bills_model import Bill
+from models.concerns_model import Concern
+from models.contracts_model import Contract
+from models.notifications_model import Notification
+from utils.notification_inbox import role_target
+
+# -------------------
+# In-process notification pub/sub
+# -------------------
+# Committed Notification inserts and changes to the rows behind the
+# dashboard counters are published to the SSE / long-poll subscribers of
+# this process. Clients keep their counters up to date from the deltas
+# instead of polling the COUNT endpoints. With several worker processes,
+# each process only sees its own commits; clients still converge on
+# reconnect through Last-Event-ID / since_id.
+
+QUEUE_SIZE = 256
+
+# (model, counter name, audience kind, predicate on status). Audience "tenant"
+# routes by the row's tenantid, "role" goes to every Owner subscriber.
+COUNTER_RULES = [
+    (Bill, "unpaidBills", "tenant", lambda status: status == "Unpaid"),
+    (Bill, "pendingPayments", "role", lambda status: status in ("Unpaid", "Overdue")),
+    (Concern, "pendingConcerns", "tenant", lambda status: status == "Pending"),
+    (Application, "pendingApplications", "role", lambda status: status == "Pending"),
+    (Contract, "activeTenants", "role", lambda status: status == "Active"),
+]
+
+
+class Subscriber:
+    def __init__(self, user_id, role, tenant_id=None):
+        self.user_id = user_id
+        self.role = role_target(role)
+        self.tenant_id = tenant_id
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = False
+
+    def matches(self, audience):
+        kind, value = audience
+        if kind == "user":
+            return value == self.user_id
+        if kind == "role":
+            return value == self.role
+        return kind == "tenant" and value is not None and value == self.tenant_id
+
+    def get(self, timeout):
+        """Next (event, data, id) tuple, or None when `timeout` seconds pass quietly."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class NotificationBroker:
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, role, tenant_id=None):
+        subscriber = Subscriber(user_id, role, tenant_id)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, events):
+        """Deliver [(audience, event, data, id), ...] to every matching subscriber."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            for audience, name, data, event_id in events:
+                if not subscriber.matches(audience):
+                    continue
+                try:
+                    subscriber.queue.put_nowait((name, data, event_id))
+                except queue.Full:
+                    # A stuck client loses events; it is told to resync instead
+                    subscriber.overflowed = True
+
+
+notification_broker = NotificationBroker()
+
+
+def format_sse(name, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {name}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def notification_payload(notification):
+    data = notification.to_dict()
+    data["is_read"] = False
+    data["status"] = "unread"
+    return data
+
+
+def notification_audience(notification):
+    if notification.targetuserid is not None:
+        return ("user", int(notification.targetuserid))
+    return ("role", notification.targetuserrole)
+
+
+def _status_change(obj, session):
+    """(was_counted_status, now_status) for a row in this flush."""
+    state = inspect(obj)
+    history = state.attrs.status.history
+    if obj in session.new:
+        return None, obj.status
+    if obj in session.deleted:
+        return (history.deleted[0] if history.deleted else obj.status), None
+    if not history.has_changes():
+        return obj.status, obj.status
+    return (history.deleted[0] if history.deleted else None), obj.status
+
+
+def _counter_events(session):
+    deltas = {}
+    for obj in chain(session.new, session.dirty, session.deleted):
+        for model, counter, kind, predicate in COUNTER_RULES:
+            if not isinstance(obj, model):
+                continue
+            before, after = _status_change(obj, session)
+            delta = int(predicate(after)) - int(predicate(before))
+            if not delta:
+                continue
+            audience = ("tenant", obj.tenantid) if kind == "tenant" else ("role", "Owner")
+            key = (audience, counter)
+            deltas[key] = deltas.get(key, 0) + delta
+            if counter == "activeTenants":
+                key = (audience, "vacantProperties")
+                deltas[key] = deltas.get(key, 0) - delta
+
+    grouped = {}
+    for (audience, counter), delta in deltas.items():
+        if delta:
+            grouped.setdefault(audience, {})[counter] = delta
+    return [(audience, "counters", data, None) for audience, data in grouped.items()]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_events(session, flush_context):
+    pending = session.info.setdefault("notification_events", [])
+    for obj in session.new:
+        if isinstance(obj, Notification):
+            audience = notification_audience(obj)
+            pending.append((audience, "notification", notification_payload(obj), obj.notificationid))
+            pending.append((audience, "counters", {"unreadNotifications": 1}, None))
+    pending.extend(_counter_events(session))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_events(session):
+    events = session.info.pop("notification_events", None)
+    if events:
+        notification_broker.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_events(session):
+    session.info.pop("notification_events", None)
@@ -0,0 +1,103 @@
+from extensions import db
+from models.notifications_model import Notification
+from models.notification_reads_model import NotificationRead, NotificationWatermark
+
+# -------------------
+# Per-recipient read state
+# -------------------
+# Role notifications are one shared row, so "read" can't live on the row.
+# Each user has a watermark (everything at or below it is read) plus sparse
+# NotificationReads rows for items read individually above it. Unread counts
+# only ever look at ids above the watermark, through the composite indexes.
+
+
+def role_target(role):
+    """Role whose group notifications this user receives (same rule as the inbox)."""
+    return "Owner" if role == "Owner" else "Tenant"
+
+
+def visible_filter(user_id, role):
+    return db.or_(
+        Notification.targetuserrole == role_target(role),
+        Notification.targetuserid == user_id
+    )
+
+
+def _watermark_expr(user_id):
+    return db.func.coalesce(
+        db.session.query(NotificationWatermark.lastreadid)
+        .filter(NotificationWatermark.userid == user_id)
+        .scalar_subquery(),
+        0
+    )
+
+
+def get_watermark(user_id):
+    return db.session.query(_watermark_expr(user_id)).scalar() or 0
+
+
+def unread_count(user_id, role):
+    """Notifications visible to the user, above the watermark and not individually read."""
+    read = (
+        db.session.query(NotificationRead.notificationid)
+        .filter(
+            NotificationRead.userid == user_id,
+            NotificationRead.notificationid == Notification.notificationid
+        )
+        .exists()
+    )
+    return (
+        db.session.query(db.func.count(Notification.notificationid))
+        .filter(
+            visible_filter(user_id, role),
+            Notification.notificationid > _watermark_expr(user_id),
+            ~read
+        )
+        .scalar()
+    )
+
+
+def read_ids(user_id, notification_ids):
+    """Subset of `notification_ids` the user has read (one watermark lookup + one IN query)."""
+    if not notification_ids:
+        return set()
+    watermark = get_watermark(user_id)
+    read = {nid for nid in notification_ids if nid <= watermark}
+    above = [nid for nid in notification_ids if nid > watermark]
+    if above:
+        read.update(
+            nid for (nid,) in db.session.query(NotificationRead.notificationid)
+            .filter(NotificationRead.userid == user_id, NotificationRead.notificationid.in_(above))
+        )
+    return read
+
+
+def mark_read(user_id, notification_id):
+    """Record a single read. Returns False if it was already read. Caller commits."""
+    if notification_id <= get_watermark(user_id):
+        return False
+    if db.session.get(NotificationRead, (user_id, notification_id)):
+        return False
+    db.session.add(NotificationRead(userid=user_id, notificationid=notification_id))
+    return True
+
+
+def mark_all_read(user_id, role):
+    """
+    Advance the watermark to the newest notification and drop the read rows
+    it now covers. Returns how many notifications became read. Caller commits.
+    """
+    marked = unread_count(user_id, role)
+    newest = db.session.query(db.func.max(Notification.notificationid)).scalar() or 0
+
+    watermark = db.session.get(NotificationWatermark, user_id)
+    if watermark is None:
+        db.session.add(NotificationWatermark(userid=user_id, lastreadid=newest))
+    elif newest > watermark.lastreadid:
+        watermark.lastreadid = newest
+
+    NotificationRead.query.filter(
+        NotificationRead.userid == user_id,
+        NotificationRead.notificationid <= newest
+    ).delete(synchronize_session=False)
+    return marked
@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from sqlalchemy import delete, insert, literal, select
+
+from extensions import db
+from models.notification_reads_model import NotificationRead
+from models.notifications_model import Notification, NotificationArchive, get_ph_time
+from utils.notification_counters import apply_deltas, counter_deltas
+
+# -------------------
+# Notification retention
+# -------------------
+# Old notifications are moved to NotificationsArchive in small batches:
+# each batch is INSERT ... SELECT + DELETE by primary key in its own short
+# transaction, so the hot table is never locked for long and stays small.
+# The duplicate collapse only looks at recent rows (the nightly run's
+# lookback, plus one duplicate window of earlier rows to compare against);
+# older rows were already collapsed by previous runs.
+
+DEFAULT_BATCH_SIZE = 1000
+DUPLICATE_LOOKBACK_HOURS = 48  # two nightly runs, so one missed run loses nothing
+
+ARCHIVED_COLUMNS = [
+    "notificationid", "title", "message", "targetuserrole", "targetuserid",
+    "isgroupnotification", "recipientcount", "createdbyuserid", "creationdate",
+]
+
+
+def _archive_batch(ids, reason):
+    """Move the notifications with these ids to the archive. One transaction."""
+    source = [getattr(Notification, name) for name in ARCHIVED_COLUMNS]
+    db.session.execute(
+        insert(NotificationArchive).from_select(
+            ARCHIVED_COLUMNS + ["archiveddate", "archivereason"],
+            select(*source, literal(get_ph_time()), literal(reason))
+            .where(Notification.notificationid.in_(ids))
+        )
+    )
+    apply_deltas(counter_deltas(Notification.notificationid.in_(ids)))
+    db.session.execute(delete(NotificationRead).where(NotificationRead.notificationid.in_(ids)))
+    db.session.execute(delete(Notification).where(Notification.notificationid.in_(ids)))
+    db.session.commit()
+
+
+def archive_expired(days, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """Archive notifications created more than `days` days ago. Returns the count."""
+    cutoff = get_ph_time() - timedelta(days=days)
+    expired = (
+        db.session.query(Notification.notificationid)
+        .filter(Notification.creationdate < cutoff)
+        .order_by(Notification.notificationid)
+    )
+    if dry_run:
+        return expired.count()
+
+    archived = 0
+    while True:
+        ids = [nid for (nid,) in expired.limit(batch_size)]
+        if not ids:
+            return archived
+        _archive_batch(ids, "expired")
+        archived += len(ids)
+
+
+def find_duplicate_group_notifications(window_hours, since=None):
+    """
+    Ids of group notifications repeating an earlier one (same role, title and
+    message) within `window_hours`. The earliest of each run is kept. With
+    `since`, only notifications created from then on are candidates; rows
+    one window before it are read as the earlier ones to compare against.
+    """
+    window = timedelta(hours=window_hours)
+    query = (
+        db.session.query(
+            Notification.notificationid,
+            Notification.targetuserrole,
+            Notification.title,
+            Notification.message,
+            Notification.creationdate
+        )
+        .filter(Notification.isgroupnotification.is_(True))
+    )
+    if since is not None:
+        query = query.filter(Notification.creationdate >= since - window)
+    rows = query.order_by(Notification.notificationid).yield_per(DEFAULT_BATCH_SIZE)
+
+    duplicates = []
+    kept = {}  # (role, title, message) -> creationdate of the notification being kept
+    for nid, role, title, message, created in rows:
+        key = (role, title, message)
+        first = kept.get(key)
+        if first is not None and created is not None and abs(created - first) <= window:
+            if since is None or created >= since:
+                duplicates.append(nid)
+        else:
+            kept[key] = created
+    return duplicates
+
+
+def collapse_duplicates(window_hours, batch_size=DEFAULT_BATCH_SIZE, dry_run=False,
+                        lookback_hours=DUPLICATE_LOOKBACK_HOURS):
+    """Archive repeated group notifications from the last `lookback_hours` (None: all). Returns the count."""
+    since = get_ph_time() - timedelta(hours=lookback_hours) if lookback_hours is not None else None
+    duplicates = find_duplicate_group_notifications(window_hours, since)
+    if not dry_run:
+        for start in range(0, len(duplicates), batch_size):
+            _archive_batch(duplicates[start:start + batch_size], "duplicate")
+    return len(duplicates)
+
+
+def apply_retention_policy(days, window_hours, batch_size=DEFAULT_BATCH_SIZE, dry_run=False,
+                           lookback_hours=DUPLICATE_LOOKBACK_HOURS):
+    """
+    Collapse recent duplicate group notifications, then archive everything
+    older than `days`. Meant to run nightly from cron:
+        30 2 * * *  cd backend && flask --app app archive-notifications
+    """
+    return {
+        "duplicates": collapse_duplicates(window_hours, batch_size, dry_run, lookback_hours),
+        "expired": archive_expired(days, batch_size, dry_run),
+    }
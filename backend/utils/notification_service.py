@@ -0,0 +1,119 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models.notifications_model import Notification
+from models.tenants_model import Tenant
+from models.users_model import User
+
+# -------------------
+# Notification service
+# -------------------
+# Every route creates notifications through these helpers. A role
+# notification is one shared row (targetuserrole) whose recipientcount comes
+# from a cached count, so handlers no longer load all owners on each write.
+# Rows are only added to the session; the caller's commit inserts them in
+# one statement together with the rest of its changes.
+
+RECIPIENT_COUNT_TTL = 300  # seconds
+
+_counts = {}
+_counts_lock = threading.Lock()
+
+
+def _count_recipients(role):
+    if role == "Tenant":
+        return Tenant.query.filter_by(status="Active").count()
+    return db.session.query(db.func.count(User.userid)).filter(User.role == role).scalar()
+
+
+def role_recipient_count(role):
+    """Number of users a `role` notification reaches (owners, or active tenants)."""
+    now = time.monotonic()
+    with _counts_lock:
+        cached = _counts.get(role)
+        if cached and cached[1] > now:
+            return cached[0]
+    count = _count_recipients(role)
+    with _counts_lock:
+        _counts[role] = (count, now + RECIPIENT_COUNT_TTL)
+    return count
+
+
+def invalidate_recipient_counts():
+    with _counts_lock:
+        _counts.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_change(session, flush_context):
+    # New owners/tenants or role/status changes make the cached counts stale
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (User, Tenant)):
+            invalidate_recipient_counts()
+            session.info["recipient_counts_stale"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_on_end(session):
+    # Between the flush and the end of the transaction a count can be cached
+    # from the old rows (another request) or from rows about to be rolled back
+    if session.info.pop("recipient_counts_stale", False):
+        invalidate_recipient_counts()
+
+
+def notify_user(user_id, title, message, created_by=None):
+    """Queue a notification for one user."""
+    notification = Notification(
+        title=title,
+        message=message,
+        targetuserid=int(user_id),
+        isgroupnotification=False,
+        recipientcount=1,
+        createdbyuserid=created_by
+    )
+    db.session.add(notification)
+    return notification
+
+
+def notify_role(role, title, message, created_by=None):
+    """Queue one shared notification for every user with `role`. Returns None if nobody has it."""
+    recipients = role_recipient_count(role)
+    if not recipients:
+        return None
+    notification = Notification(
+        title=title,
+        message=message,
+        targetuserrole=role,
+        isgroupnotification=True,
+        recipientcount=recipients,
+        createdbyuserid=created_by
+    )
+    db.session.add(notification)
+    return notification
+
+
+def notify_owners(title, message, created_by=None):
+    return notify_role("Owner", title, message, created_by)
+
+
+def notify_users(user_ids, title, message, created_by=None):
+    """Queue the same notification for many users; flushed as a single multi-row INSERT."""
+    notifications = [
+        Notification(
+            title=title,
+            message=message,
+            targetuserid=int(user_id),
+            isgroupnotification=False,
+            recipientcount=1,
+            createdbyuserid=created_by
+        )
+        for user_id in user_ids
+    ]
+    db.session.add_all(notifications)
+    return notifications
@@ -0,0 +1,83 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# -------------------
+# Password hashing
+# -------------------
+# PASSWORD_HASH_METHOD picks the algorithm and work factor, in Werkzeug's
+# method syntax:
+#     scrypt:32768:8:1         scrypt, N=2**15, r=8, p=1 (default)
+#     pbkdf2:sha256:600000     PBKDF2-SHA256, 600k iterations
+# Stored hashes carry their own parameters, so old hashes keep verifying;
+# login rehashes them with the current method (needs_rehash).
+#
+# Hashing is deliberately slow CPU work. It runs on a small shared pool so
+# a burst of logins can't take every CPU (hashlib releases the GIL) and the
+# request thread only waits for its own result. At most PASSWORD_HASH_QUEUE
+# jobs may be waiting; beyond that the caller gets HashPoolBusy and should
+# answer 503 instead of piling up.
+
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "64"))
+QUEUE_WAIT_SECONDS = 2
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+_canonical = {}
+_canonical_lock = threading.Lock()
+
+
+class HashPoolBusy(Exception):
+    """Too many password hash jobs are already queued."""
+
+
+def _run(fn, *args, **kwargs):
+    if not _slots.acquire(timeout=QUEUE_WAIT_SECONDS):
+        raise HashPoolBusy()
+    try:
+        future = _executor.submit(fn, *args, **kwargs)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future.result()
+
+
+def canonical_method(method=None):
+    """Full parameter string Werkzeug stores for `method` ("scrypt" -> "scrypt:32768:8:1")."""
+    method = method or PASSWORD_HASH_METHOD
+    with _canonical_lock:
+        if method not in _canonical:
+            _canonical[method] = generate_password_hash("", method=method, salt_length=1).split("$", 1)[0]
+        return _canonical[method]
+
+
+def hash_password(password, method=None):
+    """Hash with the configured (or given) method, on the pool."""
+    return _run(generate_password_hash, password, method=method or PASSWORD_HASH_METHOD)
+
+
+def verify_password(password_hash, password):
+    """check_password_hash on the bounded pool. Raises HashPoolBusy when saturated."""
+    return _run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash, method=None):
+    """True if the stored hash was made with other parameters than the configured method."""
+    return password_hash.split("$", 1)[0] != canonical_method(method)
+
+
+def verify_and_update(password_hash, password, method=None):
+    """
+    (ok, new_hash): new_hash is set when the password is correct but the
+    stored hash should be upgraded to the configured method.
+    """
+    if not verify_password(password_hash, password):
+        return False, None
+    if needs_rehash(password_hash, method):
+        return True, hash_password(password, method)
+    return True, None
@@ -0,0 +1,241 @@
+import hashlib
+import io
+import logging
+import os
+import zlib
+
+from PIL import Image, ImageChops
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import ContentStream, NameObject, NumberObject
+
+from utils.file_delivery import is_hashed_name
+
+# -------------------
+# PDF output optimization
+# -------------------
+# Images are resampled to this resolution at their printed size. Signatures
+# are line art, so 150 dpi is plenty on paper and on screen.
+TARGET_DPI = 150
+PDF_FOLDERS = ("contracts", "signed_contracts", "receipts")
+
+logger = logging.getLogger(__name__)
+
+
+def _flatten_to_white(image):
+    """Composite transparent pixels onto white (removes the black box around signatures)."""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        white_bg = Image.new("RGB", image.size, (255, 255, 255))
+        white_bg.paste(image, mask=image.split()[3])
+        return white_bg
+    return image.convert("RGB")
+
+
+def _is_grayscale(image):
+    return ImageChops.difference(image, image.convert("L").convert("RGB")).getbbox() is None
+
+
+def _fit_to_print(image, width_pt, height_pt, dpi=TARGET_DPI):
+    """Downscale (never upscale) so the image has `dpi` pixels per inch at its printed size."""
+    max_size = (max(1, int(width_pt / 72.0 * dpi)), max(1, int(height_pt / 72.0 * dpi)))
+    if image.width > max_size[0] or image.height > max_size[1]:
+        image = image.copy()
+        image.thumbnail(max_size, Image.LANCZOS)
+    return image
+
+
+def prepare_signature(source, width_pt, height_pt, dpi=TARGET_DPI):
+    """
+    Turn an uploaded/base64-decoded signature into a compact PNG sized for
+    a `width_pt` x `height_pt` box. Accepts a path, bytes or file object.
+    Returns a BytesIO ready for ReportLab's drawImage/ImageReader.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    image = _flatten_to_white(Image.open(source))
+    image = _fit_to_print(image, width_pt, height_pt, dpi)
+    if _is_grayscale(image):
+        image = image.convert("L")
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    buffer.seek(0)
+    return buffer
+
+
+def _multiply(m1, m2):
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (
+        a1 * a2 + b1 * c2, a1 * b2 + b1 * d2,
+        c1 * a2 + d1 * c2, c1 * b2 + d1 * d2,
+        e1 * a2 + f1 * c2 + e2, e1 * b2 + f1 * d2 + f2,
+    )
+
+
+def _printed_sizes(page, reader):
+    """Map XObject name -> largest (width_pt, height_pt) it is drawn at on this page."""
+    sizes = {}
+    contents = page.get_contents()
+    if contents is None:
+        return sizes
+
+    ctm = (1, 0, 0, 1, 0, 0)
+    stack = []
+    for operands, operator in ContentStream(contents, reader).operations:
+        if operator == b"q":
+            stack.append(ctm)
+        elif operator == b"Q" and stack:
+            ctm = stack.pop()
+        elif operator == b"cm" and len(operands) == 6:
+            ctm = _multiply(tuple(float(v) for v in operands), ctm)
+        elif operator == b"Do" and operands:
+            a, b, c, d = ctm[:4]
+            width = (a * a + b * b) ** 0.5
+            height = (c * c + d * d) ** 0.5
+            old = sizes.get(operands[0], (0, 0))
+            sizes[operands[0]] = (max(old[0], width), max(old[1], height))
+    return sizes
+
+
+def _downscale_image(xobj, width_pt, height_pt):
+    """Re-encode an 8-bit RGB/Gray image XObject in place. Returns True if it was rewritten."""
+    if "/SMask" in xobj or xobj.get("/BitsPerComponent") != 8:
+        return False
+    color_space = xobj.get("/ColorSpace")
+    mode = {"/DeviceRGB": "RGB", "/DeviceGray": "L"}.get(color_space)
+    if not mode or "/Mask" in xobj:
+        return False
+
+    size = (int(xobj["/Width"]), int(xobj["/Height"]))
+    data = xobj.get_data()
+    if len(data) != size[0] * size[1] * len(mode):
+        return False
+
+    image = Image.frombytes(mode, size, data)
+    image = _fit_to_print(image, width_pt, height_pt)
+    if mode == "RGB" and _is_grayscale(image):
+        image = image.convert("L")
+
+    xobj._data = zlib.compress(image.tobytes(), 9)
+    xobj.decoded_self = None
+    xobj[NameObject("/Filter")] = NameObject("/FlateDecode")
+    xobj[NameObject("/Width")] = NumberObject(image.width)
+    xobj[NameObject("/Height")] = NumberObject(image.height)
+    xobj[NameObject("/ColorSpace")] = NameObject("/DeviceRGB" if image.mode == "RGB" else "/DeviceGray")
+    xobj.pop("/DecodeParms", None)
+    return True
+
+
+def _dedupe_resources(page, seen, category):
+    """Point identical font/image objects shared across pages at a single copy."""
+    resources = page.get("/Resources")
+    if resources is None:
+        return
+    resources = resources.get_object()
+    entries = resources.get(category)
+    if entries is None:
+        return
+    entries = entries.get_object()
+    for name in list(entries.keys()):
+        ref = entries.raw_get(name)
+        if not hasattr(ref, "idnum"):
+            continue
+        obj = ref.get_object()
+        if hasattr(obj, "get_data"):
+            key = hashlib.sha256(obj.get_data() + repr(sorted(obj.items())).encode()).hexdigest()
+        else:
+            key = repr(sorted((k, repr(v)) for k, v in obj.items()))
+        entries[NameObject(name)] = seen.setdefault(key, ref)
+
+
+def optimize_pdf_bytes(data):
+    """Return an optimized copy of the PDF in `data`."""
+    reader = PdfReader(io.BytesIO(data))
+    writer = PdfWriter()
+    for page in reader.pages:
+        writer.add_page(page)
+
+    seen_fonts, seen_images, rewritten = {}, {}, set()
+    for page in writer.pages:
+        resources = page.get("/Resources")
+        xobjects = resources.get_object().get("/XObject") if resources is not None else None
+        if xobjects is not None:
+            xobjects = xobjects.get_object()
+            for name, (width_pt, height_pt) in _printed_sizes(page, writer).items():
+                ref = xobjects.raw_get(name) if name in xobjects else None
+                if ref is None or getattr(ref, "idnum", None) in rewritten:
+                    continue
+                xobj = ref.get_object()
+                if xobj.get("/Subtype") == "/Image" and width_pt and height_pt:
+                    _downscale_image(xobj, width_pt, height_pt)
+                    rewritten.add(getattr(ref, "idnum", None))
+
+        _dedupe_resources(page, seen_fonts, "/Font")
+        _dedupe_resources(page, seen_images, "/XObject")
+        page.compress_content_streams()
+
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def optimize_pdf(path):
+    """
+    Optimize a PDF on disk in place. The file is only replaced if the result
+    is smaller. Returns (bytes_before, bytes_after); never raises so that
+    document generation isn't blocked by an optimization failure.
+    """
+    before = os.path.getsize(path)
+    try:
+        with open(path, "rb") as f:
+            optimized = optimize_pdf_bytes(f.read())
+    except Exception as e:
+        logger.warning("Optimization skipped for %s: %s", os.path.basename(path), e)
+        return before, before
+
+    if len(optimized) >= before:
+        return before, before
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(optimized)
+    os.replace(temp_path, path)
+    return before, len(optimized)
+
+
+def measure_archive(upload_folder, apply=False, folders=PDF_FOLDERS):
+    """
+    Report bytes that optimization saves across the stored PDFs.
+    With apply=True the files are recompressed in place. Content-addressed
+    files (<prefix>_<sha256>.pdf) are left alone and reported unchanged:
+    they were optimized before being stored, and their name has to keep
+    matching their bytes (immutable caching and dedup rely on it).
+    Returns {folder: {"files": n, "before": bytes, "after": bytes}}.
+    """
+    report = {}
+    for folder in folders:
+        folder_path = os.path.join(upload_folder, folder)
+        stats = {"files": 0, "before": 0, "after": 0}
+        if os.path.isdir(folder_path):
+            for filename in sorted(os.listdir(folder_path)):
+                if not filename.lower().endswith(".pdf"):
+                    continue
+                path = os.path.join(folder_path, filename)
+                if is_hashed_name(filename):
+                    before = after = os.path.getsize(path)
+                elif apply:
+                    before, after = optimize_pdf(path)
+                else:
+                    before = os.path.getsize(path)
+                    try:
+                        with open(path, "rb") as f:
+                            after = min(before, len(optimize_pdf_bytes(f.read())))
+                    except Exception as e:
+                        logger.warning("Could not analyse %s: %s", filename, e)
+                        after = before
+                stats["files"] += 1
+                stats["before"] += before
+                stats["after"] += after
+        report[folder] = stats
+    return report
@@ -0,0 +1,135 @@
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import Session, aliased
+
+from extensions import db
+from models.applications_model import Application
+from models.tenants_model import Tenant
+from models.users_model import User
+from utils.ttl_store import get_verification_store
+
+# -------------------
+# Principal lookups
+# -------------------
+# Login loads everything it needs (user columns, application status,
+# tenant id/status) in one query. Each user yields exactly one row, picked
+# by correlated subqueries instead of joining every application and
+# tenant: their latest application, and the tenant record created for that
+# application (their first tenant record when none is linked to it), so
+# both statuses describe the same tenancy.
+#
+# The role/tenant part is cached in the shared TTL store so JWT-protected
+# routes can get it by user id without the join. Committed changes to
+# Users/Tenants/Applications drop the affected entries, in every worker.
+
+PRINCIPAL_TTL = 60  # seconds
+
+
+def _principal_key(user_id):
+    return f"principal:{int(user_id)}"
+
+
+def _principal_query():
+    latest_application = aliased(Application)
+    latest_application_id = (
+        db.session.query(latest_application.applicationid)
+        .filter(latest_application.userid == User.userid)
+        .order_by(latest_application.applicationid.desc())
+        .limit(1)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    other_tenant = aliased(Tenant)
+
+    def first_tenant(*criteria):
+        return (
+            db.session.query(db.func.min(other_tenant.tenantid))
+            .filter(other_tenant.userid == User.userid, *criteria)
+            .correlate(User)
+            .scalar_subquery()
+        )
+
+    tenant_id = db.func.coalesce(
+        first_tenant(other_tenant.applicationid == latest_application_id),
+        first_tenant()
+    )
+    return (
+        db.session.query(
+            User.userid,
+            User.firstname,
+            User.lastname,
+            User.middlename,
+            User.email,
+            User.role,
+            User.password,
+            Application.status.label("application_status"),
+            Tenant.tenantid,
+            Tenant.status.label("tenant_status")
+        )
+        .select_from(User)
+        .outerjoin(Application, Application.applicationid == latest_application_id)
+        .outerjoin(Tenant, Tenant.tenantid == tenant_id)
+    )
+
+
+def _cache(row):
+    principal = {
+        "userid": row.userid,
+        "role": row.role,
+        "tenantid": row.tenantid,
+        "tenant_status": row.tenant_status,
+        "application_status": row.application_status
+    }
+    get_verification_store().set(_principal_key(row.userid), principal, PRINCIPAL_TTL)
+    return principal
+
+
+def load_login_principal(email):
+    """The login row for `email` (or None), in one roundtrip."""
+    return _principal_query().filter(User.email == email).first()
+
+
+def get_principal(user_id):
+    """{userid, role, tenantid, tenant_status, application_status} for a user, cached for PRINCIPAL_TTL."""
+    principal = get_verification_store().get(_principal_key(user_id))
+    if principal is None:
+        row = _principal_query().filter(User.userid == int(user_id)).first()
+        if row is None:
+            return None
+        principal = _cache(row)
+    return principal
+
+
+def current_principal():
+    """Principal of the JWT in the current request (use inside @jwt_required routes)."""
+    identity = get_jwt_identity()
+    user_id = identity.get("userid") if isinstance(identity, dict) else identity
+    return get_principal(user_id) if user_id is not None else None
+
+
+def invalidate_principal(user_id):
+    try:
+        get_verification_store().delete(_principal_key(user_id))
+    except (TypeError, ValueError):  # Tenant.userid is a free-form string column
+        pass
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_principals(session, flush_context):
+    # Role changes, tenant activation/termination and application updates
+    changed = session.info.setdefault("changed_principals", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (User, Tenant, Application)) and obj.userid is not None:
+            changed.add(obj.userid)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_principals(session):
+    # After the commit, so no request can re-cache the old values in between
+    for user_id in session.info.pop("changed_principals", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_principals(session):
+    session.info.pop("changed_principals", None)
@@ -0,0 +1,259 @@
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, request
+
+# -------------------
+# Rate limiting
+# -------------------
+# Routes declare their limits with @rate_limited(...). Each Limit is a
+# token bucket per key (the request's email, the client IP, or one global
+# key): `capacity` requests may burst, refilled evenly over the period.
+# Buckets live in process memory, or in a shared TTL store when
+# RATE_LIMIT_STORE is set (database | redis), so every worker enforces the
+# same budget. Denied requests get 429 with Retry-After.
+#
+# per_ip keys on request.remote_addr. Behind a reverse proxy, set
+# TRUSTED_PROXY_COUNT so app.py applies ProxyFix and remote_addr is the
+# client from X-Forwarded-For rather than the proxy.
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens are added per second up to
+    `capacity`. Thread-safe.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take `tokens` if available. Returns 0 on success, else seconds until they would be."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+            return (tokens - self._tokens) / self.rate
+
+    def refund(self, tokens=1):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available, then take them."""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+RATE_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+RATE_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
+
+
+def parse_rate(rate):
+    """"5/hour" or "10/15minutes" -> (5, 3600.0) / (10, 900.0): requests per period in seconds."""
+    match = RATE_PATTERN.match(rate)
+    if not match:
+        raise ValueError(f"Invalid rate: {rate!r}")
+    count, multiplier, unit = match.groups()
+    return int(count), float(int(multiplier or 1) * RATE_UNITS[unit])
+
+
+class Limit:
+    """One token bucket per key. `key` returns the bucket key for the current request, or None to skip."""
+
+    def __init__(self, name, rate, key=None):
+        self.name = name
+        self.rate = rate
+        self.capacity, self.period = parse_rate(rate)
+        self.refill_per_second = self.capacity / self.period
+        self._key = key
+
+    def key(self):
+        return self._key() if self._key else "*"
+
+
+def _json_field(field):
+    def key():
+        data = request.get_json(silent=True)
+        value = data.get(field) if isinstance(data, dict) else None
+        return str(value).strip().lower() if value else None
+    return key
+
+
+def per_email(rate, name, field="email"):
+    """Limit per address in the JSON body (requests without one are left to the route's own validation)."""
+    return Limit(name, rate, key=_json_field(field))
+
+
+def per_ip(rate, name):
+    return Limit(name, rate, key=lambda: request.remote_addr or "unknown")
+
+
+def global_limit(rate, name):
+    """One bucket for every caller. Routes using the same name share it."""
+    return Limit(name, rate)
+
+
+class MemoryBucketBackend:
+    """Buckets in this process. At most `max_keys` buckets are kept (least recently used evicted)."""
+
+    name = "memory"
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, limit, key):
+        bucket_key = (limit.name, key)
+        with self._lock:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                bucket = self._buckets[bucket_key] = TokenBucket(limit.refill_per_second, limit.capacity)
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(bucket_key)
+            return bucket
+
+    def take(self, limit, key):
+        """0 if a token was taken, else seconds until one is available."""
+        return self._bucket(limit, key).try_acquire()
+
+    def refund(self, limit, key):
+        self._bucket(limit, key).refund()
+
+
+class StoreBucketBackend:
+    """
+    Bucket state ({tokens, updated}) kept in a TTL store shared by all
+    workers. Every take/refund is one atomic store.modify(), so concurrent
+    requests never spend the same token twice.
+    """
+
+    name = "shared"
+
+    def __init__(self, store):
+        self.store = store
+
+    @staticmethod
+    def _tokens(limit, state, now):
+        if state is None:
+            return limit.capacity
+        return min(limit.capacity, state["tokens"] + (now - state["updated"]) * limit.refill_per_second)
+
+    @staticmethod
+    def _state(limit, tokens, now):
+        # Expire once the bucket would be full again, i.e. when it no longer matters
+        ttl = (limit.capacity - tokens) / limit.refill_per_second + 1
+        return {"tokens": tokens, "updated": now}, ttl
+
+    def take(self, limit, key):
+        def take_one(state):
+            now = time.time()
+            tokens = self._tokens(limit, state, now)
+            if tokens < 1:
+                return None, 0, (1 - tokens) / limit.refill_per_second
+            return (*self._state(limit, tokens - 1, now), 0)
+
+        return self.store.modify(f"ratelimit:{limit.name}:{key}", take_one)
+
+    def refund(self, limit, key):
+        def refund_one(state):
+            now = time.time()
+            return (*self._state(limit, min(limit.capacity, self._tokens(limit, state, now) + 1), now), None)
+
+        self.store.modify(f"ratelimit:{limit.name}:{key}", refund_one)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Backend selected by RATE_LIMIT_STORE: unset/memory, or a TTL store name (database, redis)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = (os.getenv("RATE_LIMIT_STORE") or "memory").lower()
+                if name == "memory":
+                    _backend = MemoryBucketBackend()
+                else:
+                    from utils.ttl_store import create_ttl_store
+
+                    _backend = StoreBucketBackend(create_ttl_store(name))
+    return _backend
+
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def _record(limit, outcome):
+    with _metrics_lock:
+        counts = _metrics.setdefault(limit.name, {"rate": limit.rate, "allowed": 0, "limited": 0})
+        counts[outcome] += 1
+
+
+def rate_limit_metrics():
+    """Allowed/limited request counts per limit since this process started."""
+    with _metrics_lock:
+        limits = {name: dict(counts) for name, counts in _metrics.items()}
+    return {"backend": get_backend().name, "limits": limits}
+
+
+def rate_limited(*limits):
+    """
+    Route decorator. Takes a token from every limit's bucket; if any is
+    empty, the tokens already taken are refunded and 429 is returned.
+
+        @bp.route("/forgot/send", methods=["POST"])
+        @rate_limited(per_email("3/hour", "forgot-email"), per_ip("20/hour", "forgot-ip"))
+        def send_code(): ...
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            backend = get_backend()
+            taken = []
+            for limit in limits:
+                key = limit.key()
+                if key is None:
+                    continue
+                wait = backend.take(limit, key)
+                if wait:
+                    for taken_limit, taken_key in taken:
+                        backend.refund(taken_limit, taken_key)
+                    _record(limit, "limited")
+                    retry_after = max(1, math.ceil(wait))
+                    print(f"[Rate Limit] {limit.name} exceeded for {key} ({request.path}), retry in {retry_after}s")
+                    response = jsonify({
+                        "message": "Too many requests. Please try again later.",
+                        "retry_after": retry_after
+                    })
+                    return response, 429, {"Retry-After": str(retry_after)}
+                taken.append((limit, key))
+            for limit, _ in taken:
+                _record(limit, "allowed")
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,185 @@
+import io
+import threading
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+
+# -------------------
+# Precompiled receipt template
+# -------------------
+# The static part of the receipt (title, table backgrounds, labels, footer)
+# is a form XObject placed on the page. Each receipt draws its variable
+# fields on top of it, at baselines shared with the background.
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+TABLE_WIDTH = 6 * inch
+LEFT = (PAGE_WIDTH - TABLE_WIDTH) / 2
+RIGHT = LEFT + TABLE_WIDTH
+PADDING = 12
+
+BRAND = colors.HexColor("#2E86AB")
+BRAND_DARK = colors.HexColor("#1A5276")
+LIGHT_BG = colors.HexColor("#F8F9FA")
+GRID = colors.HexColor("#DDDDDD")
+TEXT = colors.HexColor("#333333")
+MUTED = colors.HexColor("#666666")
+
+FOOTER_LINES = [
+    "Thank you for your payment!",
+    "",
+    "This receipt serves as an official record of your transaction.",
+    "Please keep this document for your records.",
+    "For any inquiries, please contact our administration office.",
+]
+
+# Baselines (y) of every row, shared by the background and the overlay
+TITLE_Y = PAGE_HEIGHT - 0.5 * inch - 34
+SUBTITLE_Y = TITLE_Y - 34
+RECEIPT_HEADER_TOP = SUBTITLE_Y - 24
+RECEIPT_HEADER_H = 30
+RECEIPT_ROW_H = 26
+RECEIPT_ROWS_Y = [RECEIPT_HEADER_TOP - RECEIPT_HEADER_H - RECEIPT_ROW_H * (i + 1) for i in range(3)]
+TENANT_TITLE_Y = RECEIPT_ROWS_Y[-1] - 36
+TENANT_ROW_H = 22
+TENANT_ROWS_Y = [TENANT_TITLE_Y - 14 - TENANT_ROW_H * (i + 1) for i in range(3)]
+PAYMENT_TITLE_Y = TENANT_ROWS_Y[-1] - 34
+PAYMENT_ROW_H = 32
+PAYMENT_HEADER_Y = PAYMENT_TITLE_Y - 14 - PAYMENT_ROW_H
+PAYMENT_ROW_Y = PAYMENT_HEADER_Y - PAYMENT_ROW_H
+TOTAL_ROW_H = 36
+TOTAL_ROW_Y = PAYMENT_ROW_Y - 30 - TOTAL_ROW_H
+FOOTER_TOP = TOTAL_ROW_Y - 40
+
+RECEIPT_VALUE_X = LEFT + 2.5 * inch + PADDING
+TENANT_VALUE_X = LEFT + 1.5 * inch + PADDING
+DESCRIPTION_COL_W = 4 * inch
+
+
+def _text_baseline(row_bottom, row_height, font_size):
+    return row_bottom + (row_height - font_size) / 2 + 2
+
+
+def _draw_background(c):
+    c.setFillColor(BRAND)
+    c.setFont("Helvetica-Bold", 24)
+    c.drawCentredString(PAGE_WIDTH / 2, TITLE_Y, "RENTAL MANAGEMENT SYSTEM")
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(PAGE_WIDTH / 2, SUBTITLE_Y, "Official Payment Receipt")
+
+    # Receipt information table
+    header_bottom = RECEIPT_HEADER_TOP - RECEIPT_HEADER_H
+    c.setFillColor(BRAND)
+    c.rect(LEFT, header_bottom, TABLE_WIDTH, RECEIPT_HEADER_H, stroke=0, fill=1)
+    c.setFillColor(LIGHT_BG)
+    c.rect(LEFT, RECEIPT_ROWS_Y[-1], TABLE_WIDTH, RECEIPT_ROW_H * 3, stroke=0, fill=1)
+    c.setFillColor(colors.whitesmoke)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(LEFT + PADDING, _text_baseline(header_bottom, RECEIPT_HEADER_H, 12), "RECEIPT INFORMATION")
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica-Bold", 10)
+    for label, row_y in zip(["Receipt Number:", "Issue Date:", "Issue Time:"], RECEIPT_ROWS_Y):
+        c.drawString(LEFT + PADDING, _text_baseline(row_y, RECEIPT_ROW_H, 10), label)
+
+    # Tenant information
+    c.setFillColor(TEXT)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(LEFT, TENANT_TITLE_Y, "TENANT INFORMATION")
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica-Bold", 10)
+    for label, row_y in zip(["Tenant ID:", "Full Name:", "Bill ID:"], TENANT_ROWS_Y):
+        c.drawString(LEFT + PADDING, _text_baseline(row_y, TENANT_ROW_H, 10), label)
+
+    # Payment details table
+    c.setFillColor(TEXT)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(LEFT, PAYMENT_TITLE_Y, "PAYMENT DETAILS")
+    c.setFillColor(BRAND)
+    c.rect(LEFT, PAYMENT_HEADER_Y, TABLE_WIDTH, PAYMENT_ROW_H, stroke=0, fill=1)
+    c.setStrokeColor(GRID)
+    c.setLineWidth(1)
+    c.rect(LEFT, PAYMENT_ROW_Y, TABLE_WIDTH, PAYMENT_ROW_H * 2, stroke=1, fill=0)
+    c.line(LEFT, PAYMENT_HEADER_Y, RIGHT, PAYMENT_HEADER_Y)
+    c.line(LEFT + DESCRIPTION_COL_W, PAYMENT_ROW_Y, LEFT + DESCRIPTION_COL_W, PAYMENT_HEADER_Y + PAYMENT_ROW_H)
+    c.setFillColor(colors.whitesmoke)
+    c.setFont("Helvetica-Bold", 11)
+    header_baseline = _text_baseline(PAYMENT_HEADER_Y, PAYMENT_ROW_H, 11)
+    c.drawCentredString(LEFT + DESCRIPTION_COL_W / 2, header_baseline, "Description")
+    c.drawCentredString(LEFT + DESCRIPTION_COL_W + (TABLE_WIDTH - DESCRIPTION_COL_W) / 2, header_baseline, "Amount")
+
+    # Total bar
+    c.setFillColor(BRAND_DARK)
+    c.rect(LEFT, TOTAL_ROW_Y, TABLE_WIDTH, TOTAL_ROW_H, stroke=0, fill=1)
+    c.setFillColor(colors.whitesmoke)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawRightString(LEFT + DESCRIPTION_COL_W - PADDING, _text_baseline(TOTAL_ROW_Y, TOTAL_ROW_H, 12), "TOTAL PAID:")
+
+    # Footer
+    c.setFillColor(MUTED)
+    c.setFont("Helvetica", 10)
+    y = FOOTER_TOP
+    for line in FOOTER_LINES:
+        if line:
+            c.drawString(LEFT, y, line)
+        y -= 14
+
+
+def _draw_fields(c, fields):
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica", 10)
+    for key, row_y in zip(["receipt_number", "issue_date", "issue_time"], RECEIPT_ROWS_Y):
+        c.drawString(RECEIPT_VALUE_X, _text_baseline(row_y, RECEIPT_ROW_H, 10), fields[key])
+    for key, row_y in zip(["tenant_id", "full_name", "bill_id"], TENANT_ROWS_Y):
+        c.drawString(TENANT_VALUE_X, _text_baseline(row_y, TENANT_ROW_H, 10), fields[key])
+
+    c.setFont("Helvetica", 11)
+    row_baseline = _text_baseline(PAYMENT_ROW_Y, PAYMENT_ROW_H, 11)
+    c.drawString(LEFT + PADDING, row_baseline, fields["description"])
+    c.drawRightString(RIGHT - PADDING, row_baseline, fields["amount"])
+
+    c.setFillColor(colors.whitesmoke)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawRightString(RIGHT - PADDING, _text_baseline(TOTAL_ROW_Y, TOTAL_ROW_H, 12), fields["amount"])
+
+
+class ReceiptTemplate:
+    """
+    Receipt layout with the static part drawn as a form XObject. render()
+    records the background once into the form and places it with doForm,
+    so the form carries its own font resources and the fields are drawn on
+    top in the same canvas. No PDF parsing or merging happens per receipt.
+    """
+
+    FORM_NAME = "receiptBackground"
+
+    def render(self, fields):
+        """Return the PDF bytes of a receipt for `fields` (all values are display strings)."""
+        buffer = io.BytesIO()
+        # invariant: no creation timestamp or random file ID, so equal fields give equal bytes
+        c = canvas.Canvas(buffer, pagesize=A4, pageCompression=1, invariant=1)
+        c.beginForm(self.FORM_NAME)
+        _draw_background(c)
+        c.endForm()
+        c.setTitle(f"Receipt {fields['receipt_number']}")
+
+        c.doForm(self.FORM_NAME)
+        _draw_fields(c, fields)
+        c.showPage()
+        c.save()
+        return buffer.getvalue()
+
+
+_template = None
+_template_lock = threading.Lock()
+
+
+def get_receipt_template():
+    """Process-wide receipt template, created on first use (or at startup via preload)."""
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = ReceiptTemplate()
+    return _template
@@ -0,0 +1,41 @@
+from sqlalchemy import inspect, text
+
+from extensions import db
+
+
+def upgrade_schema():
+    """
+    Bring an existing database up to the models: create missing tables,
+    add missing columns and create missing indexes. Safe to run repeatedly.
+    Returns a list of the changes that were applied.
+    """
+    changes = []
+    db.create_all()
+
+    engine = db.engine
+    inspector = inspect(engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            if engine.dialect.name == "mysql":
+                ddl = ddl.replace('"', "`")
+            with engine.begin() as conn:
+                conn.execute(text(ddl))
+            changes.append(f"column {table.name}.{column.name}")
+
+        existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind=engine)
+                changes.append(f"index {index.name}")
+
+    return changes
@@ -0,0 +1,246 @@
+import calendar
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from extensions import db
+from models.bills_model import Bill
+from models.contracts_model import Contract
+from models.tenants_model import Tenant
+from models.transaction_model import Transaction
+from models.units_model import House as Unit
+from models.users_model import User
+
+# -------------------
+# Monthly tenant statements (batch)
+# -------------------
+# The parent process loads everything with set queries and hands plain
+# dicts to a process pool; workers only render PDFs and never touch the DB.
+
+ROW_HEIGHT = 16
+BOTTOM_MARGIN = 60
+
+
+def _date_str(value):
+    return str(value)[:10] if value else ""
+
+
+def _money(value):
+    return f"PHP {float(value or 0):,.2f}"
+
+
+def collect_statement_jobs(year, month, output_dir):
+    """Build one render job per active tenant using three set queries."""
+    first_day = f"{year:04d}-{month:02d}-01"
+    last_day = f"{year:04d}-{month:02d}-{calendar.monthrange(year, month)[1]:02d}"
+
+    tenants = (
+        db.session.query(
+            Tenant.tenantid,
+            User.firstname,
+            User.middlename,
+            User.lastname,
+            User.email,
+            Unit.name.label("unit_name")
+        )
+        .join(User, Tenant.userid == User.userid)
+        .outerjoin(Contract, db.and_(Contract.tenantid == Tenant.tenantid, Contract.status == "Active"))
+        .outerjoin(Unit, Unit.unitid == Contract.unitid)
+        .filter(Tenant.status == "Active")
+        .order_by(Tenant.tenantid)
+        .all()
+    )
+
+    bills = (
+        db.session.query(
+            Bill.billid, Bill.tenantid, Bill.issuedate, Bill.duedate,
+            Bill.billtype, Bill.description, Bill.amount, Bill.status
+        )
+        .join(Tenant, Bill.tenantid == Tenant.tenantid)
+        .filter(Tenant.status == "Active", Bill.issuedate >= first_day, Bill.issuedate <= last_day)
+        .order_by(Bill.tenantid, Bill.issuedate)
+        .all()
+    )
+
+    transactions = (
+        db.session.query(
+            Transaction.transactionid, Transaction.tenantid, Transaction.billid,
+            Transaction.paymentdate, Transaction.amountpaid, Transaction.receipt
+        )
+        .join(Tenant, Transaction.tenantid == Tenant.tenantid)
+        .filter(Tenant.status == "Active", Transaction.paymentdate >= first_day, Transaction.paymentdate <= last_day)
+        .order_by(Transaction.tenantid, Transaction.paymentdate)
+        .all()
+    )
+
+    bills_by_tenant, payments_by_tenant = {}, {}
+    for b in bills:
+        bills_by_tenant.setdefault(b.tenantid, []).append({
+            "billid": b.billid,
+            "issuedate": _date_str(b.issuedate),
+            "duedate": _date_str(b.duedate),
+            "billtype": b.billtype or "",
+            "description": b.description or "",
+            "amount": float(b.amount or 0),
+            "status": b.status or ""
+        })
+    for t in transactions:
+        payments_by_tenant.setdefault(t.tenantid, []).append({
+            "transactionid": t.transactionid,
+            "billid": t.billid,
+            "paymentdate": _date_str(t.paymentdate),
+            "amount": float(t.amountpaid or 0),
+            "receipt": t.receipt or ""
+        })
+
+    period = f"{year:04d}-{month:02d}"
+    jobs, seen = [], set()
+    for t in tenants:
+        if t.tenantid in seen:  # a tenant with several active contracts gets one statement
+            continue
+        seen.add(t.tenantid)
+        jobs.append({
+            "tenantid": t.tenantid,
+            "fullname": f"{t.firstname} {t.middlename + ' ' if t.middlename else ''}{t.lastname}",
+            "email": t.email,
+            "unit_name": t.unit_name or "N/A",
+            "period": period,
+            "period_label": datetime(year, month, 1).strftime("%B %Y"),
+            "bills": bills_by_tenant.get(t.tenantid, []),
+            "payments": payments_by_tenant.get(t.tenantid, []),
+            "path": os.path.join(output_dir, f"statement_{t.tenantid}_{period}.pdf")
+        })
+    return jobs
+
+
+def render_statement(job):
+    """Render one statement PDF. Runs inside a worker process."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    width, height = A4
+    left, right = 50, width - 50
+    c = canvas.Canvas(job["path"], pagesize=A4, pageCompression=1)
+    c.setTitle(f"Statement {job['period']} - Tenant {job['tenantid']}")
+    y = height - 60
+
+    def new_page_if_needed(y):
+        if y < BOTTOM_MARGIN:
+            c.showPage()
+            c.setFont("Helvetica", 9)
+            return height - 60
+        return y
+
+    c.setFillColor(colors.HexColor("#2E86AB"))
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(left, y, "MONTHLY STATEMENT")
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica", 10)
+    y -= 24
+    for label, value in [
+        ("Tenant:", f"{job['fullname']} (Tenant ID {job['tenantid']})"),
+        ("Unit:", job["unit_name"]),
+        ("Period:", job["period_label"])
+    ]:
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(left, y, label)
+        c.setFont("Helvetica", 10)
+        c.drawString(left + 60, y, value)
+        y -= 14
+
+    sections = [
+        ("BILLS", ["Issued", "Due", "Type", "Description", "Status", "Amount"],
+         [left, left + 70, left + 140, left + 220, left + 380, right],
+         [[b["issuedate"], b["duedate"], b["billtype"], b["description"][:32], b["status"], _money(b["amount"])]
+          for b in job["bills"]]),
+        ("PAYMENTS", ["Date", "Bill ID", "Receipt", "Amount"],
+         [left, left + 90, left + 160, right],
+         [[p["paymentdate"], str(p["billid"]), p["receipt"][:40], _money(p["amount"])]
+          for p in job["payments"]])
+    ]
+    for title, headers, columns, rows in sections:
+        y -= 20
+        y = new_page_if_needed(y)
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(left, y, title)
+        y -= ROW_HEIGHT
+        c.setFont("Helvetica-Bold", 9)
+        for i, header in enumerate(headers):
+            if i == len(headers) - 1:
+                c.drawRightString(columns[i], y, header)
+            else:
+                c.drawString(columns[i], y, header)
+        c.setFont("Helvetica", 9)
+        if not rows:
+            y -= ROW_HEIGHT
+            c.drawString(left, y, "None for this period.")
+        for row in rows:
+            y -= ROW_HEIGHT
+            y = new_page_if_needed(y)
+            for i, value in enumerate(row):
+                if i == len(row) - 1:
+                    c.drawRightString(columns[i], y, value)
+                else:
+                    c.drawString(columns[i], y, value)
+
+    total_billed = sum(b["amount"] for b in job["bills"])
+    total_paid = sum(p["amount"] for p in job["payments"])
+    y -= 30
+    y = new_page_if_needed(y)
+    c.setFont("Helvetica-Bold", 10)
+    for label, value in [("Total billed:", total_billed), ("Total paid:", total_paid), ("Balance:", total_billed - total_paid)]:
+        c.drawString(right - 200, y, label)
+        c.drawRightString(right, y, _money(value))
+        y -= 14
+
+    c.showPage()
+    c.save()
+    return {
+        "tenantid": job["tenantid"],
+        "fullname": job["fullname"],
+        "email": job["email"],
+        "file": os.path.basename(job["path"]),
+        "bills": len(job["bills"]),
+        "payments": len(job["payments"]),
+        "total_billed": round(total_billed, 2),
+        "total_paid": round(total_paid, 2)
+    }
+
+
+def generate_monthly_statements(year, month, upload_folder, workers=None, progress=None):
+    """
+    Generate a statement PDF per active tenant for `year`-`month` under
+    UPLOAD_FOLDER/statements/YYYY-MM/ and write index.json next to them.
+    `progress(done, total)` is called after each rendered statement.
+    Returns the index dict.
+    """
+    period = f"{year:04d}-{month:02d}"
+    output_dir = os.path.join(upload_folder, "statements", period)
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = collect_statement_jobs(year, month, output_dir)
+    entries, failures = [], []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(render_statement, job): job for job in jobs}
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    entries.append(future.result())
+                except Exception as e:
+                    failures.append({"tenantid": futures[future]["tenantid"], "error": str(e)})
+                if progress:
+                    progress(done, len(jobs))
+
+    entries.sort(key=lambda e: e["tenantid"])
+    index = {
+        "period": period,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "count": len(entries),
+        "statements": entries,
+        "failures": failures
+    }
+    with open(os.path.join(output_dir, "index.json"), "w") as f:
+        json.dump(index, f, indent=2)
+    return index
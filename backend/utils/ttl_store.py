@@ -0,0 +1,318 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.ttl_entry_model import TTLEntry
+
+# -------------------
+# TTL key/value stores
+# -------------------
+# Short-lived state (verification codes, password reset grants, rate limit
+# buckets) that every worker process must see. All stores share one interface:
+#     set(key, value, ttl)   get(key)   pop(key)   delete(key)   sweep()
+#     modify(key, fn)        atomic read-modify-write, see MemoryTTLStore.modify
+# Values must be JSON-serialisable.
+#
+#   memory    one process only (single worker / development)
+#   database  TTLEntries table, shared by every worker (default)
+#   redis     any redis-py compatible client (REDIS_URL), or the in-process
+#             LocalRedis stand-in when no URL is configured
+
+
+class MemoryTTLStore:
+    """
+    In-process store with bounded memory. Expiry uses a timing wheel of
+    one-second buckets: each sweep only visits the buckets that elapsed since
+    the last one, so removing an expired entry is O(1). When `max_entries`
+    is reached the oldest entry is evicted.
+    """
+
+    def __init__(self, max_entries=10000, clock=time.time):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (value, expires_at), least recently set first
+        self._wheel = {}  # expiry second -> keys expiring in it
+        self._swept_until = int(clock())
+        self._lock = threading.Lock()
+
+    def _sweep(self, now):
+        second = int(now)
+        if second - self._swept_until > len(self._wheel):
+            due = sorted(s for s in self._wheel if s < second)  # long idle: only visit buckets that exist
+        else:
+            due = range(self._swept_until, second)
+        removed = 0
+        for bucket in due:
+            for key in self._wheel.pop(bucket, ()):
+                entry = self._data.get(key)
+                if entry is not None and entry[1] <= now:  # may have been set again since
+                    del self._data[key]
+                    removed += 1
+        self._swept_until = max(self._swept_until, second)
+        return removed
+
+    def _store(self, key, value, ttl, now):
+        """Insert as most recent, then sweep and evict down to `max_entries`. Caller holds the lock."""
+        self._sweep(now)
+        expires_at = now + ttl
+        self._data.pop(key, None)
+        self._data[key] = (value, expires_at)
+        self._wheel.setdefault(int(expires_at), set()).add(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._store(key, value, ttl, self._clock())
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= self._clock():
+                return None
+            return entry[0]
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None or entry[1] <= self._clock():
+                return None
+            return entry[0]
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def modify(self, key, fn):
+        """
+        Atomically replace a value. `fn(current)` gets the live value (None if
+        missing or expired) and returns (new_value, ttl, result); the new value
+        is stored unless it is None, and `result` is returned.
+        """
+        with self._lock:
+            now = self._clock()
+            entry = self._data.get(key)
+            value, ttl, result = fn(entry[0] if entry is not None and entry[1] > now else None)
+            if value is not None:
+                self._store(key, value, ttl, now)
+            return result
+
+    def sweep(self):
+        with self._lock:
+            return self._sweep(self._clock())
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DatabaseTTLStore:
+    """
+    TTLEntries table shared by all workers. Every call runs in its own short
+    transaction on a separate connection, so it neither commits nor sees the
+    request's session. Expired rows are removed through the expiresat index,
+    every SWEEP_EVERY writes and by `flask sweep-ttl-store`.
+    """
+
+    SWEEP_EVERY = 100
+    SWEEP_BATCH = 1000
+
+    def __init__(self):
+        self._writes = 0
+
+    def _write(self, conn, key, value, expires_at, exists):
+        values = {"value": json.dumps(value), "expiresat": expires_at}
+        if exists:
+            conn.execute(update(TTLEntry).where(TTLEntry.key == key).values(**values))
+        else:
+            conn.execute(insert(TTLEntry).values(key=key, **values))
+
+    def _written(self):
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            self.sweep()
+
+    def set(self, key, value, ttl):
+        expires_at = time.time() + ttl
+        for attempt in range(2):
+            try:
+                with db.engine.begin() as conn:
+                    self._write(conn, key, value, expires_at, exists=self._read(conn, key) is not None)
+                break
+            except IntegrityError:
+                if attempt:
+                    raise  # another worker inserted it first: the retry updates their row
+        self._written()
+
+    def modify(self, key, fn):
+        """Same contract as MemoryTTLStore.modify; the row is locked (SELECT ... FOR UPDATE) while `fn` runs."""
+        for attempt in range(2):
+            try:
+                with db.engine.begin() as conn:
+                    row = conn.execute(
+                        select(TTLEntry.value, TTLEntry.expiresat)
+                        .where(TTLEntry.key == key)
+                        .with_for_update()
+                    ).first()
+                    now = time.time()
+                    current = json.loads(row.value) if row is not None and row.expiresat > now else None
+                    value, ttl, result = fn(current)
+                    if value is not None:
+                        self._write(conn, key, value, now + ttl, exists=row is not None)
+                break
+            except IntegrityError:
+                if attempt:
+                    raise  # two first writers raced on the insert: the retry locks the winner's row
+        if value is not None:
+            self._written()
+        return result
+
+    @staticmethod
+    def _read(conn, key):
+        return conn.execute(select(TTLEntry.value, TTLEntry.expiresat).where(TTLEntry.key == key)).first()
+
+    def get(self, key):
+        with db.engine.connect() as conn:
+            row = self._read(conn, key)
+        if row is None or row.expiresat <= time.time():
+            return None
+        return json.loads(row.value)
+
+    def pop(self, key):
+        """Read and delete. Only one of several concurrent callers gets the value."""
+        with db.engine.begin() as conn:
+            row = self._read(conn, key)
+            if row is None:
+                return None
+            deleted = conn.execute(
+                delete(TTLEntry).where(TTLEntry.key == key, TTLEntry.expiresat == row.expiresat)
+            ).rowcount
+        if not deleted or row.expiresat <= time.time():
+            return None
+        return json.loads(row.value)
+
+    def delete(self, key):
+        with db.engine.begin() as conn:
+            conn.execute(delete(TTLEntry).where(TTLEntry.key == key))
+
+    def sweep(self):
+        """Delete expired rows in index-ordered batches. Returns how many were removed."""
+        removed = 0
+        while True:
+            with db.engine.begin() as conn:
+                keys = [k for (k,) in conn.execute(
+                    select(TTLEntry.key).where(TTLEntry.expiresat <= time.time()).limit(self.SWEEP_BATCH)
+                )]
+                if not keys:
+                    return removed
+                conn.execute(delete(TTLEntry).where(TTLEntry.key.in_(keys)))
+            removed += len(keys)
+
+
+class LocalRedis:
+    """In-process stand-in for the subset of redis-py used by RedisTTLStore."""
+
+    FOREVER = 10 * 365 * 24 * 3600
+
+    def __init__(self, max_entries=10000):
+        self._store = MemoryTTLStore(max_entries=max_entries)
+        self._lock = threading.RLock()
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            self._store.set(name, value, ex if ex is not None else self.FOREVER)
+        return True
+
+    def get(self, name):
+        return self._store.get(name)
+
+    def multi(self):
+        pass
+
+    def transaction(self, func, *watches, value_from_callable=False):
+        """WATCH/MULTI/EXEC stand-in: `func(pipe)` runs under a lock, with this client as the pipe."""
+        with self._lock:
+            result = func(self)
+        return result if value_from_callable else []
+
+    def getdel(self, name):
+        return self._store.pop(name)
+
+    def delete(self, *names):
+        for name in names:
+            self._store.delete(name)
+        return len(names)
+
+
+class RedisTTLStore:
+    """Redis (or anything speaking its set/get/getdel/delete API). Redis expires keys itself."""
+
+    def __init__(self, client, prefix="rentahanan:"):
+        self.client = client
+        self.prefix = prefix
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, math.ceil(ttl)))
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def pop(self, key):
+        raw = self.client.getdel(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def modify(self, key, fn):
+        """Same contract as MemoryTTLStore.modify, as a WATCH/MULTI transaction (retried if the key changes)."""
+        name = self.prefix + key
+
+        def apply(pipe):
+            raw = pipe.get(name)
+            value, ttl, result = fn(json.loads(raw) if raw is not None else None)
+            pipe.multi()
+            if value is not None:
+                pipe.set(name, json.dumps(value), ex=max(1, math.ceil(ttl)))
+            return result
+
+        return self.client.transaction(apply, name, value_from_callable=True)
+
+    def sweep(self):
+        return 0
+
+
+def create_ttl_store(name=None):
+    """Store selected by `name` or the VERIFICATION_STORE env var (database by default)."""
+    name = (name or os.getenv("VERIFICATION_STORE") or "database").lower()
+    if name == "memory":
+        return MemoryTTLStore()
+    if name == "redis":
+        url = os.getenv("REDIS_URL")
+        if not url:
+            return RedisTTLStore(LocalRedis())
+        import redis  # optional: only needed when REDIS_URL is set
+
+        return RedisTTLStore(redis.Redis.from_url(url))
+    return DatabaseTTLStore()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_verification_store():
+    """The process-wide store for verification codes, reset grants and email worker health."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_ttl_store()
+    return _store
@@ -172,12 +172,20 @@ const OwnerContract = () => {
                     contractid: selectedContract.contractid,
                     tenantid: selectedContract.tenantid,
                     termination_date: terminationDate,
-                    terminated_by: "Owner"
+                    terminated_by: "Owner",
+                    version: selectedContract.version
                 }),
             });
 
             const result = await response.json();
             
+            if (response.status === 409) {
+                // Someone else changed this contract since it was loaded
+                alert(result.error || result.message);
+                await fetchData();
+                return;
+            }
+
             if (!response.ok) throw new Error(result.message || "Failed to terminate contract");
 
             // Refresh data to show updated status
@@ -203,12 +211,20 @@ const OwnerContract = () => {
                 body: JSON.stringify({
                     contractid: selectedContract.contractid,
                     tenantid: selectedContract.tenantid,
-                    approved_by: "Owner"
+                    approved_by: "Owner",
+                    version: selectedContract.version
                 }),
             });
 
             const result = await response.json();
             
+            if (response.status === 409) {
+                // Someone else changed this contract since it was loaded
+                alert(result.error || result.message);
+                await fetchData();
+                return;
+            }
+
             if (!response.ok) throw new Error(result.message || "Failed to approve termination");
 
             // Refresh data to show updated status
@@ -232,12 +248,20 @@ const OwnerContract = () => {
                 body: JSON.stringify({
                     contractid: selectedContract.contractid,
                     tenantid: selectedContract.tenantid,
-                    rejected_by: "Owner"
+                    rejected_by: "Owner",
+                    version: selectedContract.version
                 }),
             });
 
             const result = await response.json();
             
+            if (response.status === 409) {
+                // Someone else changed this contract since it was loaded
+                alert(result.error || result.message);
+                await fetchData();
+                return;
+            }
+
             if (!response.ok) throw new Error(result.message || "Failed to reject termination");
 
             // Refresh data to show updated status
@@ -85,7 +85,7 @@ const OwnerNotifications = () => {
   // Mark notification as read
   const markAsRead = async (notificationId) => {
     try {
-      const response = await fetch(`http://127.0.0.1:5000/api/notifications/${notificationId}/read`, {
+      const response = await fetch(`http://127.0.0.1:5000/api/notifications/${notificationId}/read?user_id=${JSON.parse(localStorage.getItem("user") || "{}").userid}`, {
         method: "PUT",
       });
 
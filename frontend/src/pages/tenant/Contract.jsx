@@ -131,12 +131,24 @@ const Contract = () => {
           contractid: contract.contractid,
           tenantid: tenantId,
           termination_date: terminationDate,
-          terminated_by: "Tenant"
+          terminated_by: "Tenant",
+          version: contract.version
         }),
       });
 
       const result = await response.json();
       
+      if (response.status === 409) {
+        // The landlord changed this contract since it was loaded
+        const latest = await axios.get(`http://localhost:5000/api/contracts/tenant/${tenantId}`);
+        if (Array.isArray(latest.data) && latest.data.length > 0) {
+          setContract(latest.data[0]);
+        }
+        showMessage(`❌ ${result.error || result.message}`, true);
+        setShowConfirmModal(false);
+        return;
+      }
+
       if (!response.ok) throw new Error(result.message || "Failed to terminate contract");
 
       // Refresh data to show updated status